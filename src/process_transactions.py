@@ -1,8 +1,16 @@
 #!/usr/bin/env python
 """Process transactions from input files."""
 import os
+import sys
+import json
+import shutil
+import argparse
+from collections import deque
+from functools import partial
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Deque, Iterable, Iterator, Sequence, Tuple, Callable, cast
 
 from usaspending.core.config import ComponentConfig
 from usaspending.config import ConfigurationProvider as ConfigProvider
@@ -10,11 +18,25 @@ from usaspending.core.validation import ValidationService
 from usaspending.core.validation_mediator import ValidationMediator
 from usaspending.entity_mediator import USASpendingEntityMediator as EntityMediator
 from usaspending.entity_mapper import EntityMapper
-from usaspending.entity_store import EntityStore
+from usaspending.entity_store import EntityStore, DeduplicatingEntityStore
 from usaspending.entity_factory import EntityFactory
 from usaspending.dictionary import Dictionary
 from usaspending.core.exceptions import ConfigurationError
+from usaspending.core.interfaces import IEntityStore
 from usaspending.core.utils import safe_operation
+from usaspending.core.csv_reader import (
+    ByteRange, CSVFormat, StreamingCSVReader, compute_shards, get_source_columns, read_header
+)
+from usaspending.core.field_index import FieldPropertyIndex, get_field_index
+from usaspending.core.columnar import ColumnarTransformer
+from usaspending.core.extraction import EntityExtractor
+from usaspending.core.scheduler import EntityScheduler
+from usaspending.core.reference_index import ReferenceIndex, ResolvedReference
+from usaspending.core.relationships import EdgeStore
+from usaspending.core.aggregation import RelationshipAggregator
+from usaspending.core.entity_ids import EntityIdGenerator
+from usaspending.core.error_sink import DEFAULT_MAX_ERRORS, set_default_max_errors
+from usaspending.core.profiling import Profiler
 from usaspending.core.types import (
     EntityData, ValidationResult, ValidationRule, ValidationSeverity, 
     RuleType, EntityConfig, EntityType
@@ -27,13 +49,31 @@ DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "conversion_config.yaml"
 
 logger = get_logger(__name__)
 
+def get_max_errors(config: Dict[str, Any]) -> int:
+    """Get ``validation_service.max_errors``, the number of errors each component retains."""
+    service_config = config.get('validation_service', {})
+    settings = service_config.get('config', service_config)
+    return int(settings.get('max_errors', DEFAULT_MAX_ERRORS))
+
 def setup_validation(config: Dict[str, Any]) -> ValidationService:
     """Set up validation components."""
-    validation_service = ValidationService(config)
-    validation_service.configure(ComponentConfig(settings=config.get('validation', {})))
-    return validation_service
+    # Bound error buffers before any component creates one
+    set_default_max_errors(get_max_errors(config))
+    return ValidationService(config)
 
-def setup_entity_mediator(config: Dict[str, Any], validation_service: ValidationService) -> EntityMediator:
+def get_store_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the entity store settings, ``entity_store.config``, with the ``entities`` section.
+
+    Store components read their settings from this one level; a section
+    without a ``config`` block is read as the settings themselves.
+    """
+    store_config = config.get('entity_store', {})
+    settings = dict(store_config.get('config', store_config))
+    settings['entities'] = config.get('entities', {})
+    return settings
+
+def setup_entity_mediator(config: Dict[str, Any],
+                          validation_service: Optional[ValidationService] = None) -> EntityMediator:
     """Set up entity mediation components."""
     entity_factory = EntityFactory()
     entity_store = EntityStore()
@@ -43,22 +83,227 @@ def setup_entity_mediator(config: Dict[str, Any], validation_service: Validation
     factory_settings = config.get('entity_factory', {})
     factory_settings['entities'] = config.get('entities', {})
     factory_settings['mappings'] = config.get('mappings', {})
+    store_settings = get_store_settings(config)
     
     entity_factory.configure(ComponentConfig(settings=factory_settings))
-    entity_store.configure(ComponentConfig(settings=config.get('entity_store', {})))
+    entity_store.configure(ComponentConfig(settings=store_settings))
     entity_mapper.configure(ComponentConfig(settings=config.get('entity_mapper', {})))
+
+    store: IEntityStore = entity_store
+    if store_settings.get('deduplication', {}).get('enabled', False):
+        store = DeduplicatingEntityStore(entity_store)
+        store.configure(ComponentConfig(settings=store_settings))
     
     mediator = EntityMediator(
         factory=entity_factory,
-        store=entity_store,
+        store=store,
         mapper=entity_mapper
     )
     mediator.configure(ComponentConfig(settings=config.get('entity_mediator', {})))
 
     return mediator
 
-def process_chunk(entity_mediator: EntityMediator, chunk: list[Dict[str, Any]]) -> None:
-    """Process a chunk of transaction records."""
+def start_profiling(config: Dict[str, Any], entity_mediator: EntityMediator,
+                    extractor: EntityExtractor) -> Optional[Profiler]:
+    """Instrument the pipeline hot paths and start the run profile, if profiling is enabled."""
+    profiler = Profiler.from_config(config)
+    if profiler is not None:
+        extractor.instrument(profiler)
+        entity_mediator.instrument(profiler)
+        profiler.start()
+    return profiler
+
+def stop_profiling(profiler: Optional[Profiler], name: str) -> None:
+    """Write the run profile and log sampled stage latency."""
+    if profiler is None:
+        return
+    profiler.stop(name)
+    for stage, summary in profiler.report().items():
+        logger.info(
+            f"Stage {stage}: {summary['calls']} calls, mean {summary['mean']:.6f}s, "
+            f"p99 {summary['p99']:.6f}s, estimated total {summary['estimated_total']:.2f}s"
+        )
+
+def create_scheduler(config: Dict[str, Any]) -> EntityScheduler:
+    """Create the entity stage scheduler from ``entities.*.entity_processing``."""
+    return EntityScheduler.from_config(config)
+
+def create_extractor(config: Dict[str, Any], input_file_path: str,
+                     scheduler: Optional[EntityScheduler] = None) -> EntityExtractor:
+    """Create the entity extractor for an input file.
+
+    Entities are extracted in dependency order. CSV headers let object
+    mappings tell constant values from column names.
+    """
+    entities = config.get('entities', {})
+    columns = None
+    if is_csv_input(input_file_path):
+        csv_format = get_csv_format(config)
+        if csv_format.has_header_row:
+            columns = read_header(input_file_path, csv_format)[0]
+    order = (scheduler or EntityScheduler(entities)).order
+    return EntityExtractor(entities, columns, order)
+
+def create_reference_index(config: Dict[str, Any]) -> Optional[ReferenceIndex]:
+    """Create the reference index from ``entity_store.reference_index``, if enabled."""
+    settings = dict(get_store_settings(config).get('reference_index', {}) or {})
+    if not settings.pop('enabled', False):
+        return None
+    return ReferenceIndex.from_config(config.get('entities', {}), **settings)
+
+def get_relationship_graph_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Get ``entity_store.relationship_graph`` settings."""
+    return get_store_settings(config).get('relationship_graph', {}) or {}
+
+def create_edge_store(config: Dict[str, Any]) -> Optional[EdgeStore]:
+    """Create the relationship edge store, if enabled."""
+    if not get_relationship_graph_settings(config).get('enabled', False):
+        return None
+    return EdgeStore.from_config(config)
+
+def get_edge_store_path(config: Dict[str, Any], shard_index: Optional[int] = None) -> str:
+    """Get the edge store file path, shard-private when a shard index is given."""
+    path = str(get_relationship_graph_settings(config).get('path', 'relationships.edges'))
+    if shard_index is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard_index:04d}{ext}"
+
+def get_aggregate_path(config: Dict[str, Any], relationship_id: str, shard_index: int) -> str:
+    """Get the file holding a shard's partial aggregates of a relationship."""
+    return f"{get_shard_store_settings(config, shard_index)['path']}.{relationship_id}.aggregates"
+
+def persist_aggregates(config: Dict[str, Any], aggregators: Sequence[RelationshipAggregator],
+                       update: Callable[[EntityType, str, Dict[str, Any]], bool]) -> Dict[str, Dict[str, int]]:
+    """Write relationship aggregates onto their stored target entities.
+
+    Targets are found by the stable ID of their reference key, derived from
+    the same settings the entity store generates IDs from, so no index of
+    stored entities is needed.
+
+    Returns:
+        Counts of ``updated`` and ``unresolved`` groups by relationship id
+    """
+    id_generator = EntityIdGenerator.from_config(get_store_settings(config)['entities'])
+    results = {}
+    for aggregator in aggregators:
+        result = results[aggregator.relationship_id] = aggregator.persist(id_generator.generate, update)
+        logger.info(f"Aggregated {aggregator.relationship_id} into {result['updated']} {aggregator.target_entity} entities")
+    return results
+
+def persist_resolved_references(references: Sequence[ResolvedReference],
+                                update: Callable[[EntityType, str, Dict[str, Any]], bool]) -> int:
+    """Write the IDs of references resolved late onto their stored source entities.
+
+    Each ID is written with the key it was resolved from, as a repeat of
+    an entity may reference a different key than the stored one. The
+    updates of an entity are merged into one, so each entity is rewritten
+    once.
+
+    Returns:
+        Number of entities updated
+    """
+    updates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for reference in references:
+        fields = updates.setdefault((reference.source_type, reference.source_id), {})
+        for name in reference.field.split('.'):
+            fields = fields.setdefault(name, {})
+        if reference.key_value is not None:
+            fields[reference.key_field] = reference.key_value
+        fields[reference.id_field] = reference.target_id
+    updated = 0
+    for (entity_type, entity_id), fields in updates.items():
+        if update(cast(EntityType, entity_type), entity_id, fields):
+            updated += 1
+    return updated
+
+def store_extracted_entity(entity_mediator: EntityMediator, references: Optional[ReferenceIndex],
+                           entity_type: str, entity: Dict[str, Any],
+                           edges: Optional[EdgeStore] = None,
+                           aggregators: Sequence[RelationshipAggregator] = ()) -> Optional[str]:
+    """Store an extracted entity.
+
+    With a reference index the entity's references are resolved, its key
+    indexed and its edges emitted. Stored entities are folded into the
+    aggregators of relationships they are the source of.
+    """
+    misses = references.resolve_entity(entity_type, entity) if references is not None else []
+    entity_id = entity_mediator.process_mapped_entity(cast(EntityType, entity_type), entity)
+    if entity_id:
+        if references is not None:
+            references.add(entity_type, entity, entity_id)
+            references.defer(entity_type, entity_id, misses)
+        if edges is not None:
+            edges.add_entity_edges(entity_type, entity_id, entity)
+        for aggregator in aggregators:
+            if aggregator.source_entity == entity_type:
+                aggregator.add(entity)
+    return entity_id
+
+def store_entity_stage(entity_mediator: EntityMediator, references: Optional[ReferenceIndex],
+                       entity_type: str, batches: Dict[str, List[Dict[str, Any]]],
+                       edges: Optional[EdgeStore] = None,
+                       aggregators: Sequence[RelationshipAggregator] = ()) -> int:
+    """Store the extracted entities of one type from a chunk; one scheduler stage.
+
+    Returns:
+        Number of entities stored
+    """
+    stored = 0
+    for entity in batches.get(entity_type, ()):
+        if store_extracted_entity(entity_mediator, references, entity_type, entity, edges, aggregators):
+            stored += 1
+    return stored
+
+def report_unresolved_references(references: ReferenceIndex,
+                                 update: Callable[[EntityType, str, Dict[str, Any]], bool],
+                                 edges: Optional[EdgeStore] = None) -> Dict[str, Any]:
+    """Retry deferred references and log those that remain unresolved.
+
+    References resolved late are written onto their stored entities with
+    ``update`` and, with an edge store, added as edges.
+
+    Returns:
+        The unresolved reference report of ``ReferenceIndex.get_unresolved``
+    """
+    late = references.resolve_deferred()
+    updated = persist_resolved_references(late, update)
+    if edges is not None:
+        for reference in late:
+            edges.add_resolved(reference)
+    report = references.get_unresolved()
+    logger.info(f"Reference resolution: {references.get_stats()}, {len(late)} resolved late "
+                f"into {updated} stored entities")
+    if report['total']:
+        logger.warning(f"{report['total']} unresolved references: {report['counts']}")
+        for message in report['samples'][:10]:
+            logger.debug(message)
+    return report
+
+def process_chunk(entity_mediator: EntityMediator, chunk: list[Dict[str, Any]],
+                  extractor: Optional[EntityExtractor] = None,
+                  references: Optional[ReferenceIndex] = None,
+                  edges: Optional[EdgeStore] = None,
+                  aggregators: Sequence[RelationshipAggregator] = ()) -> None:
+    """Process a chunk of transaction records.
+
+    With an extractor, every configured entity is built from each record in
+    one pass and stored, resolving entity references through ``references``,
+    emitting relationship edges to ``edges`` and updating ``aggregators``
+    when given; otherwise records are processed as transactions.
+    """
+    if extractor is not None:
+        writers = {
+            entity_type: partial(
+                store_extracted_entity, entity_mediator, references, entity_type,
+                edges=edges, aggregators=aggregators
+            )
+            for entity_type in extractor.entity_types
+        }
+        counts = extractor.route(chunk, writers)
+        logger.debug(f"Extracted entities: {counts}")
+        return
+
     for record in chunk:
         try:
             entity_id = entity_mediator.process_entity(cast(EntityType, 'transaction'), record)
@@ -68,12 +313,381 @@ def process_chunk(entity_mediator: EntityMediator, chunk: list[Dict[str, Any]])
             logger.error(f"Error processing transaction {record.get('contract_transaction_unique_key')}: {str(e)}")
             continue
 
+def is_csv_input(input_file_path: str) -> bool:
+    """Check whether the input file is CSV."""
+    return Path(input_file_path).suffix.lower() == '.csv'
+
+def get_csv_format(config: Dict[str, Any]) -> CSVFormat:
+    """Get CSV format settings from configuration."""
+    return CSVFormat.from_config(config.get('system', {}).get('formats', {}).get('csv', {}))
+
+def create_record_validator(field_index: FieldPropertyIndex) -> ValidationMediator:
+    """Create a validation mediator with the value rules of the indexed columns."""
+    validator = ValidationMediator()
+    for column, rules in field_index.get_validation_rules().items():
+        validator.register_rules(column, rules)
+    return validator
+
+def check_records(config: Dict[str, Any], records: Iterable[Dict[str, Any]],
+                  field_index: FieldPropertyIndex,
+                  summary: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Apply ``field_properties`` transformations and validations to records chunk by chunk.
+
+    Each chunk of ``processing.chunk_size`` records is transformed column by
+    column by a ``ColumnarTransformer`` built from the field property index
+    of the input header, then validated with ``ValidationMediator.validate_batch``
+    against the index's value rules; empty cells are not validated. Values
+    that fail to transform are kept unchanged and records that fail
+    validation are still processed: both are counted and reported, and
+    entity validation decides what is stored.
+
+    Args:
+        summary: Filled with the ``transformation_errors`` per column, the
+            ``validation_failures`` per rule and the number of
+            ``invalid_records``, if given
+    """
+    chunk_size = config.get('processing', {}).get('chunk_size', 1000)
+    transformer = ColumnarTransformer.from_field_index(field_index)
+    validator = create_record_validator(field_index)
+    failures: Dict[str, int] = {}
+    invalid_records = 0
+    for chunk in iter_chunks(records, chunk_size):
+        chunk = transformer.transform_records(chunk)
+        result = validator.validate_batch('record', chunk, skip_empty=True)
+        if not result.is_valid():
+            invalid_records += len(result.invalid_rows())
+            for _, rule in result.iter_failures():
+                failures[rule.id] = failures.get(rule.id, 0) + 1
+        yield from chunk
+
+    errors = transformer.errors
+    if errors.total:
+        logger.warning(f"{errors.total} values failed transformation: {errors.counts()}")
+    if invalid_records:
+        logger.warning(f"{invalid_records} records failed field validation: {failures}")
+    if summary is not None:
+        summary.update(transformation_errors=errors.counts(), validation_failures=failures,
+                       invalid_records=invalid_records)
+
+def read_records(config: Dict[str, Any], input_file_path: str,
+                 byte_range: Optional[ByteRange] = None,
+                 summary: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream input records.
+
+    CSV input honors ``system.formats.csv`` and only materializes the columns
+    referenced by ``entities.*.field_mappings``. With a header row, records
+    are transformed and validated by ``check_records`` with the
+    ``field_properties`` of their columns. Any other input is read as JSON lines.
+
+    Args:
+        summary: Passed to ``check_records``, if given
+    """
+    if is_csv_input(input_file_path):
+        csv_format = get_csv_format(config)
+        header: Optional[List[str]] = None
+        field_index: Optional[FieldPropertyIndex] = None
+        if csv_format.has_header_row:
+            header = read_header(input_file_path, csv_format)[0]
+            field_index = get_field_index(config.get('field_properties', {}), header)
+            logger.info(
+                f"Resolved field properties for {len(field_index)} of {len(header)} columns"
+            )
+            if field_index.unmatched_columns:
+                logger.debug(f"Columns without field properties: {', '.join(field_index.unmatched_columns)}")
+        # Object mapping constants are only told from columns with a header
+        columns = get_source_columns(config.get('entities', {}), header) or None
+        reader = StreamingCSVReader(
+            input_file_path, csv_format, columns=columns, byte_range=byte_range
+        )
+        if field_index is not None and len(field_index):
+            yield from check_records(config, reader, field_index, summary)
+        else:
+            yield from reader
+        if reader.missing_columns:
+            logger.warning(
+                f"{len(reader.missing_columns)} mapped columns not found in input: "
+                f"{', '.join(sorted(reader.missing_columns))}"
+            )
+        return
+
+    with open(input_file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON in line: {e}")
+                continue
+
+def iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split a record stream into chunks of ``chunk_size`` records."""
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+def process_stages(entity_mediator: EntityMediator, records: Iterable[Dict[str, Any]],
+                   chunk_size: int, extractor: EntityExtractor, scheduler: EntityScheduler,
+                   references: Optional[ReferenceIndex] = None,
+                   edges: Optional[EdgeStore] = None,
+                   aggregators: Sequence[RelationshipAggregator] = ()) -> int:
+    """Process a record stream through the entity stages and return the record count.
+
+    Each chunk is extracted once; every entity type is then stored by its
+    own scheduler stage, with ``concurrency.max_workers`` workers, once the
+    stages it depends on have stored that chunk.
+    """
+    chunk_sizes: Deque[int] = deque()
+
+    def batches() -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+        for chunk in iter_chunks(records, chunk_size):
+            chunk_sizes.append(len(chunk))
+            yield extractor.extract_batch(chunk)
+
+    stage = partial(store_entity_stage, entity_mediator, references, edges=edges, aggregators=aggregators)
+    processed_count = 0
+    for counts in scheduler.run(batches(), stage):
+        processed_count += chunk_sizes.popleft()
+        logger.info(f"Processed {processed_count} records")
+        logger.debug(f"Stored entities: {counts}")
+    return processed_count
+
+def process_records(entity_mediator: EntityMediator, records: Iterator[Dict[str, Any]],
+                    chunk_size: int, extractor: Optional[EntityExtractor] = None,
+                    references: Optional[ReferenceIndex] = None,
+                    edges: Optional[EdgeStore] = None,
+                    aggregators: Sequence[RelationshipAggregator] = (),
+                    scheduler: Optional[EntityScheduler] = None) -> int:
+    """Process a record stream in chunks and return the record count.
+
+    Extracted entities go through the ``scheduler`` stages when one is
+    given; otherwise each chunk is stored by the calling thread.
+    """
+    if extractor is not None and scheduler is not None:
+        return process_stages(entity_mediator, records, chunk_size, extractor, scheduler,
+                              references, edges, aggregators)
+
+    processed_count = 0
+    chunk: list[Dict[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+
+        if len(chunk) >= chunk_size:
+            process_chunk(entity_mediator, chunk, extractor, references, edges, aggregators)
+            processed_count += len(chunk)
+            logger.info(f"Processed {processed_count} records")
+            chunk = []  # Clear the chunk
+
+    # Process remaining records
+    if chunk:
+        process_chunk(entity_mediator, chunk, extractor, references, edges, aggregators)
+        processed_count += len(chunk)
+        logger.info(f"Processed {processed_count} total records")
+
+    return processed_count
+
+def get_shard_store_settings(config: Dict[str, Any], shard_index: int) -> Dict[str, Any]:
+    """Get entity store settings for a shard-private store."""
+    settings = get_store_settings(config)
+    default_path = 'entities.db' if settings.get('storage_type') == 'sqlite' else 'entities'
+    root, ext = os.path.splitext(settings.get('path', default_path))
+    settings['path'] = f"{root}.shard{shard_index:04d}{ext}"
+    return settings
+
+def process_shard(config: Dict[str, Any], input_file_path: str,
+                  shard_index: int, byte_range: ByteRange) -> Dict[str, int]:
+    """Process one byte-range shard of the input in a worker process.
+
+    Entities are written to a shard-private store so shard outputs can be
+    merged in shard order afterwards.
+    """
+    shard_config = dict(config)
+    shard_config['entity_store'] = {'config': get_shard_store_settings(config, shard_index)}
+
+    validation_service = setup_validation(shard_config)
+    entity_mediator = setup_entity_mediator(shard_config, validation_service)
+    profiler: Optional[Profiler] = None
+    references: Optional[ReferenceIndex] = None
+    try:
+        chunk_size = config.get('processing', {}).get('chunk_size', 1000)
+        records = read_records(config, input_file_path, byte_range)
+        scheduler = create_scheduler(config)
+        extractor = create_extractor(config, input_file_path, scheduler)
+        profiler = start_profiling(config, entity_mediator, extractor)
+        # Shard-local: references to entities first seen in other shards are reported
+        references = create_reference_index(config)
+        edges = create_edge_store(config) if references is not None else None
+        aggregators = RelationshipAggregator.from_config(config)
+        processed_count = process_records(entity_mediator, records, chunk_size, extractor, references,
+                                          edges, aggregators, scheduler)
+        if references is not None:
+            report_unresolved_references(references, entity_mediator.update_entity, edges)
+        if edges is not None:
+            edges.save(get_edge_store_path(config, shard_index))
+        # Targets may be stored by other shards; totals are persisted after the merge
+        for aggregator in aggregators:
+            aggregator.save(get_aggregate_path(config, aggregator.relationship_id, shard_index))
+    finally:
+        stop_profiling(profiler, f"shard{shard_index:04d}")
+        if references is not None:
+            references.close()
+        entity_mediator.cleanup()
+
+    return {'shard': shard_index, 'records': processed_count}
+
+def merge_shard_stores(config: Dict[str, Any], shard_count: int) -> int:
+    """Merge shard-private stores into the configured store in shard order.
+
+    Merging in shard order matches sequential processing: for duplicate
+    entity IDs the entity from the later shard wins.
+    """
+    store = EntityStore()
+    store_settings = get_store_settings(config)
+    store.configure(ComponentConfig(settings=store_settings))
+    entity_types = list(config.get('entities', {}).keys())
+    if 'transaction' not in entity_types:
+        entity_types.append('transaction')
+
+    merged = 0
+    try:
+        for shard_index in range(shard_count):
+            shard_settings = get_shard_store_settings(config, shard_index)
+            shard_store = EntityStore()
+            shard_store.configure(ComponentConfig(settings=shard_settings))
+            try:
+                for entity_type in entity_types:
+                    entities = shard_store.list_entities(cast(EntityType, entity_type)) or ()
+                    merged += len(store.save_entities(cast(EntityType, entity_type), entities) or ())
+            finally:
+                shard_store.cleanup()
+
+            shard_path = Path(shard_settings['path'])
+            if shard_path.is_dir():
+                shutil.rmtree(shard_path, ignore_errors=True)
+            elif shard_path.exists():
+                shard_path.unlink()
+    finally:
+        store.cleanup()
+
+    return merged
+
+def merge_shard_edges(config: Dict[str, Any], shard_count: int) -> int:
+    """Merge shard-private edge stores into the configured edge store file.
+
+    Returns:
+        Number of distinct edges
+    """
+    edges = create_edge_store(config)
+    if edges is None:
+        return 0
+    for shard_index in range(shard_count):
+        shard_path = get_edge_store_path(config, shard_index)
+        if os.path.exists(shard_path):
+            edges.load(shard_path)
+            os.remove(shard_path)
+    edges.save(get_edge_store_path(config))
+    return edges.count_edges()
+
+def merge_shard_aggregates(config: Dict[str, Any], shard_count: int) -> None:
+    """Merge shard partial aggregates and persist them into the merged store."""
+    aggregators = RelationshipAggregator.from_config(config)
+    if not aggregators:
+        return
+    for aggregator in aggregators:
+        for shard_index in range(shard_count):
+            shard_path = get_aggregate_path(config, aggregator.relationship_id, shard_index)
+            if os.path.exists(shard_path):
+                aggregator.load(shard_path)
+                os.remove(shard_path)
+
+    store = EntityStore()
+    store.configure(ComponentConfig(settings=get_store_settings(config)))
+    try:
+        persist_aggregates(config, aggregators, store.update_entity)
+    finally:
+        store.cleanup()
+
+def process_sharded(config: Dict[str, Any], input_file_path: str, workers: int) -> int:
+    """Process a CSV input across a process pool and return the record count."""
+    shards = compute_shards(input_file_path, workers, get_csv_format(config))
+    logger.info(f"Processing {input_file_path} in {len(shards)} shards with {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_shard, config, input_file_path, index, byte_range)
+            for index, byte_range in enumerate(shards)
+        ]
+        # Collect in shard order so results are deterministic
+        results = [future.result() for future in futures]
+
+    processed_count = sum(result['records'] for result in results)
+    merged = merge_shard_stores(config, len(shards))
+    logger.info(f"Processed {processed_count} total records, merged {merged} entities")
+    merge_shard_aggregates(config, len(shards))
+    if create_reference_index(config) is not None:
+        merge_shard_edges(config, len(shards))
+    return processed_count
+
+def process_input(config: Dict[str, Any], entity_mediator: EntityMediator, input_file_path: str,
+                  summary: Optional[Dict[str, Any]] = None) -> int:
+    """Run the sequential pipeline over an input file and return the record count.
+
+    Entities are extracted, stored through ``entity_mediator`` by the
+    entity stages with their references resolved, and relationship edges
+    and aggregates are written at the end.
+
+    Args:
+        summary: Filled with the ``unresolved_references`` report, the
+            ``aggregates`` persisted per relationship and the record
+            checks of ``check_records``, if given
+    """
+    profiler: Optional[Profiler] = None
+    references: Optional[ReferenceIndex] = None
+    try:
+        chunk_size = config.get('processing', {}).get('chunk_size', 1000)
+        scheduler = create_scheduler(config)
+        extractor = create_extractor(config, input_file_path, scheduler)
+        profiler = start_profiling(config, entity_mediator, extractor)
+        references = create_reference_index(config)
+        # Edges come from resolved references
+        edges = create_edge_store(config) if references is not None else None
+        aggregators = RelationshipAggregator.from_config(config)
+        records = read_records(config, input_file_path, summary=summary)
+        processed_count = process_records(entity_mediator, records, chunk_size,
+                                          extractor, references, edges, aggregators, scheduler)
+        unresolved = (report_unresolved_references(references, entity_mediator.update_entity, edges)
+                      if references is not None else None)
+        if edges is not None:
+            edges.save(get_edge_store_path(config))
+            logger.info(f"Saved {edges.count_edges()} relationship edges")
+        aggregates = persist_aggregates(config, aggregators, entity_mediator.update_entity)
+        if summary is not None:
+            summary.update(unresolved_references=unresolved, aggregates=aggregates)
+        return processed_count
+    except Exception as e:
+        logger.error(f"Processing failed: {str(e)}")
+        raise
+    finally:
+        stop_profiling(profiler, "process_transactions")
+        if references is not None:
+            references.close()
+
 @safe_operation
-def process_transactions(config_path: str, input_file: Optional[str] = None) -> None:
-    """Process transaction data using configuration."""
+def process_transactions(config_path: str, input_file: Optional[str] = None,
+                         workers: int = 1, summary: Optional[Dict[str, Any]] = None) -> None:
+    """Process transaction data using configuration.
+
+    Args:
+        config_path: Path to configuration file
+        input_file: Input file path overriding the configured one
+        workers: Number of worker processes; CSV inputs are sharded by
+            byte range when greater than one
+        summary: Filled with the number of ``records`` processed and, for
+            sequential runs, the mediator ``stats`` and the ``process_input``
+            summary, if given
+    """
     # Load configuration
     config_provider = ConfigProvider()
-    config = config_provider.load_config(config_path)
+    config_provider.load_config(config_path)
+    config = config_provider.get_config()
 
     if not config:
         raise ConfigurationError(f"Failed to load configuration from {config_path}")
@@ -82,48 +696,30 @@ def process_transactions(config_path: str, input_file: Optional[str] = None) ->
     if input_file:
         config['system']['io']['input']['file'] = input_file
 
+    if workers > 1:
+        input_file_path = config['system']['io']['input']['file']
+        if not os.path.exists(input_file_path):
+            raise FileNotFoundError(f"Input file not found: {input_file_path}")
+        if is_csv_input(input_file_path):
+            processed_count = process_sharded(config, input_file_path, workers)
+            if summary is not None:
+                summary['records'] = processed_count
+            return
+        logger.warning("Sharded processing requires CSV input, processing sequentially")
+
     # Set up components
     validation_service = setup_validation(config)
     entity_mediator = setup_entity_mediator(config, validation_service)
 
-    # Process entities using mediator
     try:
-        chunk_size = config.get('processing', {}).get('chunk_size', 1000)
         input_file_path = config['system']['io']['input']['file']
 
         if not os.path.exists(input_file_path):
             raise FileNotFoundError(f"Input file not found: {input_file_path}")
 
-        processed_count = 0
-        try:
-            with open(input_file_path, 'r', encoding='utf-8') as f:
-                chunk: list[Dict[str, Any]] = []
-                for line in f:
-                    try:
-                        record = json.loads(line)
-                        chunk.append(record)
-                        
-                        if len(chunk) >= chunk_size:
-                            process_chunk(entity_mediator, chunk)
-                            processed_count += len(chunk)
-                            logger.info(f"Processed {processed_count} records")
-                            chunk = []  # Clear the chunk
-                            
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Invalid JSON in line: {e}")
-                        continue
-
-                # Process remaining records
-                if chunk:
-                    process_chunk(entity_mediator, chunk)
-                    processed_count += len(chunk)
-                    logger.info(f"Processed {processed_count} total records")
-
-        except Exception as e:
-            logger.error(f"Processing failed: {str(e)}")
-            raise
-
+        processed_count = process_input(config, entity_mediator, input_file_path, summary)
+        if summary is not None:
+            summary.update(records=processed_count, stats=entity_mediator.get_stats())
     finally:
         # Clean up resources
         entity_mediator.cleanup()
@@ -154,16 +750,21 @@ def get_config_path(cli_config: Optional[str] = None) -> str:
 
 def main() -> None:
     """Main entry point."""
+    import colorama
+    from colorama import Fore, Style
+
     colorama.init()
     
     parser = argparse.ArgumentParser(description="Process USASpending transaction data")
     parser.add_argument('--config', help=f'Path to configuration file (default: {DEFAULT_CONFIG_PATH})')
     parser.add_argument('--input', help='Input file path (overrides config)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes for sharded CSV processing (default: 1)')
     args = parser.parse_args()
 
     try:
         config_path = get_config_path(args.config)
-        process_transactions(config_path, args.input)
+        process_transactions(config_path, args.input, workers=args.workers)
         print(f"{Fore.GREEN}Processing completed successfully{Style.RESET_ALL}")
 
     except Exception as e:
@@ -1,9 +1,8 @@
 """Chunked writing system for efficient batch processing of entities."""
-from typing import Dict, Any, List, Optional, Iterator, Generic, TypeVar, cast, Union
+from typing import Dict, Any, List, Optional, Iterator, Generic, TypeVar, Callable, cast, Union
 from abc import ABC, abstractmethod
 import threading
-from queue import Queue, Empty
-from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
 import time
 
 from .core.interfaces import IEntityStore
@@ -15,6 +14,9 @@ logger = get_logger(__name__)
 
 T = TypeVar('T', bound=DataclassProtocol)
 
+# Queued to stop a worker thread
+_STOP = object()
+
 class IChunkedWriter(ABC, Generic[T]):
     """Interface for chunked writing operations."""
     
@@ -34,17 +36,45 @@ class IChunkedWriter(ABC, Generic[T]):
         pass
 
 class ChunkedWriter(IChunkedWriter[T]):
-    """Processes and writes entities in chunks."""
+    """Processes and writes entities in chunks.
+
+    Full chunks go to a bounded queue drained by writer threads, so
+    producers block while storage lags instead of buffering without limit.
+
+    Without a ``store_factory`` one writer thread writes every chunk to
+    ``store``, so chunks are committed in the order they were written. With
+    a ``store_factory`` a fixed pool of writer threads each writes through
+    its own store, and so its own storage connection; each thread commits
+    its chunks in order, but a chunk may be committed before an earlier
+    chunk taken by another thread. Only use a pool when no entity is
+    written again in a later chunk, as the earlier version could win.
+    """
     
     def __init__(self, store: IEntityStore, serializer: IEntitySerializer[T],
                  chunk_size: int = 1000, max_retries: int = 3,
-                 worker_threads: int = 4):
-        """Initialize writer with store and configuration."""
+                 worker_threads: int = 4, max_pending_chunks: Optional[int] = None,
+                 store_factory: Optional[Callable[[], IEntityStore]] = None):
+        """Initialize writer with store and configuration.
+
+        Args:
+            store: Store to write to
+            serializer: Serializer of the written entities
+            chunk_size: Entities per written chunk
+            max_retries: Write attempts per entity before it counts as failed
+            worker_threads: Writer threads; one without a ``store_factory``
+            max_pending_chunks: Chunks queued before producers block;
+                defaults to twice the writer threads
+            store_factory: Creates a store per writer thread; writers share
+                ``store`` when not given
+        """
         self.store = store
         self.serializer = serializer
         self.chunk_size = chunk_size
         self.max_retries = max_retries
-        self.worker_threads = worker_threads
+        # Writers sharing a store would commit its chunks out of order
+        self.worker_threads = max(1, worker_threads) if store_factory is not None else 1
+        self.max_pending_chunks = max_pending_chunks or 2 * self.worker_threads
+        self.store_factory = store_factory
         
         self.buffer: List[T] = []
         self.stats: Dict[str, int] = {
@@ -52,133 +82,179 @@ class ChunkedWriter(IChunkedWriter[T]):
             'successful_writes': 0,
             'failed_writes': 0,
             'retries': 0,
-            'chunks_processed': 0
+            'chunks_processed': 0,
+            'backpressure_waits': 0
         }
         self._lock = threading.Lock()
-        self._queue: Queue[List[T]] = Queue()
-        self._executor = ThreadPoolExecutor(max_workers=worker_threads)
-        self._processing = False
+        self._queue: Queue = Queue(maxsize=self.max_pending_chunks)
+        self._workers: List[threading.Thread] = []
+        self._local = threading.local()
+
+    def _to_entity_data(self, entity: T) -> EntityData:
+        """Serialize an entity if needed."""
+        if hasattr(entity, '__dict__'):
+            return cast(EntityData, self.serializer.to_dict(entity))
+        return cast(EntityData, entity)
+
+    def _get_store(self) -> IEntityStore:
+        """Get the calling writer thread's store."""
+        return getattr(self._local, 'store', None) or self.store
+
+    def _write_batch(self, chunk: List[T]) -> bool:
+        """Write a chunk through the store's bulk path in one call."""
+        try:
+            entity_ids = self._get_store().save_entities(
+                cast(EntityType, self.serializer.entity_type),
+                [self._to_entity_data(entity) for entity in chunk]
+            )
+        except Exception as e:
+            logger.warning(f"Bulk chunk write failed, retrying per entity: {str(e)}")
+            return False
+        return entity_ids is not None and len(entity_ids) == len(chunk)
 
     def _write_chunk_with_retry(self, chunk: List[T]) -> None:
         """Write chunk with retry logic."""
-        retry_count = 0
-        failed_entities = []
+        if self._write_batch(chunk):
+            with self._lock:
+                self.stats['successful_writes'] += len(chunk)
+                self.stats['chunks_processed'] += 1
+            return
+
+        store = self._get_store()
+        attempts = 0
         successful_count = 0
         
-        while retry_count < self.max_retries and chunk:
+        while chunk:
             remaining_entities = []
-            
-            try:
-                # Process each entity in chunk
-                for entity in chunk:
-                    try:
-                        # Serialize if needed
-                        data = self.serializer.to_dict(entity) if hasattr(entity, '__dict__') else cast(Dict[str, Any], entity)
-                        
-                        # Save to store using proper EntityType
-                        self.store.save_entity(
-                            cast(EntityType, self.serializer.entity_type),
-                            cast(EntityData, data)
-                        )
-                        successful_count += 1
-                    except Exception as e:
-                        # Track failed entity for retry
-                        remaining_entities.append(entity)
-                        logger.error(f"Entity write failed: {str(e)}")
-                
-                # Update chunk to only include failed entities
-                chunk = remaining_entities
-
-            except Exception as e:
-                retry_count += 1
-                chunk = chunk  # Keep all entities for retry
-                
-                with self._lock:
-                    self.stats['retries'] += 1
-                    
-                if retry_count >= self.max_retries:
-                    logger.error(
-                        f"Failed to write chunk after {retry_count} retries: {e}"
+            for entity in chunk:
+                try:
+                    # Save to store using proper EntityType
+                    entity_id = store.save_entity(
+                        cast(EntityType, self.serializer.entity_type),
+                        self._to_entity_data(entity)
                     )
-                    failed_entities = chunk
+                except Exception as e:
+                    entity_id = None
+                    logger.error(f"Entity write failed: {str(e)}")
+                if entity_id is None:
+                    # Raised, or swallowed by a safe_operation store; retry it
+                    remaining_entities.append(entity)
                 else:
-                    backoff = min(5, retry_count)  # Cap maximum backoff
-                    time.sleep(backoff)
+                    successful_count += 1
+
+            # Retry only the entities that failed
+            chunk = remaining_entities
+            attempts += 1
+            if not chunk or attempts >= self.max_retries:
+                break
+            with self._lock:
+                self.stats['retries'] += 1
+            time.sleep(min(5, attempts))  # Cap maximum backoff
+
+        if chunk:
+            logger.error(f"Failed to write {len(chunk)} entities after {attempts} attempts")
 
         # Update stats once at the end
         with self._lock:
             self.stats['successful_writes'] += successful_count
-            self.stats['failed_writes'] += len(failed_entities)
+            self.stats['failed_writes'] += len(chunk)
             self.stats['chunks_processed'] += 1
 
-    def _process_buffer(self) -> bool:
-        """Process current buffer."""
-        if not self.buffer:
-            return True
-            
-        # Prepare chunk for processing
-        chunk = self.buffer[:self.chunk_size]
-        self.buffer = self.buffer[self.chunk_size:]
+    def _start_workers(self) -> None:
+        """Start the writer threads if they are not running."""
+        with self._lock:
+            if self._workers:
+                return
+            for index in range(self.worker_threads):
+                worker = threading.Thread(
+                    target=self._process_queue,
+                    name=f"chunked-writer-{index}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
 
-        # Add to processing queue
-        self._queue.put(chunk)
-        
-        # Start processing if not already running
-        if not self._processing:
-            self._start_processing()
-            
-        return True
-        
-    def _start_processing(self) -> None:
-        """Start background processing of chunks."""
-        self._processing = True
-        self._executor.submit(self._process_queue)
+    def _enqueue(self, chunk: List[T]) -> None:
+        """Queue a chunk, blocking while the queue is full."""
+        self._start_workers()
+        try:
+            self._queue.put_nowait(chunk)
+        except Full:
+            with self._lock:
+                self.stats['backpressure_waits'] += 1
+            self._queue.put(chunk)
         
     def _process_queue(self) -> None:
-        """Process chunks from queue."""
-        while True:
-            try:
-                # Get next chunk with timeout
-                chunk = self._queue.get(timeout=1.0)
-            except Empty:
-                # Stop if queue is empty
-                self._processing = False
-                break
-                
-            try:
-                self._write_chunk_with_retry(chunk)
-            finally:
-                self._queue.task_done()
+        """Write queued chunks until stopped."""
+        if self.store_factory is not None:
+            self._local.store = self.store_factory()
+        try:
+            while True:
+                chunk = self._queue.get()
+                try:
+                    if chunk is _STOP:
+                        return
+                    self._write_chunk_with_retry(chunk)
+                except Exception as e:
+                    # A failed chunk must not take the writer thread down
+                    logger.error(f"Chunk write failed: {str(e)}")
+                    with self._lock:
+                        self.stats['failed_writes'] += len(chunk)
+                finally:
+                    self._queue.task_done()
+        finally:
+            store = getattr(self._local, 'store', None)
+            if store is not None and hasattr(store, 'cleanup'):
+                store.cleanup()
                 
     def write_chunk(self, entities: List[T]) -> bool:
-        """Write a chunk of entities."""
+        """Write a chunk of entities.
+
+        Blocks while ``max_pending_chunks`` chunks are waiting to be written.
+        """
         if not entities:
             return True
             
         with self._lock:
             self.stats['total_entities'] += len(entities)
+            self.buffer.extend(entities)
+            chunks = []
+            while len(self.buffer) >= self.chunk_size:
+                chunks.append(self.buffer[:self.chunk_size])
+                self.buffer = self.buffer[self.chunk_size:]
 
-        # Add to buffer
-        self.buffer.extend(entities)
-        
-        # Process buffer if it reaches chunk size
-        if len(self.buffer) >= self.chunk_size:
-            return self._process_buffer()
-            
+        # Queue outside the lock so writer threads can update stats
+        for chunk in chunks:
+            self._enqueue(chunk)
         return True
         
     def flush(self) -> None:
-        """Flush any remaining entities in buffer."""
-        if self.buffer:
-            self._process_buffer()
-            
-        # Wait for all processing to complete
-        self._wait_for_processing()
+        """Write buffered entities and wait until every queued chunk is written."""
+        with self._lock:
+            chunks = [
+                self.buffer[start:start + self.chunk_size]
+                for start in range(0, len(self.buffer), self.chunk_size)
+            ]
+            self.buffer = []
+        for chunk in chunks:
+            self._enqueue(chunk)
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush and stop the writer threads."""
+        self.flush()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(_STOP)
+        for worker in workers:
+            worker.join()
         
     def get_stats(self) -> Dict[str, Any]:
         """Get writing statistics."""
         with self._lock:
             stats = dict(self.stats)
+        stats['queue_size'] = self._queue.qsize()
             
         # Calculate success rate avoiding float conversion
         total = stats['successful_writes'] + stats['failed_writes']
@@ -187,21 +263,26 @@ class ChunkedWriter(IChunkedWriter[T]):
             stats['success_rate'] = success_rate
             
         return stats
-        
-    def _wait_for_processing(self) -> None:
-        """Wait for all processing to complete."""
-        self._queue.join()
-        self._executor.shutdown(wait=True)
 
 class AsyncChunkedWriter(IChunkedWriter[T]):
-    """Asynchronous chunked writer implementation."""
+    """Chunked writer that hands chunks to a background dispatcher thread.
+
+    ``write_chunk`` returns once the chunk is queued. The queue is bounded,
+    and the dispatcher blocks on the base writer's own bounded queue, so a
+    lagging store slows producers down instead of growing memory.
+    """
     
-    def __init__(self, writer: ChunkedWriter[T]):
-        """Initialize with base writer."""
+    def __init__(self, writer: ChunkedWriter[T], max_pending_chunks: int = 16):
+        """Initialize with base writer.
+
+        Args:
+            writer: Writer the chunks are passed to
+            max_pending_chunks: Chunks queued before ``write_chunk`` blocks
+        """
         self.writer = writer
         self._write_thread: Optional[threading.Thread] = None
-        self._queue: Queue[List[T]] = Queue()
-        self._stop_event = threading.Event()
+        self._queue: Queue = Queue(maxsize=max_pending_chunks)
+        self._thread_lock = threading.Lock()
         
     def write_chunk(self, entities: List[T]) -> bool:
         """Asynchronously write chunk of entities."""
@@ -209,51 +290,55 @@ class AsyncChunkedWriter(IChunkedWriter[T]):
             return True
             
         # Start writer thread if not running
-        if not self._write_thread or not self._write_thread.is_alive():
-            self._start_writer_thread()
+        with self._thread_lock:
+            if not self._write_thread or not self._write_thread.is_alive():
+                self._start_writer_thread()
             
-        # Add to queue
+        # Blocks while the queue is full
         self._queue.put(entities)
         return True
         
     def flush(self) -> None:
-        """Flush pending writes and stop processing."""
-        # Signal stop
-        self._stop_event.set()
-        
-        # Wait for processing to complete
-        if self._write_thread and self._write_thread.is_alive():
-            self._write_thread.join()
-            
-        # Flush base writer
+        """Wait until every queued chunk is written."""
+        self._queue.join()
         self.writer.flush()
+
+    def close(self) -> None:
+        """Flush and stop the dispatcher and writer threads."""
+        self.flush()
+        with self._thread_lock:
+            thread, self._write_thread = self._write_thread, None
+        if thread and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+        self.writer.close()
         
     def get_stats(self) -> Dict[str, Any]:
         """Get writing statistics."""
         stats = self.writer.get_stats()
-        stats['queue_size'] = self._queue.qsize()
+        stats['queue_size'] += self._queue.qsize()
         return stats
         
     def _start_writer_thread(self) -> None:
         """Start background writer thread."""
-        self._stop_event.clear()
         self._write_thread = threading.Thread(
             target=self._process_queue,
+            name="async-chunked-writer",
             daemon=True
         )
         self._write_thread.start()
         
     def _process_queue(self) -> None:
-        """Process chunks from queue."""
-        while not self._stop_event.is_set():
+        """Pass queued chunks to the base writer until stopped."""
+        while True:
+            chunk = self._queue.get()
             try:
-                # Get chunk with timeout
-                chunk = self._queue.get(timeout=0.1)
-                try:
-                    self.writer.write_chunk(chunk)
-                finally:
-                    self._queue.task_done()
-            except Empty:
-                continue
+                if chunk is _STOP:
+                    return
+                self.writer.write_chunk(chunk)
+            except Exception as e:
+                logger.error(f"Async chunk write failed: {str(e)}")
+            finally:
+                self._queue.task_done()
 
 __all__ = ['ChunkedWriter', 'AsyncChunkedWriter']
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""Incremental aggregation of entities along relationships.
+
+A relationship in the ``relationships`` configuration may declare
+``aggregations``: running totals of its source entities kept per referenced
+target entity, e.g. the obligation sum, transaction count and first and last
+action dates of each contract along ``transaction_to_contract``. Totals are
+updated as source entities are ingested and written onto the target entity
+at the end of the run, so rollups need no extra scan.
+"""
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple, cast
+from array import array
+from decimal import Decimal, InvalidOperation
+import json
+import logging
+import threading
+
+from .exceptions import ConfigurationError, StorageError
+from .relationships import get_field_relationships
+from .types import EntityType
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_FUNCTIONS = ('sum', 'count', 'min', 'max')
+
+GroupKey = Tuple[str, ...]
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == ""
+
+def _get_value(entity: Dict[str, Any], field_name: str) -> Any:
+    """Get a field from an entity or its factory-created ``data`` payload."""
+    if field_name in entity:
+        return entity[field_name]
+    data = entity.get('data')
+    return data.get(field_name) if isinstance(data, dict) else None
+
+class _Column:
+    """Running values of one aggregate across all groups."""
+
+    def __init__(self, name: str, function: str, source: Optional[str], numeric: bool):
+        self.name = name
+        self.function = function
+        self.source = source
+        self.numeric = numeric
+        if function == 'count':
+            self.values: Any = array('q')
+        else:
+            self.values = []
+
+    def append_empty(self) -> None:
+        self.values.append(0 if self.function == 'count' else None)
+
+    def _convert(self, value: Any) -> Any:
+        if self.numeric or self.function == 'sum':
+            try:
+                return Decimal(str(value).replace(',', '').replace('$', '').strip())
+            except InvalidOperation:
+                return None
+        return str(value)
+
+    def update(self, slot: int, value: Any) -> None:
+        if self.function == 'count':
+            if self.source is None or not _is_empty(value):
+                self.values[slot] += 1
+            return
+        if _is_empty(value):
+            return
+        converted = self._convert(value)
+        if converted is None:
+            return
+        current = self.values[slot]
+        if current is None:
+            self.values[slot] = converted
+        elif self.function == 'sum':
+            self.values[slot] = current + converted
+        elif self.function == 'min':
+            self.values[slot] = min(current, converted)
+        else:
+            self.values[slot] = max(current, converted)
+
+    def combine(self, slot: int, value: Any) -> None:
+        """Fold another partial aggregate into a slot."""
+        if value is None:
+            return
+        if self.function == 'count':
+            self.values[slot] += int(value)
+            return
+        value = self._convert(value)
+        current = self.values[slot]
+        if current is None:
+            self.values[slot] = value
+        elif self.function == 'sum':
+            self.values[slot] = current + value
+        elif self.function == 'min':
+            self.values[slot] = min(current, value)
+        else:
+            self.values[slot] = max(current, value)
+
+class RelationshipAggregator:
+    """Running totals of source entities per referenced target entity.
+
+    Groups are keyed by the reference key of the source entity's reference
+    field for the relationship, e.g. ``contract_award_unique_key``. Each
+    aggregate is a column over group slots; counts use a packed integer
+    array.
+    """
+
+    def __init__(self, relationship_id: str, source_entity: str, target_entity: str,
+                 reference_field: str, fields: Dict[str, Dict[str, Any]],
+                 target_field: str = "aggregates"):
+        """Initialize aggregator.
+
+        Args:
+            relationship_id: Relationship the totals follow
+            source_entity: Aggregated entity type, e.g. ``transaction``
+            target_entity: Entity type holding the totals, e.g. ``contract``
+            reference_field: Source entity field referencing the target
+            fields: Aggregates by output name, each with ``function`` (sum,
+                count, min or max), an optional ``source`` field and
+                ``type: number`` to compare min/max numerically
+            target_field: Target entity field the totals are written to
+
+        Raises:
+            ConfigurationError: If an aggregate function is not supported
+        """
+        self.relationship_id = relationship_id
+        self.source_entity = source_entity
+        self.target_entity = target_entity
+        self.reference_field = reference_field
+        self.target_field = target_field
+        self._columns: List[_Column] = []
+        for name, spec in fields.items():
+            function = spec.get('function')
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ConfigurationError(
+                    f"Unsupported aggregate function {function!r} for {relationship_id}.{name}"
+                )
+            if function != 'count' and not spec.get('source'):
+                raise ConfigurationError(f"Aggregate {relationship_id}.{name} requires a source field")
+            self._columns.append(_Column(name, function, spec.get('source'), spec.get('type') == 'number'))
+        self._slots: Dict[GroupKey, int] = {}
+        self._key_names: Optional[Tuple[str, ...]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> List['RelationshipAggregator']:
+        """Create aggregators for relationships that declare ``aggregations``.
+
+        The reference field is the source entity's reference mapping that
+        names the relationship.
+
+        Raises:
+            ConfigurationError: If no reference field names the relationship
+        """
+        field_relationships = get_field_relationships(config.get('entities', {}))
+        aggregators = []
+        for definition in config.get('relationships') or []:
+            if not isinstance(definition, dict) or not definition.get('aggregations'):
+                continue
+            relationship_id = definition.get('id')
+            source_entity = definition.get('sourceEntity')
+            target_entity = definition.get('targetEntity')
+            if not (relationship_id and source_entity and target_entity):
+                raise ConfigurationError(
+                    f"Aggregated relationship {relationship_id or '?'} needs an id, sourceEntity and targetEntity"
+                )
+            reference_field = next(
+                (path for (entity_type, path), rid in field_relationships.items()
+                 if rid == relationship_id and entity_type == source_entity),
+                None
+            )
+            if reference_field is None:
+                raise ConfigurationError(
+                    f"No {source_entity} reference field for aggregated relationship {relationship_id}"
+                )
+            aggregations = definition['aggregations']
+            aggregators.append(cls(
+                str(relationship_id), str(source_entity), str(target_entity), reference_field,
+                aggregations.get('fields') or {}, aggregations.get('target_field', 'aggregates')
+            ))
+        return aggregators
+
+    def _group_key(self, entity: Dict[str, Any]) -> Optional[GroupKey]:
+        reference = entity.get(self.reference_field)
+        if not isinstance(reference, dict) or not isinstance(reference.get('key'), dict):
+            return None
+        key = reference['key']
+        if self._key_names is None:
+            self._key_names = tuple(key)
+        values = tuple("" if key.get(name) is None else str(key.get(name)) for name in self._key_names)
+        return values if any(values) else None
+
+    def _slot(self, key: GroupKey) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self._slots)
+            for column in self._columns:
+                column.append_empty()
+        return slot
+
+    def add(self, entity: Dict[str, Any]) -> bool:
+        """Fold a source entity into its group's totals.
+
+        Returns:
+            False if the entity has no reference to group by
+        """
+        key = self._group_key(entity)
+        if key is None:
+            return False
+        with self._lock:
+            slot = self._slot(key)
+            for column in self._columns:
+                column.update(slot, _get_value(entity, column.source) if column.source else None)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _totals(self, slot: int) -> Dict[str, Any]:
+        return {column.name: column.values[slot] for column in self._columns}
+
+    def get(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the totals of a group by its reference key."""
+        names = self._key_names or tuple(key)
+        slot = self._slots.get(tuple("" if key.get(name) is None else str(key.get(name)) for name in names))
+        return None if slot is None else self._totals(slot)
+
+    def items(self) -> Iterator[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """Iterate (reference key, totals) pairs."""
+        names = self._key_names or ()
+        for key, slot in list(self._slots.items()):
+            yield dict(zip(names, key)), self._totals(slot)
+
+    def merge(self, other: 'RelationshipAggregator') -> None:
+        """Fold another aggregator's partial totals, e.g. from a shard, into this one."""
+        for key, totals in other.items():
+            self._merge_totals(key, totals)
+
+    def _merge_totals(self, key: Dict[str, Any], totals: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._key_names is None:
+                self._key_names = tuple(key)
+            slot = self._slot(tuple(str(key.get(name, "")) for name in self._key_names))
+            for column in self._columns:
+                column.combine(slot, totals.get(column.name))
+
+    def persist(self, resolve_id: Callable[[str, Dict[str, Any]], Optional[str]],
+                update: Callable[[EntityType, str, Dict[str, Any]], bool]) -> Dict[str, int]:
+        """Write every group's totals onto its target entity.
+
+        Args:
+            resolve_id: Called as ``resolve_id(target_entity, key)`` to get
+                the target entity ID
+            update: Called as ``update(target_entity, entity_id, fields)``
+
+        Returns:
+            Counts of ``updated`` and ``unresolved`` groups
+        """
+        result = {'updated': 0, 'unresolved': 0}
+        for key, totals in self.items():
+            entity_id = resolve_id(self.target_entity, key)
+            if entity_id and update(cast(EntityType, self.target_entity), entity_id,
+                                    {self.target_field: _serializable(totals)}):
+                result['updated'] += 1
+            else:
+                result['unresolved'] += 1
+        if result['unresolved']:
+            logger.warning(
+                f"{result['unresolved']} {self.relationship_id} aggregates have no stored {self.target_entity}"
+            )
+        return result
+
+    def save(self, path: str) -> None:
+        """Write partial totals as JSON lines."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                for key, totals in self.items():
+                    f.write(json.dumps({'key': key, 'totals': _serializable(totals)}) + "\n")
+        except OSError as e:
+            raise StorageError(f"Failed to save aggregates to {path}: {str(e)}")
+
+    def load(self, path: str) -> None:
+        """Fold partial totals written by ``save`` into this aggregator."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    self._merge_totals(record['key'], record['totals'])
+        except (OSError, ValueError, KeyError) as e:
+            raise StorageError(f"Failed to load aggregates from {path}: {str(e)}")
+
+def _serializable(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert Decimal totals to strings so they keep their precision in JSON."""
+    return {name: str(value) if isinstance(value, Decimal) else value for name, value in totals.items()}
+
+__all__ = ['AGGREGATE_FUNCTIONS', 'RelationshipAggregator']
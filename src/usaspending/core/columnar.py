@@ -0,0 +1,287 @@
+"""Columnar transformation of record batches.
+
+Applies ``field_properties`` transformation operations to whole columns of a
+record batch instead of value by value. Each operation is compiled once into
+a column function, so a chunk costs one pass per column and operation.
+String operations are list comprehensions over the column's str methods.
+Parsing operations (dates, decimals) memoize on distinct values, which
+repeat heavily within a chunk.
+"""
+from typing import Dict, Any, List, Optional, Callable, Iterable, Mapping, Sequence, Tuple
+from datetime import datetime
+from decimal import Decimal
+import re
+
+from .exceptions import TransformationError
+from .error_sink import ErrorSink
+from .field_index import FieldPropertyIndex, get_field_index
+
+Column = List[Any]
+Columns = Dict[str, Column]
+# Column function: (column, all columns, error callback) -> transformed column
+ColumnFunc = Callable[[Column, Columns, Callable[[int, str], None]], Column]
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == ""
+
+def _string_op(func: Callable[[str], str]) -> ColumnFunc:
+    """Build a column function applying a string operation to string values."""
+    def apply(column: Column, columns: Columns, error: Callable[[int, str], None]) -> Column:
+        return [func(v) if type(v) is str else v for v in column]
+    return apply
+
+def _memoized_op(convert: Callable[[Any], Any], description: str) -> ColumnFunc:
+    """Build a column function converting each distinct non-empty value once.
+
+    Values that fail to convert are left unchanged and reported.
+    """
+    def apply(column: Column, columns: Columns, error: Callable[[int, str], None]) -> Column:
+        cache: Dict[Any, Any] = {}
+        failed = object()
+        result = []
+        for index, value in enumerate(column):
+            if _is_empty(value):
+                result.append(value)
+                continue
+            converted = cache.get(value, cache)
+            if converted is cache:
+                try:
+                    converted = convert(value)
+                except (ValueError, TypeError, ArithmeticError):
+                    converted = failed
+                cache[value] = converted
+            if converted is failed:
+                error(index, f"Invalid {description} value: {value}")
+                result.append(value)
+            else:
+                result.append(converted)
+        return result
+    return apply
+
+def _to_decimal(value: Any) -> Decimal:
+    result = Decimal(str(value).strip())
+    if not result.is_finite():
+        raise ValueError(f"Non-finite decimal: {value}")
+    return result
+
+def _compile_normalize_date(params: Dict[str, Any]) -> ColumnFunc:
+    input_formats = params.get('input_formats') or ["%Y-%m-%d"]
+    output_format = params.get('output_format', "%Y-%m-%d")
+
+    def normalize(value: Any) -> str:
+        if isinstance(value, datetime):
+            return value.strftime(output_format)
+        text = str(value).strip()
+        # Date part only; strip_time removes any time component later
+        date_text = text.split(' ')[0].split('T')[0]
+        for fmt in input_formats:
+            try:
+                return datetime.strptime(date_text, fmt).strftime(output_format)
+            except ValueError:
+                continue
+        raise ValueError(text)
+    return _memoized_op(normalize, "date")
+
+def _compile_strip_characters(params: Dict[str, Any]) -> ColumnFunc:
+    table = str.maketrans('', '', params.get('characters', ''))
+    return _string_op(lambda v: v.translate(table))
+
+def _compile_pad_left(params: Dict[str, Any]) -> ColumnFunc:
+    length = int(params.get('length', 0))
+    char = params.get('character', ' ')
+    # Empty values stay empty rather than becoming all padding
+    return _string_op(lambda v: v.rjust(length, char) if v else v)
+
+def _compile_truncate(params: Dict[str, Any]) -> ColumnFunc:
+    length = int(params.get('max_length', params.get('length', 0)))
+    return _string_op(lambda v: v[:length])
+
+def _compile_map_values(params: Dict[str, Any]) -> ColumnFunc:
+    mapping = params.get('mapping', {})
+    def apply(column: Column, columns: Columns, error: Callable[[int, str], None]) -> Column:
+        get = mapping.get
+        return [get(v, v) if type(v) is str else v for v in column]
+    return apply
+
+def _compile_normalize_boolean(params: Dict[str, Any]) -> ColumnFunc:
+    true_values = {str(v).upper() for v in params.get('true_values', ["Y", "YES", "TRUE", "T", "1"])}
+    false_values = {str(v).upper() for v in params.get('false_values', ["N", "NO", "FALSE", "F", "0"])}
+    as_string = params.get('output') == 'lowercase_string'
+
+    def normalize(value: Any) -> Any:
+        key = str(value).strip().upper()
+        if key in true_values:
+            return "true" if as_string else True
+        if key in false_values:
+            return "false" if as_string else False
+        raise ValueError(value)
+    return _memoized_op(normalize, "boolean")
+
+def _compile_normalize_zip(params: Dict[str, Any]) -> ColumnFunc:
+    def normalize(value: Any) -> str:
+        digits = re.sub(r"\D", "", str(value))
+        if len(digits) == 5:
+            return digits
+        if len(digits) == 9:
+            return f"{digits[:5]}-{digits[5:]}"
+        raise ValueError(value)
+    return _memoized_op(normalize, "ZIP code")
+
+def _compile_extract_pattern(params: Dict[str, Any]) -> ColumnFunc:
+    pattern = re.compile(params.get('pattern', ''))
+    def extract(value: Any) -> str:
+        # Digits-only view so formatted phone numbers match numeric patterns
+        text = str(value)
+        match = pattern.search(text) or pattern.search(re.sub(r"\W", "", text))
+        if not match:
+            raise ValueError(value)
+        return match.group(0)
+    return _memoized_op(extract, "pattern")
+
+def _compile_derive_fiscal_year(params: Dict[str, Any]) -> ColumnFunc:
+    source_field = params.get('source_field')
+    start_month = int(params.get('fiscal_year_start_month', 10))
+
+    def derive(value: Any) -> int:
+        date = datetime.strptime(str(value)[:10], "%Y-%m-%d")
+        return date.year + 1 if start_month > 1 and date.month >= start_month else date.year
+
+    derive_column = _memoized_op(derive, "fiscal year source")
+
+    def apply(column: Column, columns: Columns, error: Callable[[int, str], None]) -> Column:
+        source = columns.get(source_field) if source_field else None
+        if source is None:
+            return column
+        # Invalid source dates are reported by the source column's own pipeline
+        derived = derive_column(source, columns, lambda index, message: None)
+        # Keep existing values where the source date is missing or invalid
+        return [d if isinstance(d, int) else v for v, d in zip(column, derived)]
+    return apply
+
+OPERATION_COMPILERS: Dict[str, Callable[[Dict[str, Any]], ColumnFunc]] = {
+    'trim': lambda params: _string_op(str.strip),
+    'uppercase': lambda params: _string_op(str.upper),
+    'lowercase': lambda params: _string_op(str.lower),
+    'strip_characters': _compile_strip_characters,
+    'pad_left': _compile_pad_left,
+    'truncate': _compile_truncate,
+    'strip_time': lambda params: _string_op(lambda v: v.split(' ')[0].split('T')[0]),
+    'convert_to_decimal': lambda params: _memoized_op(_to_decimal, "decimal"),
+    'convert_to_integer': lambda params: _memoized_op(lambda v: int(_to_decimal(v)), "integer"),
+    'normalize_date': _compile_normalize_date,
+    'normalize_boolean': _compile_normalize_boolean,
+    'normalize_zip': _compile_normalize_zip,
+    'map_values': _compile_map_values,
+    'extract_pattern': _compile_extract_pattern,
+    'derive_fiscal_year': _compile_derive_fiscal_year,
+}
+
+# Operations that read other columns; their fields run after all others
+DEPENDENT_OPERATIONS = {'derive_fiscal_year'}
+
+def compile_operations(operations: Iterable[Dict[str, Any]]) -> Tuple[ColumnFunc, ...]:
+    """Compile a field's transformation operations into column functions.
+
+    Raises:
+        TransformationError: If an operation type is not supported
+    """
+    compiled = []
+    for operation in operations:
+        op_type = operation.get('type')
+        compiler = OPERATION_COMPILERS.get(op_type) if op_type else None
+        if compiler is None:
+            raise TransformationError(f"Unsupported transformation operation: {op_type}")
+        compiled.append(compiler(operation))
+    return tuple(compiled)
+
+def records_to_columns(records: Sequence[Dict[str, Any]], fields: Iterable[str]) -> Columns:
+    """Pivot records into column lists for the given fields."""
+    return {name: [record.get(name) for record in records] for name in fields}
+
+def columns_to_records(columns: Columns, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Write column lists back over copies of the records."""
+    names = list(columns)
+    result = []
+    for index, record in enumerate(records):
+        updated = dict(record)
+        for name in names:
+            if name in record:
+                updated[name] = columns[name][index]
+        result.append(updated)
+    return result
+
+class ColumnarTransformer:
+    """Applies compiled per-field transformation pipelines to column batches."""
+
+    def __init__(self, pipelines: Optional[Mapping[str, Sequence[Dict[str, Any]]]] = None,
+                 max_errors: Optional[int] = None):
+        """Initialize transformer.
+
+        Args:
+            pipelines: Transformation operations per field name
+            max_errors: Errors retained; defaults to the configured default
+        """
+        ordered = sorted(
+            (pipelines or {}).items(),
+            key=lambda item: any(op.get('type') in DEPENDENT_OPERATIONS for op in item[1])
+        )
+        self._pipelines: Dict[str, Tuple[ColumnFunc, ...]] = {
+            name: compile_operations(operations) for name, operations in ordered
+        }
+        # Errors are counted per field
+        self.errors = ErrorSink(max_errors)
+
+    @classmethod
+    def from_field_properties(cls, field_properties: Dict[str, Any],
+                              columns: Iterable[str]) -> 'ColumnarTransformer':
+        """Create transformer for the given columns from ``field_properties``.
+
+        Field lists may contain wildcard patterns; operations of every group
+        matching a column are applied in configuration order.
+        """
+        return cls.from_field_index(get_field_index(field_properties, list(columns)))
+
+    @classmethod
+    def from_field_index(cls, index: FieldPropertyIndex,
+                         max_errors: Optional[int] = None) -> 'ColumnarTransformer':
+        """Create transformer for the columns of a resolved field property index."""
+        return cls(index.get_pipelines(), max_errors)
+
+    @property
+    def fields(self) -> List[str]:
+        """Fields with a transformation pipeline."""
+        return list(self._pipelines)
+
+    def transform_columns(self, columns: Columns) -> Columns:
+        """Transform columns in place of a copy; columns without a pipeline pass through."""
+        result = dict(columns)
+        for name, pipeline in self._pipelines.items():
+            column = result.get(name)
+            if column is None:
+                continue
+            def error(index: int, message: str, name: str = name) -> None:
+                self.errors.add(name, message, field=name, row_index=index)
+            for operation in pipeline:
+                column = operation(column, result, error)
+            result[name] = column
+        return result
+
+    def transform_records(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transform a batch of records column by column."""
+        if not records:
+            return []
+        present = [name for name in self._pipelines if name in records[0]]
+        columns = self.transform_columns(records_to_columns(records, present))
+        return columns_to_records(columns, records)
+
+    def clear_errors(self) -> None:
+        """Clear recorded transformation errors."""
+        self.errors.clear()
+
+__all__ = [
+    'ColumnarTransformer',
+    'OPERATION_COMPILERS',
+    'columns_to_records',
+    'compile_operations',
+    'records_to_columns'
+]
@@ -0,0 +1,390 @@
+"""Streaming CSV ingestion with schema-aware column projection."""
+import csv
+import io
+import re
+from dataclasses import dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Set, Iterable, Callable, Sequence, Tuple, Union
+
+from .exceptions import FileOperationError
+
+# Placeholders in template mappings, e.g. "{awarding_agency_code}"
+TEMPLATE_FIELD_PATTERN = re.compile(r"\{([^{}]+)\}")
+
+# Read buffer for large input files
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+@dataclass
+class CSVFormat:
+    """CSV dialect settings from ``system.formats.csv``."""
+    encoding: str = "utf-8-sig"
+    delimiter: str = ","
+    quotechar: str = '"'
+    has_header_row: bool = True
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> 'CSVFormat':
+        """Create format from configuration settings."""
+        settings = settings or {}
+        return cls(
+            encoding=settings.get('encoding', cls.encoding),
+            delimiter=settings.get('delimiter', cls.delimiter),
+            quotechar=settings.get('quotechar', cls.quotechar),
+            has_header_row=settings.get('has_header_row', cls.has_header_row)
+        )
+
+def _collect_object_fields(config: Dict[str, Any], columns: Set[str],
+                           header: Optional[Set[str]] = None) -> None:
+    """Collect source columns from an object mapping, including nested objects.
+
+    With a known header, field values that are not columns are constants
+    (e.g. ``type: primary``) and are not collected.
+    """
+    for value in config.get('fields', {}).values():
+        if isinstance(value, str):
+            if header is None or value in header:
+                columns.add(value)
+        elif isinstance(value, dict):
+            _collect_mapping_value(value, columns, header)
+    for nested in config.get('nested_objects', {}).values():
+        if isinstance(nested, dict):
+            _collect_object_fields(nested, columns, header)
+
+def _collect_mapping_value(config: Dict[str, Any], columns: Set[str],
+                           header: Optional[Set[str]] = None) -> None:
+    """Collect source columns from a single mapping definition."""
+    if config.get('type') == 'template':
+        for template in config.get('templates', {}).values():
+            columns.update(TEMPLATE_FIELD_PATTERN.findall(str(template)))
+    else:
+        _collect_object_fields(config, columns, header)
+
+MAPPING_TYPES = ('direct', 'multi_source', 'object', 'reference', 'template')
+
+def get_role_field_mappings(entity_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Get the field mappings of every entity a source row holds of a type.
+
+    An entity type listed once per row has its ``field_mappings``. One that
+    appears in several roles, e.g. a recipient address and a place of
+    performance location, lists them under ``roles``; each role's
+    ``field_mappings`` are merged over the shared ``field_mappings``.
+    """
+    shared = entity_config.get('field_mappings') or {}
+    roles = entity_config.get('roles') or {}
+    if not roles:
+        return [shared]
+    mapping_sets = []
+    for role in roles.values():
+        own = (role or {}).get('field_mappings') or {}
+        mapping_sets.append({
+            mapping_type: {**(shared.get(mapping_type) or {}), **(own.get(mapping_type) or {})}
+            for mapping_type in MAPPING_TYPES
+        })
+    return mapping_sets
+
+def get_reference_key_columns(mapping: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Get the (referenced key field, source column) pairs of an entity reference.
+
+    ``key_fields`` maps key fields to columns; given as a list, columns are
+    the key fields with ``key_prefix``.
+    """
+    key_fields = mapping.get('key_fields') or []
+    if isinstance(key_fields, dict):
+        return [(str(name), str(column)) for name, column in key_fields.items()]
+    prefix = mapping.get('key_prefix')
+    return [(key_field, f"{prefix}_{key_field}" if prefix else key_field) for key_field in key_fields]
+
+def _collect_field_mappings(field_mappings: Dict[str, Any], columns: Set[str],
+                            header: Optional[Set[str]] = None) -> None:
+    """Collect source columns from one set of entity field mappings."""
+    columns.update(
+        source for source in (field_mappings.get('direct') or {}).values()
+        if isinstance(source, str)
+    )
+
+    for mapping in (field_mappings.get('multi_source') or {}).values():
+        columns.update(mapping.get('sources', []))
+
+    for mapping in (field_mappings.get('object') or {}).values():
+        if isinstance(mapping, dict):
+            _collect_object_fields(mapping, columns, header)
+
+    for mapping in (field_mappings.get('reference') or {}).values():
+        if not isinstance(mapping, dict):
+            continue
+        if 'key_field' in mapping:
+            columns.add(mapping['key_field'])
+        columns.update(column for _, column in get_reference_key_columns(mapping))
+
+    for mapping in (field_mappings.get('template') or {}).values():
+        if isinstance(mapping, dict):
+            _collect_mapping_value(mapping, columns, header)
+
+def get_source_columns(entities: Dict[str, Any], header: Optional[Sequence[str]] = None) -> Set[str]:
+    """Get the source columns referenced by ``entities.*.field_mappings`` and their roles.
+
+    Args:
+        entities: The ``entities`` section of the conversion configuration
+        header: Input header; object mapping values that are not columns
+            are then treated as constants, as the entity extractor does
+
+    Returns:
+        Set of CSV column names needed to build the configured entities
+    """
+    columns: Set[str] = set()
+    header_columns = set(header) if header is not None else None
+
+    for entity_config in entities.values():
+        if not isinstance(entity_config, dict):
+            continue
+        for field_mappings in get_role_field_mappings(entity_config):
+            _collect_field_mappings(field_mappings, columns, header_columns)
+
+    return columns
+
+ByteRange = Tuple[int, int]
+
+class _ByteRangeReader(io.RawIOBase):
+    """Raw reader limited to a byte range of an open binary file."""
+
+    def __init__(self, raw: io.BufferedReader, length: int):
+        self._raw = raw
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        count = self._raw.readinto(view) or 0
+        self._remaining -= count
+        return count
+
+def read_header(file_path: Union[str, Path],
+                csv_format: Optional[CSVFormat] = None) -> Tuple[List[str], int]:
+    """Read the header row.
+
+    Returns:
+        Tuple of header column names and the byte offset of the first record
+    """
+    fmt = csv_format or CSVFormat()
+    quote = fmt.quotechar.encode('ascii')
+    with open(file_path, 'rb') as f:
+        raw = f.readline()
+        # A quoted header name may span lines
+        while raw.count(quote) % 2:
+            line = f.readline()
+            if not line:
+                break
+            raw += line
+        offset = f.tell()
+
+    text = raw.decode(fmt.encoding)
+    header = next(csv.reader([text], delimiter=fmt.delimiter, quotechar=fmt.quotechar), [])
+    return header, offset
+
+def compute_shards(file_path: Union[str, Path], shard_count: int,
+                   csv_format: Optional[CSVFormat] = None,
+                   block_size: int = DEFAULT_BUFFER_SIZE) -> List[ByteRange]:
+    """Split a CSV file into byte ranges aligned to record boundaries.
+
+    Boundaries are placed after a newline that is not inside a quoted field,
+    tracked by quote parity, so multi-line quoted values are never split.
+    The quote character must be ASCII.
+
+    Args:
+        file_path: Path to the CSV file
+        shard_count: Desired number of shards
+        csv_format: Dialect settings
+        block_size: Scan block size in bytes
+
+    Returns:
+        Ordered list of (start, end) byte offsets covering all data records
+    """
+    fmt = csv_format or CSVFormat()
+    path = Path(file_path)
+    if not path.exists():
+        raise FileOperationError(f"File not found: {file_path}")
+
+    data_start = read_header(path, fmt)[1] if fmt.has_header_row else 0
+    size = path.stat().st_size
+    if shard_count <= 1 or size <= data_start:
+        return [(data_start, size)] if size > data_start else []
+
+    quote = fmt.quotechar.encode('ascii')
+    targets = [data_start + (size - data_start) * i // shard_count for i in range(1, shard_count)]
+    boundaries = [data_start]
+    in_quotes = False
+    offset = data_start
+    t = 0
+
+    with open(path, 'rb') as f:
+        f.seek(data_start)
+        while t < len(targets):
+            block = f.read(block_size)
+            if not block:
+                break
+            pos = 0
+            while t < len(targets):
+                if targets[t] < boundaries[-1]:
+                    t += 1
+                    continue
+                newline = block.find(b'\n', max(pos, targets[t] - offset))
+                if newline < 0:
+                    break
+                if block.count(quote, pos, newline) % 2:
+                    in_quotes = not in_quotes
+                pos = newline + 1
+                if not in_quotes:
+                    boundaries.append(offset + pos)
+                    t += 1
+            if block.count(quote, pos) % 2:
+                in_quotes = not in_quotes
+            offset += len(block)
+
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+class StreamingCSVReader:
+    """Streams CSV records, materializing only the projected columns."""
+
+    def __init__(self, file_path: Union[str, Path],
+                 csv_format: Optional[CSVFormat] = None,
+                 columns: Optional[Iterable[str]] = None,
+                 fieldnames: Optional[Sequence[str]] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 byte_range: Optional[ByteRange] = None):
+        """Initialize reader.
+
+        Args:
+            file_path: Path to the CSV file
+            csv_format: Dialect settings, defaults to FPDS bulk download format
+            columns: Columns to materialize, or None for all columns
+            fieldnames: Header to use when the file has no header row
+            buffer_size: Read buffer size in bytes
+            byte_range: Only read records within this (start, end) range,
+                as produced by ``compute_shards``
+        """
+        self.file_path = Path(file_path)
+        self.csv_format = csv_format or CSVFormat()
+        self.columns: Optional[Set[str]] = set(columns) if columns is not None else None
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.buffer_size = buffer_size
+        self.byte_range = byte_range
+        self.header: List[str] = []
+        self.projected_columns: List[str] = []
+        self.missing_columns: Set[str] = set()
+        self.rows_read = 0
+
+        if not self.csv_format.has_header_row and not self.fieldnames:
+            raise FileOperationError("fieldnames are required when CSV has no header row")
+
+    def _build_projection(self, header: List[str]) -> Callable[[List[str]], Dict[str, str]]:
+        """Build a row-to-record function for the projected columns."""
+        self.header = header
+        if self.columns is None:
+            indices = list(range(len(header)))
+        else:
+            indices = [i for i, name in enumerate(header) if name in self.columns]
+            self.missing_columns = self.columns.difference(header)
+
+        names = tuple(header[i] for i in indices)
+        self.projected_columns = list(names)
+        width = max(indices) + 1 if indices else 0
+
+        if not indices:
+            return lambda row: {}
+
+        getter = itemgetter(*indices)
+        if len(indices) == 1:
+            name = names[0]
+            index = indices[0]
+
+            def project_single(row: List[str]) -> Dict[str, str]:
+                return {name: row[index] if index < len(row) else ""}
+            return project_single
+
+        def project(row: List[str]) -> Dict[str, str]:
+            if len(row) < width:
+                # Short row: pad missing trailing values
+                return {n: (row[i] if i < len(row) else "") for n, i in zip(names, indices)}
+            return dict(zip(names, getter(row)))
+        return project
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        """Stream projected records."""
+        if not self.file_path.exists():
+            raise FileOperationError(f"File not found: {self.file_path}")
+
+        if self.byte_range is not None:
+            yield from self._iter_range(self.byte_range)
+            return
+
+        fmt = self.csv_format
+        with open(self.file_path, 'r', encoding=fmt.encoding, newline='',
+                  buffering=self.buffer_size) as f:
+            reader = csv.reader(f, delimiter=fmt.delimiter, quotechar=fmt.quotechar)
+
+            if fmt.has_header_row:
+                header = next(reader, None)
+                if header is None:
+                    return
+                if self.fieldnames:
+                    header = self.fieldnames
+            else:
+                header = list(self.fieldnames or [])
+
+            yield from self._iter_rows(reader, header)
+
+    def _iter_range(self, byte_range: ByteRange) -> Iterator[Dict[str, str]]:
+        """Stream projected records from a byte range of the file."""
+        fmt = self.csv_format
+        if self.fieldnames:
+            header = list(self.fieldnames)
+        else:
+            header = read_header(self.file_path, fmt)[0]
+
+        start, end = byte_range
+        with open(self.file_path, 'rb') as raw:
+            raw.seek(start)
+            buffered = io.BufferedReader(_ByteRangeReader(raw, end - start), self.buffer_size)
+            # Decode without BOM handling; a BOM can only precede the header
+            encoding = 'utf-8' if fmt.encoding.lower() == 'utf-8-sig' else fmt.encoding
+            with io.TextIOWrapper(buffered, encoding=encoding, newline='') as f:
+                reader = csv.reader(f, delimiter=fmt.delimiter, quotechar=fmt.quotechar)
+                yield from self._iter_rows(reader, header)
+
+    def _iter_rows(self, reader: Iterator[List[str]], header: List[str]) -> Iterator[Dict[str, str]]:
+        """Project parsed rows to records."""
+        project = self._build_projection(header)
+        for row in reader:
+            if not row:
+                continue
+            self.rows_read += 1
+            yield project(row)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+        """Stream projected records in chunks of at most ``chunk_size``."""
+        chunk: List[Dict[str, str]] = []
+        for record in self:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+__all__ = [
+    'ByteRange',
+    'CSVFormat',
+    'StreamingCSVReader',
+    'TEMPLATE_FIELD_PATTERN',
+    'compute_shards',
+    'get_reference_key_columns',
+    'get_role_field_mappings',
+    'get_source_columns',
+    'read_header'
+]
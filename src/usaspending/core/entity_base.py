@@ -1,6 +1,6 @@
 """Core entity functionality and base implementations."""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List, TypeVar, Generic, Type, Union, Generator, Callable
+from typing import Dict, Any, Optional, List, TypeVar, Generic, Type, Union, Generator, Callable, Iterable
 from dataclasses import dataclass
 
 from .types import (
@@ -12,6 +12,8 @@ from .interfaces import (
     IValidationMediator
 )
 from .exceptions import EntityError
+from .error_sink import ErrorSink
+from .metrics import MetricsRegistry
 
 T = TypeVar('T')
 
@@ -23,19 +25,16 @@ class EntityMediatorConfig:
     strict_mode: bool = False
     batch_size: int = 1000
 
+MEDIATOR_COUNTERS = ("created", "stored", "retrieved", "validated", "errors")
+
 class BaseEntityMediator(ABC):
     """Base implementation for entity mediator."""
     
     def __init__(self) -> None:
         """Initialize base mediator."""
-        self._errors: List[str] = []
-        self._stats: Dict[str, int] = {
-            "created": 0,
-            "stored": 0,
-            "retrieved": 0,
-            "validated": 0,
-            "errors": 0
-        }
+        self._errors = ErrorSink()
+        # Per-thread counters and stage latencies, merged on read
+        self._metrics = MetricsRegistry()
         self._initialized = False
         self._strict_mode = False
 
@@ -81,9 +80,14 @@ class BaseEntityMediator(ABC):
         """Get validation errors."""
         return self._errors.copy()
 
-    def get_stats(self) -> Dict[str, int]:
-        """Get operation statistics."""
-        return self._stats.copy()
+    def get_stats(self) -> Dict[str, Any]:
+        """Get operation counters, per-stage latency summaries and rates per second."""
+        snapshot = self._metrics.snapshot()
+        stats: Dict[str, Any] = {name: 0 for name in MEDIATOR_COUNTERS}
+        stats.update(snapshot['counters'])
+        stats['latency'] = snapshot['latency']
+        stats['rates'] = snapshot['rates']
+        return stats
 
     def clear_errors(self) -> None:
         """Clear error state."""
@@ -100,7 +104,7 @@ class BaseEntityFactory(IEntityFactory):
     def __init__(self) -> None:
         """Initialize base factory."""
         self._entity_configs: Dict[str, EntityConfig] = {}
-        self._errors: List[str] = []
+        self._errors = ErrorSink()
         self._type_registry: Dict[str, Type] = {}
         
     @abstractmethod
@@ -145,7 +149,7 @@ class BaseEntityStore(IEntityStore, ABC):
     
     def __init__(self) -> None:
         """Initialize base store."""
-        self._errors: List[str] = []
+        self._errors = ErrorSink()
         self._initialized = False
         
     def _check_initialized(self) -> None:
@@ -158,6 +162,10 @@ class BaseEntityStore(IEntityStore, ABC):
         """Save an entity and return its ID."""
         pass
 
+    def save_entities(self, entity_type: EntityType, entities: Iterable[EntityData]) -> List[str]:
+        """Save entities in bulk and return their IDs."""
+        return [self.save_entity(entity_type, entity) for entity in entities]
+
     @abstractmethod
     def get_entity(self, entity_type: EntityType, entity_id: str) -> Optional[EntityData]:
         """Get an entity by ID."""
@@ -239,7 +247,7 @@ class BaseEntityMapper(IEntityMapper, ABC):
     
     def __init__(self) -> None:
         """Initialize entity mapper."""
-        self._errors: List[str] = []
+        self._errors = ErrorSink()
         self._calc_functions: Dict[str, Callable] = {}
         self._initialized = False
         
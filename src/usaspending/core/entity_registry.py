@@ -0,0 +1,165 @@
+"""Registries of entity keys with bounded memory."""
+from typing import Dict, Optional
+import os
+import sqlite3
+import tempfile
+import threading
+
+from .exceptions import StorageError
+
+class SpillableKeyStore:
+    """Map of encoded keys to values with a bounded in-memory tier.
+
+    Keys are kept in memory until ``max_memory_keys`` is reached, then
+    spilled to a SQLite file so memory stays bounded on arbitrarily large
+    inputs. Lookups check memory first and only hit the spill file once a
+    spill has happened. The first value put for a key is kept.
+
+    The store is not locked; owners serialize access.
+    """
+
+    def __init__(self, max_memory_keys: int = 1_000_000, spill_path: Optional[str] = None,
+                 spill_prefix: str = "keys-"):
+        """Initialize store.
+
+        Args:
+            max_memory_keys: Keys held in memory before spilling to disk
+            spill_path: Spill file path, defaults to a temporary file removed on close
+            spill_prefix: Name prefix of the temporary spill file
+        """
+        if max_memory_keys < 1:
+            raise StorageError("max_memory_keys must be at least 1")
+        self.max_memory_keys = max_memory_keys
+        self.spill_path = spill_path
+        self.spill_prefix = spill_prefix
+        self._owns_spill_file = spill_path is None
+        self._memory: Dict[bytes, str] = {}
+        self._spill: Optional[sqlite3.Connection] = None
+        self._spilled_count = 0
+
+    def _open_spill(self) -> sqlite3.Connection:
+        """Open the spill database."""
+        if self._spill is None:
+            if self.spill_path is None:
+                fd, self.spill_path = tempfile.mkstemp(prefix=self.spill_prefix, suffix=".db")
+                os.close(fd)
+            try:
+                self._spill = sqlite3.connect(self.spill_path, check_same_thread=False)
+                self._spill.execute("PRAGMA journal_mode=OFF")
+                self._spill.execute("PRAGMA synchronous=OFF")
+                self._spill.execute(
+                    "CREATE TABLE IF NOT EXISTS keys (key BLOB PRIMARY KEY, value TEXT) WITHOUT ROWID"
+                )
+            except sqlite3.Error as e:
+                raise StorageError(f"Failed to open key spill file: {str(e)}")
+        return self._spill
+
+    def _spill_memory(self) -> None:
+        """Move in-memory keys to the spill file."""
+        conn = self._open_spill()
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO keys (key, value) VALUES (?, ?)",
+                             self._memory.items())
+        self._spilled_count += len(self._memory)
+        self._memory.clear()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Get the value of a key, or None if it is not present."""
+        value = self._memory.get(key)
+        if value is not None or self._spill is None:
+            return value
+        row = self._spill.execute("SELECT value FROM keys WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: bytes, value: str = "") -> bool:
+        """Add a key unless present.
+
+        Returns:
+            True if the key was added
+        """
+        if self.get(key) is not None:
+            return False
+        if len(self._memory) >= self.max_memory_keys:
+            self._spill_memory()
+        self._memory[key] = value
+        return True
+
+    def __len__(self) -> int:
+        return self._spilled_count + len(self._memory)
+
+    @property
+    def spilled(self) -> bool:
+        """Whether keys have been spilled to disk."""
+        return self._spill is not None
+
+    def close(self) -> None:
+        """Release memory and the spill file."""
+        self._memory.clear()
+        self._spilled_count = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            if self._owns_spill_file and self.spill_path:
+                try:
+                    os.remove(self.spill_path)
+                except OSError:
+                    pass
+                self.spill_path = None
+
+class SeenKeyRegistry:
+    """Set of seen entity keys with a bounded in-memory tier.
+
+    Keys are held as compact digests in a ``SpillableKeyStore``.
+    """
+
+    def __init__(self, max_memory_keys: int = 1_000_000, spill_path: Optional[str] = None):
+        """Initialize registry.
+
+        Args:
+            max_memory_keys: Keys held in memory before spilling to disk
+            spill_path: Spill file path, defaults to a temporary file removed on close
+        """
+        self._keys = SpillableKeyStore(max_memory_keys, spill_path, spill_prefix="seen-keys-")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(key: str) -> bytes:
+        """Encode a key compactly; hex digests are stored as raw bytes."""
+        try:
+            return bytes.fromhex(key)
+        except ValueError:
+            return key.encode('utf-8')
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        """Spill file path, once known."""
+        return self._keys.spill_path
+
+    def add(self, key: str) -> bool:
+        """Add a key.
+
+        Returns:
+            True if the key had not been seen before
+        """
+        encoded = self._encode(key)
+        with self._lock:
+            return self._keys.put(encoded)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._keys.get(self._encode(key)) is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def spilled(self) -> bool:
+        """Whether keys have been spilled to disk."""
+        return self._keys.spilled
+
+    def close(self) -> None:
+        """Release memory and the spill file."""
+        with self._lock:
+            self._keys.close()
+
+__all__ = ['SeenKeyRegistry', 'SpillableKeyStore']
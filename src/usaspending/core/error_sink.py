@@ -0,0 +1,187 @@
+"""Bounded, structured error collection."""
+from typing import Dict, Any, List, Optional, Iterable, Iterator, NamedTuple
+from collections import deque
+from decimal import Decimal
+import threading
+
+# Used when a sink is created without an explicit bound; set from
+# validation_service.max_errors at startup
+DEFAULT_MAX_ERRORS = 1000
+
+# Longest string value kept as a value reference
+MAX_VALUE_LENGTH = 64
+
+# Rule id used for plain message errors
+UNCLASSIFIED = "error"
+
+_default_max_errors = DEFAULT_MAX_ERRORS
+
+def set_default_max_errors(max_errors: int) -> None:
+    """Set the bound used by sinks created without an explicit ``max_errors``."""
+    global _default_max_errors
+    _default_max_errors = max(1, int(max_errors))
+
+def get_default_max_errors() -> int:
+    """Get the bound used by sinks created without an explicit ``max_errors``."""
+    return _default_max_errors
+
+class ErrorRecord(NamedTuple):
+    """Structured error entry."""
+    rule_id: str
+    message: str
+    field: Optional[str] = None
+    row_index: Optional[int] = None
+    value_ref: Any = None
+
+class _FormatArgs(dict):
+    """Format arguments that leave unknown placeholders in place."""
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+def _value_ref(value: Any) -> Any:
+    """Get a small reference to a value, truncating long strings and objects."""
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= MAX_VALUE_LENGTH else value[:MAX_VALUE_LENGTH] + "..."
+    text = repr(value)
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH] + "..."
+
+class ErrorSink:
+    """Ring buffer of structured errors with per-rule counters.
+
+    Only the most recent ``max_errors`` entries are kept, while counters
+    track every error, so memory stays flat on dirty input. Messages are
+    stored as templates and formatted with ``{field}``, ``{value}``,
+    ``{rule_id}`` and ``{row}`` only when read. The sink also supports the
+    list operations error paths already use (``append``, ``extend``,
+    ``copy``, ``clear``, ``len`` and iteration over messages).
+    """
+
+    def __init__(self, max_errors: Optional[int] = None):
+        """Initialize sink.
+
+        Args:
+            max_errors: Entries to keep; defaults to ``get_default_max_errors()``
+        """
+        self._records: deque = deque(maxlen=max(1, max_errors or _default_max_errors))
+        self._counts: Dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_errors(self) -> int:
+        """Maximum number of retained entries."""
+        return self._records.maxlen or 0
+
+    def add(self, rule_id: Optional[str], message: str, field: Optional[str] = None,
+            row_index: Optional[int] = None, value: Any = None) -> None:
+        """Record an error.
+
+        Args:
+            rule_id: Id of the failed rule
+            message: Message, or a template when field or value is given
+            field: Field name
+            row_index: Input row index
+            value: Offending value; only a short reference is kept
+        """
+        rule_id = rule_id or UNCLASSIFIED
+        record = ErrorRecord(rule_id, message, field, row_index, _value_ref(value))
+        with self._lock:
+            self._records.append(record)
+            self._counts[rule_id] = self._counts.get(rule_id, 0) + 1
+            self._total += 1
+
+    def append(self, message: str) -> None:
+        """Record a plain message error."""
+        self.add(None, message)
+
+    def extend(self, messages: Iterable[str]) -> None:
+        """Record plain message errors."""
+        for message in messages:
+            self.add(None, message)
+
+    @staticmethod
+    def format(record: ErrorRecord) -> str:
+        """Format a record's message."""
+        if record.field is None and record.value_ref is None and record.row_index is None:
+            return record.message
+        try:
+            return record.message.format_map(_FormatArgs(
+                field=record.field, value=record.value_ref,
+                rule_id=record.rule_id, row=record.row_index
+            ))
+        except (ValueError, IndexError, AttributeError):
+            return record.message
+
+    @property
+    def total(self) -> int:
+        """Number of errors recorded, including ones no longer retained."""
+        return self._total
+
+    @property
+    def dropped(self) -> int:
+        """Number of errors evicted from the buffer."""
+        return self._total - len(self._records)
+
+    def counts(self) -> Dict[str, int]:
+        """Get error counts per rule id."""
+        with self._lock:
+            return dict(self._counts)
+
+    def records(self) -> List[ErrorRecord]:
+        """Get retained structured entries, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def messages(self) -> List[str]:
+        """Get retained messages, oldest first."""
+        return [self.format(record) for record in self.records()]
+
+    def copy(self) -> List[str]:
+        """Get retained messages as a list."""
+        return self.messages()
+
+    def merge(self, other: 'ErrorSink') -> None:
+        """Fold another sink's entries and counters into this one."""
+        records = other.records()
+        counts = other.counts()
+        with self._lock:
+            self._records.extend(records)
+            for rule_id, count in counts.items():
+                self._counts[rule_id] = self._counts.get(rule_id, 0) + count
+            self._total += other.total
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sinks travel back from worker processes; locks do not pickle
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._records.clear()
+            self._counts.clear()
+            self._total = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.messages())
+
+__all__ = [
+    'DEFAULT_MAX_ERRORS',
+    'ErrorRecord',
+    'ErrorSink',
+    'get_default_max_errors',
+    'set_default_max_errors'
+]
@@ -0,0 +1,251 @@
+"""Single-pass extraction of every configured entity from a source row.
+
+Each transaction row carries the data of the agency, recipient, location,
+contract and transaction entities. ``EntityExtractor`` compiles every
+entity's ``field_mappings`` (direct, multi_source, object, reference and
+template) into getter functions once, then builds all entities from a row in
+one pass and routes them to per-type writers, so the input is read once
+instead of once per entity type. An entity type with ``roles`` yields one
+entity per role, e.g. both the recipient and the place of performance
+location of a transaction.
+"""
+from typing import Dict, Any, List, Mapping, Optional, Callable, Iterable, Sequence, Tuple
+import logging
+
+from .csv_reader import TEMPLATE_FIELD_PATTERN, get_reference_key_columns, get_role_field_mappings
+from .profiling import Profiler
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+Getter = Callable[[Row], Any]
+Writer = Callable[[Dict[str, Any]], Any]
+
+_MISSING = object()
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == ""
+
+class _Source:
+    """Resolves mapping values to row getters.
+
+    With a known header, object field values that are not columns are
+    constants (e.g. ``is_prime: "true"``). Without one every value is a
+    column name and missing columns are left out of the entity.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]]):
+        self.columns = set(columns) if columns is not None else None
+
+    def field(self, name: str) -> Getter:
+        if self.columns is not None and name not in self.columns:
+            return lambda row: name
+        return lambda row: row.get(name, _MISSING)
+
+def _compile_direct(column: str) -> Getter:
+    return lambda row: row.get(column, _MISSING)
+
+def _compile_multi_source(mapping: Dict[str, Any]) -> Getter:
+    sources = tuple(mapping.get('sources', []))
+    strategy = mapping.get('strategy', 'first_non_empty')
+    if strategy != 'first_non_empty':
+        logger.warning(f"Unsupported multi_source strategy {strategy!r}, using first_non_empty")
+
+    def get(row: Row) -> Any:
+        for source in sources:
+            value = row.get(source)
+            if not _is_empty(value):
+                return value
+        return _MISSING
+    return get
+
+def _compile_template(templates: Dict[str, str]) -> Getter:
+    compiled = tuple(
+        (name, template, tuple(TEMPLATE_FIELD_PATTERN.findall(str(template))))
+        for name, template in templates.items()
+    )
+
+    def get(row: Row) -> Any:
+        result: Dict[str, Optional[str]] = {}
+        for name, template, fields in compiled:
+            values = {field: row.get(field) for field in fields}
+            # Partial references are worse than none
+            if any(_is_empty(value) for value in values.values()):
+                result[name] = None
+            else:
+                result[name] = TEMPLATE_FIELD_PATTERN.sub(lambda m: str(values[m.group(1)]), str(template))
+        return result if any(v is not None for v in result.values()) else _MISSING
+    return get
+
+def _compile_object(mapping: Dict[str, Any], source: _Source) -> Getter:
+    fields: List[Tuple[str, Getter]] = []
+    for name, value in (mapping.get('fields') or {}).items():
+        if isinstance(value, dict):
+            fields.append((name, _compile_value(value, source)))
+        elif value is not None:
+            fields.append((name, source.field(str(value))))
+    for name, nested in (mapping.get('nested_objects') or {}).items():
+        if isinstance(nested, dict):
+            fields.append((name, _compile_object(nested, source)))
+
+    def get(row: Row) -> Any:
+        result = {}
+        for name, getter in fields:
+            value = getter(row)
+            if value is not _MISSING:
+                result[name] = value
+        return result if result else _MISSING
+    return get
+
+def _compile_value(mapping: Dict[str, Any], source: _Source) -> Getter:
+    if mapping.get('type') == 'template':
+        return _compile_template(mapping.get('templates') or {})
+    return _compile_object(mapping, source)
+
+class EntityExtractor:
+    """Builds every configured entity from a row in one pass."""
+
+    def __init__(self, entities: Dict[str, Dict[str, Any]], columns: Optional[Sequence[str]] = None,
+                 entity_types: Optional[Iterable[str]] = None):
+        """Compile entity field mappings.
+
+        Args:
+            entities: The ``entities`` configuration section
+            columns: Source header; enables constant values in object mappings
+            entity_types: Entity types to extract, in output order; defaults
+                to every entity with field mappings
+        """
+        source = _Source(columns)
+        self._entities = entities or {}
+        names = list(entity_types) if entity_types is not None else [
+            name for name, cfg in self._entities.items()
+            if isinstance(cfg, dict) and (cfg.get('field_mappings') or cfg.get('roles'))
+        ]
+        self._types = [name for name in names if name in self._entities]
+        self._plans: List[Tuple[str, Tuple[str, ...], Tuple[Tuple[str, Getter], ...]]] = [
+            (name, tuple(self._entities[name].get('key_fields', [])), self._compile_entity(field_mappings, source))
+            for name in self._types
+            for field_mappings in get_role_field_mappings(self._entities[name])
+        ]
+
+    def _compile_entity(self, field_mappings: Dict[str, Any], source: _Source) -> Tuple[Tuple[str, Getter], ...]:
+        """Compile one set of entity field mappings into (target field, getter) pairs."""
+        getters: List[Tuple[str, Getter]] = []
+
+        for target, column in (field_mappings.get('direct') or {}).items():
+            if isinstance(column, str):
+                getters.append((target, _compile_direct(column)))
+        for target, mapping in (field_mappings.get('multi_source') or {}).items():
+            getters.append((target, _compile_multi_source(mapping)))
+        for target, mapping in (field_mappings.get('object') or {}).items():
+            if isinstance(mapping, dict):
+                getters.append((target, _compile_object(mapping, source)))
+        for target, mapping in (field_mappings.get('reference') or {}).items():
+            if isinstance(mapping, dict):
+                getters.append((target, self._compile_reference(mapping)))
+        for target, mapping in (field_mappings.get('template') or {}).items():
+            if isinstance(mapping, dict):
+                getters.append((target, _compile_value(mapping, source)))
+        return tuple(getters)
+
+    def _compile_reference(self, mapping: Dict[str, Any]) -> Getter:
+        """Compile an entity reference into a getter of ``{'entity', 'key', ...}``.
+
+        The key is a dict of the referenced entity's key fields, so it can be
+        resolved with the referenced entity's id generator. ``key_fields``
+        given as a ``{key field: column}`` map reads the key from columns
+        that are not named after the referenced key fields.
+        """
+        target: Optional[str] = mapping.get('entity')
+        reference_type = mapping.get('reference_type')
+        pairs: Tuple[Tuple[str, str], ...]
+        if 'key_field' in mapping:
+            target_config = self._entities.get(target, {}) if target is not None else {}
+            target_keys = target_config.get('key_fields') or [mapping['key_field']]
+            pairs = ((target_keys[0], mapping['key_field']),)
+        else:
+            pairs = tuple(get_reference_key_columns(mapping))
+
+        def get(row: Row) -> Any:
+            key = {name: row.get(column) for name, column in pairs}
+            if all(_is_empty(value) for value in key.values()):
+                return _MISSING
+            reference = {'entity': target, 'key': key}
+            if reference_type:
+                reference['reference_type'] = reference_type
+            return reference
+        return get
+
+    @property
+    def entity_types(self) -> List[str]:
+        """Extracted entity types, in output order."""
+        return list(self._types)
+
+    def instrument(self, profiler: Profiler) -> None:
+        """Attach a profiler stage timer to the per-row mapping of entities."""
+        profiler.instrument(self, 'extract_entities', 'map')
+
+    def extract_entities(self, row: Row) -> List[Tuple[str, Dict[str, Any]]]:
+        """Build every entity present in a row, one per entity role.
+
+        Entities whose key fields are all empty are left out, e.g. a
+        recipient without a UEI.
+
+        Returns:
+            (entity type, entity data) pairs, in output order
+        """
+        result: List[Tuple[str, Dict[str, Any]]] = []
+        for name, key_fields, getters in self._plans:
+            entity: Dict[str, Any] = {}
+            for target, getter in getters:
+                value = getter(row)
+                if value is not _MISSING:
+                    entity[target] = value
+            if key_fields and all(_is_empty(entity.get(key)) for key in key_fields):
+                continue
+            if entity:
+                result.append((name, entity))
+        return result
+
+    def extract(self, row: Row) -> Dict[str, Dict[str, Any]]:
+        """Build the entities of a row by entity type.
+
+        Of an entity type with several roles only the first entity present
+        is returned; use ``extract_entities`` to get all of them.
+
+        Returns:
+            Entity data by entity type
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        for name, entity in self.extract_entities(row):
+            result.setdefault(name, entity)
+        return result
+
+    def extract_batch(self, rows: Iterable[Row]) -> Dict[str, List[Dict[str, Any]]]:
+        """Build every entity of a batch of rows, grouped by entity type."""
+        batches: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self.entity_types}
+        for row in rows:
+            for name, entity in self.extract_entities(row):
+                batches[name].append(entity)
+        return batches
+
+    def route(self, rows: Iterable[Row], writers: Mapping[str, Writer]) -> Dict[str, int]:
+        """Extract entities from rows and pass each to its type's writer.
+
+        Args:
+            rows: Source rows
+            writers: Writer per entity type; types without one are skipped
+
+        Returns:
+            Number of entities written per entity type
+        """
+        counts = {name: 0 for name in writers}
+        for row in rows:
+            for name, entity in self.extract_entities(row):
+                writer = writers.get(name)
+                if writer is not None:
+                    writer(entity)
+                    counts[name] += 1
+        return counts
+
+__all__ = ['EntityExtractor']
@@ -0,0 +1,179 @@
+"""Resolution of ``field_properties`` field patterns against a CSV header."""
+from typing import Dict, Any, List, Optional, Iterator, Sequence, Set, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from fnmatch import translate
+import hashlib
+import json
+import re
+import threading
+
+from .types import RuleType, ValidationRule
+
+@dataclass
+class FieldProperties:
+    """Resolved properties of one column.
+
+    A column may match several ``field_properties`` groups, e.g. a date in
+    both ``date.standard`` and ``date.not_future``; validations and
+    transformation operations of all matching groups are kept in
+    configuration order.
+    """
+    column: str
+    groups: List[str] = field(default_factory=list)
+    validations: List[Dict[str, Any]] = field(default_factory=list)
+    operations: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def type(self) -> Optional[str]:
+        """Category of the first matching group, e.g. ``numeric``."""
+        return self.groups[0].split('.', 1)[0] if self.groups else None
+
+def validation_rules(column: str, validation: Dict[str, Any]) -> List[ValidationRule]:
+    """Convert a ``field_properties`` validation into validation rules for a column.
+
+    Patterns, numeric bounds, maximum lengths and enum values become
+    pattern, range, length and enum rules; an enum accepts both its codes
+    and their labels, as exports carry either. Date formats, comparisons
+    and other checks that depend on more than the value have no rule.
+    """
+    message = validation.get('error_message', '')
+    rules: List[Tuple[RuleType, Dict[str, Any]]] = []
+    if validation.get('pattern'):
+        rules.append((RuleType.PATTERN, {'pattern': validation['pattern']}))
+    if validation.get('min_value') is not None or validation.get('max_value') is not None:
+        rules.append((RuleType.RANGE, {'min': validation.get('min_value'), 'max': validation.get('max_value')}))
+    if validation.get('max_length') is not None:
+        rules.append((RuleType.LENGTH, {'max': validation['max_length']}))
+    values = validation.get('values')
+    if validation.get('type') == 'enum' and values:
+        allowed = [str(value) for value in values]
+        if isinstance(values, dict):
+            allowed += [str(label) for label in values.values()]
+        rules.append((RuleType.ENUM, {'values': allowed}))
+    return [
+        ValidationRule(id=f"{column}.{rule_type.value}", field_name=column, rule_type=rule_type,
+                       parameters=parameters, message=message)
+        for rule_type, parameters in rules
+    ]
+
+def _is_pattern(name: str) -> bool:
+    return any(c in name for c in '*?[')
+
+class FieldPropertyIndex:
+    """Precomputed ``column -> properties`` index for one header.
+
+    Glob patterns are compiled once and matched against each header column
+    when the index is built, so row processing only does dict lookups.
+    """
+
+    def __init__(self, field_properties: Dict[str, Any], header: Sequence[str]):
+        """Build index.
+
+        Args:
+            field_properties: The ``field_properties`` configuration section
+            header: CSV header columns
+        """
+        self.header = list(header)
+        self.entries: Dict[str, FieldProperties] = {}
+        matched_patterns: Set[str] = set()
+        all_patterns: Set[str] = set()
+
+        for group_name, properties, names in self._iter_groups(field_properties):
+            validation = properties.get('validation') or {}
+            operations = (properties.get('transformation') or {}).get('operations') or []
+            for name in names:
+                all_patterns.add(name)
+                if _is_pattern(name):
+                    regex = re.compile(translate(name))
+                    columns = [c for c in self.header if regex.match(c)]
+                else:
+                    columns = [name] if name in self.header else []
+                if columns:
+                    matched_patterns.add(name)
+                for column in columns:
+                    entry = self.entries.get(column)
+                    if entry is None:
+                        entry = self.entries[column] = FieldProperties(column)
+                    if group_name in entry.groups:
+                        continue
+                    entry.groups.append(group_name)
+                    if validation:
+                        entry.validations.append(validation)
+                    entry.operations.extend(operations)
+
+        # Keep header order
+        self.entries = {c: self.entries[c] for c in self.header if c in self.entries}
+        self.unmatched_columns: List[str] = [c for c in self.header if c not in self.entries]
+        self.unused_patterns: List[str] = sorted(all_patterns - matched_patterns)
+
+    @staticmethod
+    def _iter_groups(field_properties: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any], List[str]]]:
+        """Yield (group name, properties, field names) for each property group."""
+        for category_name, category in field_properties.items():
+            if not isinstance(category, dict):
+                continue
+            for group, properties in category.items():
+                if isinstance(properties, dict) and properties.get('fields'):
+                    yield f"{category_name}.{group}", properties, properties['fields']
+
+    def get(self, column: str) -> Optional[FieldProperties]:
+        """Get resolved properties of a column."""
+        return self.entries.get(column)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_pipelines(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get transformation operations per column, for columns that have any."""
+        return {c: e.operations for c, e in self.entries.items() if e.operations}
+
+    def get_validation_rules(self) -> Dict[str, List[ValidationRule]]:
+        """Get validation rules per column, for columns that have any."""
+        rules: Dict[str, List[ValidationRule]] = {}
+        for column, entry in self.entries.items():
+            column_rules = [rule for validation in entry.validations for rule in validation_rules(column, validation)]
+            if column_rules:
+                rules[column] = column_rules
+        return rules
+
+def header_hash(header: Sequence[str]) -> str:
+    """Get a stable hash of a header."""
+    return hashlib.sha1("\x1f".join(header).encode('utf-8')).hexdigest()
+
+def config_hash(field_properties: Dict[str, Any]) -> str:
+    """Get a stable hash of a ``field_properties`` section."""
+    content = json.dumps(field_properties, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+_index_cache: "OrderedDict[Tuple[str, str], FieldPropertyIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+_INDEX_CACHE_SIZE = 32
+
+def get_field_index(field_properties: Dict[str, Any], header: Sequence[str]) -> FieldPropertyIndex:
+    """Get the field property index for a header, cached by config and header hash."""
+    key = (config_hash(field_properties), header_hash(header))
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = FieldPropertyIndex(field_properties, header)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+__all__ = [
+    'FieldProperties',
+    'FieldPropertyIndex',
+    'config_hash',
+    'get_field_index',
+    'header_hash',
+    'validation_rules'
+]
@@ -1,13 +1,15 @@
 """Core field handling functionality."""
-from typing import Dict, Any, List, Optional, Set, cast, Literal
+from typing import Dict, Any, List, Optional, Pattern, Set, Union, cast, Literal
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from decimal import Decimal, InvalidOperation
-from re import match
+import re
 
 from .exceptions import DependencyError
 from .validation import BaseValidator
 from .types import FieldType, ValidationRule
+from .patterns import pattern_registry
+from .error_sink import ErrorSink
 
 
 @dataclass
@@ -177,12 +179,12 @@ class FieldSelector:
 class FieldValidator(BaseValidator):
     """Field-level validation."""
 
-    _money_pattern = r'^-?\$?\s*\d+(?:,\d{3})*(?:\.\d{2})?$'
+    _money_pattern = re.compile(r'^-?\$?\s*\d+(?:,\d{3})*(?:\.\d{2})?$')
 
     def __init__(self, registry: FieldRegistry):
         super().__init__()  # Initialize the base class properly
         self.registry = registry
-        self._errors: List[str] = []  # Initialize errors list
+        self._errors = ErrorSink()
 
     def validate_field(self, entity_type: str, field_name: str, value: Any) -> bool:
         """Validate a single field."""
@@ -248,7 +250,7 @@ class FieldValidator(BaseValidator):
             return True
         if isinstance(value, str):
             # Allow common currency string formats
-            if not match(self._money_pattern, value.strip()):
+            if not self._money_pattern.match(value.strip()):
                 return False
             try:
                 # Try to convert to Decimal to ensure it's a valid number
@@ -260,13 +262,10 @@ class FieldValidator(BaseValidator):
                 return False
         return False
 
-    def _validate_pattern(self, value: str, pattern: str) -> bool:
+    def _validate_pattern(self, value: str, pattern: Union[str, Pattern[str]]) -> bool:
         """Validate value against pattern."""
-        import re
-        try:
-            return bool(re.match(pattern, str(value)))
-        except Exception:
-            return False
+        compiled = pattern_registry.get(pattern) if isinstance(pattern, str) else pattern
+        return compiled is not None and compiled.match(str(value)) is not None
 
     def _validate_range(self, value: Any, min_value: Optional[float], max_value: Optional[float]) -> bool:
         """Validate numeric value range."""
@@ -293,7 +292,7 @@ class FieldValidator(BaseValidator):
                 return True  # Skip validation for None values unless required
 
             if rule.rule_type == "pattern":
-                if not self._validate_pattern(value, rule.parameters["pattern"]):
+                if not self._validate_pattern(value, rule.compiled_pattern or rule.parameters["pattern"]):
                     self.add_error(rule.message)
                     return False
 
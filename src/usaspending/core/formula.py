@@ -0,0 +1,161 @@
+"""Restricted formula compiler for derived fields."""
+from typing import Any, Callable, Dict, Sequence
+from functools import lru_cache
+import ast
+import re
+
+from .exceptions import MappingError
+
+FormulaFunc = Callable[[Sequence[Any]], Any]
+
+# Source values are referenced positionally as val0, val1, ...
+_VALUE_NAME = re.compile(r"^val(\d+)$")
+
+# Functions callable from formulas
+FORMULA_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'round': round,
+    'int': int,
+    'float': float,
+    'str': str,
+    'len': len,
+}
+
+# No ast.Pow: 9**9**9 is a formula of a few bytes that never finishes
+_ALLOWED_NODES: tuple = (
+    ast.Expression, ast.Load,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.UnaryOp, ast.UAdd, ast.USub, ast.Not,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Is, ast.IsNot,
+    ast.In, ast.NotIn,
+    ast.IfExp, ast.Constant, ast.Name, ast.Call, ast.Tuple, ast.List,
+)
+
+# Longest string, bytes, tuple or list a formula may build
+MAX_SEQUENCE_LENGTH = 10000
+
+_SEQUENCE_TYPES = (str, bytes, tuple, list)
+
+def _checked_mul(left: Any, right: Any) -> Any:
+    """``left * right`` that refuses to repeat sequences past MAX_SEQUENCE_LENGTH."""
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, _SEQUENCE_TYPES) and isinstance(count, int):
+            if len(sequence) * count > MAX_SEQUENCE_LENGTH:
+                raise MappingError(
+                    f"Formula repetition exceeds {MAX_SEQUENCE_LENGTH} items: "
+                    f"{len(sequence)} * {count}"
+                )
+    return left * right
+
+def _checked_mod(left: Any, right: Any) -> Any:
+    """``left % right`` that refuses string formatting, whose width is unbounded."""
+    if isinstance(left, (str, bytes)):
+        raise MappingError("String formatting is not supported in formulas")
+    return left % right
+
+# Mult and Mod evaluate through these; values are only known per record
+_CHECKED_OPERATORS = {ast.Mult: '_checked_mul', ast.Mod: '_checked_mod'}
+_CHECKED_FUNCTIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    '_checked_mul': _checked_mul,
+    '_checked_mod': _checked_mod,
+}
+
+class _CheckOperators(ast.NodeTransformer):
+    """Rewrites ``a * b`` and ``a % b`` into calls of the checked helpers."""
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        helper = _CHECKED_OPERATORS.get(type(node.op))
+        if helper is None:
+            return node
+        return ast.copy_location(
+            ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+            node
+        )
+
+def _is_sequence_literal(node: ast.AST) -> bool:
+    """Whether a node is a string, bytes, tuple or list literal."""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (str, bytes))
+    return isinstance(node, (ast.Tuple, ast.List))
+
+def _validate(tree: ast.AST, formula: str) -> int:
+    """Check a parsed formula against the whitelist.
+
+    Returns:
+        Number of positional values referenced (highest valN index + 1)
+    """
+    value_count = 0
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise MappingError(f"Unsupported expression {type(node).__name__} in formula: {formula}")
+        if isinstance(node, ast.Name):
+            match = _VALUE_NAME.match(node.id)
+            if match:
+                value_count = max(value_count, int(match.group(1)) + 1)
+            elif node.id not in FORMULA_FUNCTIONS:
+                raise MappingError(f"Unknown name '{node.id}' in formula: {formula}")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS:
+                raise MappingError(f"Unsupported function call in formula: {formula}")
+            if node.keywords:
+                raise MappingError(f"Keyword arguments are not supported in formula: {formula}")
+        elif isinstance(node, ast.BinOp):
+            # 'x' * 10000000000 and '%099999999d' % 1 build huge values; literal
+            # operands fail here, others when evaluated
+            if isinstance(node.op, ast.Mult) and (_is_sequence_literal(node.left) or _is_sequence_literal(node.right)):
+                raise MappingError(f"Repetition of literals is not supported in formula: {formula}")
+            if isinstance(node.op, ast.Mod) and _is_sequence_literal(node.left):
+                raise MappingError(f"String formatting is not supported in formula: {formula}")
+    return value_count
+
+@lru_cache(maxsize=1024)
+def compile_formula(formula: str) -> FormulaFunc:
+    """Compile a formula into a function of its source values.
+
+    Formulas are Python expressions over ``val0``, ``val1``, ... restricted
+    to arithmetic without powers, comparisons, boolean logic, conditional
+    expressions, literals and ``FORMULA_FUNCTIONS``. Repetition is limited
+    to ``MAX_SEQUENCE_LENGTH`` items and strings cannot be used as format
+    strings, checked for literals when compiling and for computed values
+    when evaluating (raising MappingError). The expression is parsed and checked
+    once, then compiled to a plain function, so evaluation costs a single
+    call per record. Results are cached by formula text.
+
+    Args:
+        formula: Formula expression, e.g. ``"val0 * val1"``
+
+    Returns:
+        Function taking the sequence of source values; missing values are None
+
+    Raises:
+        MappingError: If the formula is invalid or uses unsupported syntax
+    """
+    try:
+        tree = ast.parse(formula.strip(), mode='eval')
+    except SyntaxError as e:
+        raise MappingError(f"Invalid formula '{formula}': {e.msg}")
+
+    value_count = _validate(tree, formula)
+    params = ast.arguments(
+        posonlyargs=[], args=[ast.arg(arg=f"val{i}") for i in range(value_count)],
+        vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+    )
+    body = _CheckOperators().visit(tree).body
+    lambda_tree = ast.fix_missing_locations(ast.Expression(body=ast.Lambda(args=params, body=body)))
+    namespace: Dict[str, Any] = {'__builtins__': {}, **FORMULA_FUNCTIONS, **_CHECKED_FUNCTIONS}
+    func = eval(compile(lambda_tree, '<formula>', 'eval'), namespace)
+
+    if value_count == 0:
+        return lambda values: func()
+
+    def evaluate(values: Sequence[Any]) -> Any:
+        if len(values) < value_count:
+            values = list(values) + [None] * (value_count - len(values))
+        return func(*values[:value_count])
+    return evaluate
+
+__all__ = ['FORMULA_FUNCTIONS', 'MAX_SEQUENCE_LENGTH', 'FormulaFunc', 'compile_formula']
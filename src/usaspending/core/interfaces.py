@@ -1,10 +1,10 @@
 """Core interface definitions."""
-from typing import Dict, Any, List, Optional, Protocol, Generator, Type, Callable, Union, Sequence, Generic, TypeVar
+from typing import Dict, Any, List, Optional, Protocol, Generator, Type, Callable, Union, Sequence, Generic, TypeVar, Iterable
 from abc import ABC, abstractmethod
 from .types import (
     EntityKey, EntityData, ValidationResult, ComponentConfig, 
     EntityType, RelationType, Cardinality, EntityRelationship,
-    ValidationRule, RuleSet, RuleType, DataclassProtocol
+    ValidationRule, RuleSet, RuleType, DataclassProtocol, BatchValidationResult
 )
 
 # Type variable for entity objects
@@ -101,6 +101,11 @@ class IEntityStore(Protocol):
     def save_entity(self, entity_type: EntityType, entity: EntityData) -> str:
         """Save an entity and return its ID."""
         pass
+
+    @abstractmethod
+    def save_entities(self, entity_type: EntityType, entities: Iterable[EntityData]) -> List[str]:
+        """Save entities in bulk and return their IDs."""
+        pass
         
     @abstractmethod
     def get_entity(self, entity_type: EntityType, entity_id: str) -> Optional[EntityData]:
@@ -243,6 +248,12 @@ class IValidationMediator(Protocol):
     def validate_field(self, field_name: str, value: Any, context: Optional[Dict[str, Any]] = None) -> bool:
         """Validate a single field value."""
         pass
+
+    @abstractmethod
+    def validate_batch(self, entity_type: Union[EntityType, str], records: Sequence[Dict[str, Any]],
+                       context: Optional[Dict[str, Any]] = None) -> BatchValidationResult:
+        """Validate a batch of records, returning per-rule failure bitmaps."""
+        pass
     
     @abstractmethod
     def get_validation_errors(self) -> List[str]:
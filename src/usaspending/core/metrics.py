@@ -0,0 +1,202 @@
+"""Low-overhead processing metrics.
+
+``MetricsRegistry`` keeps counters and latency histograms in per-thread
+shards, so worker threads record without sharing a lock; shards are merged
+when metrics are read. Histograms use fixed power-of-two microsecond
+buckets, so recording is a few integer operations and percentiles are
+approximate to within a factor of two.
+"""
+from typing import Dict, Any, List, Optional, Iterator
+from contextlib import contextmanager
+import threading
+import time
+
+# Bucket i holds latencies below 2**i microseconds; the last is unbounded
+HISTOGRAM_BUCKETS = 32
+
+PERCENTILES = (50, 90, 99)
+
+class _Histogram:
+    """Latency distribution over power-of-two microsecond buckets."""
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self) -> None:
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        index = min(int(seconds * 1_000_000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: '_Histogram') -> None:
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound in seconds of the bucket holding a percentile."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min((1 << index) / 1_000_000, self.max or 0.0)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent}"] = self.percentile(percent)
+        return result
+
+    def copy(self) -> '_Histogram':
+        histogram = _Histogram()
+        histogram.merge(self)
+        return histogram
+
+class _Shard:
+    """Metrics recorded by one thread."""
+
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, _Histogram] = {}
+
+class MetricsRegistry:
+    """Counters, latency histograms and rates shared by worker threads."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry; rates are measured from now."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self.start_time = time.time()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        counters = self._shard().counters
+        counters[name] = counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a latency sample."""
+        histograms = self._shard().histograms
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = _Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Record the latency of a block, including failed ones."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counters(self) -> Dict[str, int]:
+        """Get counters merged across threads."""
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[str, int] = {}
+        for shard in shards:
+            for name, value in dict(shard.counters).items():
+                merged[name] = merged.get(name, 0) + value
+        return merged
+
+    def _histograms(self) -> Dict[str, _Histogram]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[str, _Histogram] = {}
+        for shard in shards:
+            for name, histogram in dict(shard.histograms).items():
+                if name in merged:
+                    merged[name].merge(histogram)
+                else:
+                    merged[name] = histogram.copy()
+        return merged
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        """Get latency summaries (count, total, mean, min, max, percentiles) in seconds."""
+        return {name: histogram.summary() for name, histogram in self._histograms().items()}
+
+    def rates(self, elapsed: Optional[float] = None) -> Dict[str, float]:
+        """Get counters per second, by default since the registry was created."""
+        elapsed = elapsed if elapsed is not None else time.time() - self.start_time
+        if elapsed <= 0:
+            return {}
+        return {name: value / elapsed for name, value in self.counters().items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get counters, latency summaries and rates."""
+        elapsed = time.time() - self.start_time
+        return {
+            'elapsed': elapsed,
+            'counters': self.counters(),
+            'latency': self.histograms(),
+            'rates': self.rates(elapsed),
+        }
+
+    def merge(self, other: 'MetricsRegistry') -> None:
+        """Fold another registry, e.g. a worker's, into the calling thread's shard."""
+        shard = self._shard()
+        for name, value in other.counters().items():
+            shard.counters[name] = shard.counters.get(name, 0) + value
+        for name, histogram in other._histograms().items():
+            if name in shard.histograms:
+                shard.histograms[name].merge(histogram)
+            else:
+                shard.histograms[name] = histogram
+
+    def reset(self) -> None:
+        """Drop all metrics and restart rate measurement."""
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+            self.start_time = time.time()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Registries travel back from worker processes merged into one shard
+        return {'start_time': self.start_time, 'counters': self.counters(), 'histograms': self._histograms()}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__()  # type: ignore[misc]
+        self.start_time = state['start_time']
+        shard = self._shard()
+        shard.counters.update(state['counters'])
+        shard.histograms.update(state['histograms'])
+
+__all__ = ['MetricsRegistry', 'HISTOGRAM_BUCKETS']
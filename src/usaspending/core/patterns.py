@@ -0,0 +1,62 @@
+"""Shared registry of compiled validation patterns."""
+from typing import Dict, Optional, Pattern
+import logging
+import re
+import threading
+
+from .types import ValidationRule
+
+logger = logging.getLogger(__name__)
+
+class PatternRegistry:
+    """Compiles each distinct regular expression once and shares it.
+
+    Invalid patterns are logged once and cached as None, so callers treat
+    them as non-matching without re-raising on every value.
+    """
+
+    def __init__(self) -> None:
+        """Initialize registry."""
+        self._patterns: Dict[str, Optional[Pattern[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pattern: str) -> Optional[Pattern[str]]:
+        """Get the compiled form of a pattern, or None if it is invalid."""
+        try:
+            return self._patterns[pattern]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if pattern not in self._patterns:
+                try:
+                    self._patterns[pattern] = re.compile(pattern)
+                except (re.error, TypeError) as e:
+                    logger.warning(f"Invalid validation pattern {pattern!r}: {str(e)}")
+                    self._patterns[pattern] = None
+            return self._patterns[pattern]
+
+    def compile_rule(self, rule: ValidationRule) -> Optional[Pattern[str]]:
+        """Attach the compiled pattern of a pattern rule to the rule."""
+        pattern = rule.parameters.get('pattern') if rule.parameters else None
+        if pattern is None:
+            return None
+        rule.compiled_pattern = self.get(pattern)
+        return rule.compiled_pattern
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def clear(self) -> None:
+        """Remove all compiled patterns."""
+        with self._lock:
+            self._patterns.clear()
+
+# Registry shared by validators so each pattern is compiled once per process
+pattern_registry = PatternRegistry()
+
+def get_pattern(pattern: str) -> Optional[Pattern[str]]:
+    """Get a compiled pattern from the shared registry."""
+    return pattern_registry.get(pattern)
+
+__all__ = ['PatternRegistry', 'get_pattern', 'pattern_registry']
@@ -1,8 +1,10 @@
 """Core data processing functionality."""
-from contextlib import contextmanager
+import pickle
+import threading
 import time
-from typing import Dict, Any, List, Optional, Iterator, cast
-from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterable, Iterator, FrozenSet, Sequence, Tuple, cast
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from dataclasses import dataclass, field
 
 from .interfaces import (
@@ -14,7 +16,10 @@ from .interfaces import (
 )
 from .types import EntityData, EntityType, ComponentConfig
 from .exceptions import ProcessingError
-from .utils import chunk_list, Timer
+from .utils import chunk_list
+from .error_sink import ErrorSink
+from .metrics import MetricsRegistry
+from .scheduler import EntityScheduler
 
 @dataclass
 class ProcessingStats:
@@ -24,9 +29,104 @@ class ProcessingStats:
     failed_records: int = 0
     start_time: Optional[float] = None
     end_time: Optional[float] = None
-    validation_errors: List[str] = field(default_factory=list)
-    mapping_errors: List[str] = field(default_factory=list)
+    validation_errors: ErrorSink = field(default_factory=ErrorSink)
+    mapping_errors: ErrorSink = field(default_factory=ErrorSink)
     entity_counts: Dict[str, int] = field(default_factory=dict)
+    metrics: MetricsRegistry = field(default_factory=MetricsRegistry)
+
+    def merge(self, other: 'ProcessingStats') -> None:
+        """Fold the counters and errors of another run, e.g. one chunk, into these."""
+        self.total_records += other.total_records
+        self.processed_records += other.processed_records
+        self.failed_records += other.failed_records
+        self.validation_errors.merge(other.validation_errors)
+        self.mapping_errors.merge(other.mapping_errors)
+        for entity_type, count in other.entity_counts.items():
+            self.entity_counts[entity_type] = self.entity_counts.get(entity_type, 0) + count
+        self.metrics.merge(other.metrics)
+
+EXECUTOR_TYPES = ('thread', 'process')
+
+# Processor a worker process maps and validates with, set by _init_worker
+_worker_processor: Optional['DataProcessor'] = None
+
+def _init_worker(processor: 'DataProcessor') -> None:
+    """Install the processor of a worker process."""
+    global _worker_processor
+    _worker_processor = processor
+
+def _prepare_in_worker(records: List[Dict[str, Any]]) -> Tuple[List[Tuple[str, Dict[str, Any]]], ProcessingStats]:
+    """Map and validate a work unit in a worker process."""
+    if _worker_processor is None:
+        raise ProcessingError("Worker process not initialized")
+    return _worker_processor._prepare_chunk(records)
+
+class EntityMatcher:
+    """Classifies records by entity type from the columns they carry.
+
+    A record matches an entity type when it has every key field and at
+    least one ``direct`` or ``multi_source`` source column. That depends
+    only on a record's column names, so the matching types are computed
+    once per distinct column signature and memoized; rows sharing a header
+    shape are classified with one lookup.
+    """
+
+    def __init__(self, entity_configs: Dict[str, Dict[str, Any]], entity_order: Sequence[str],
+                 max_signatures: int = 1024):
+        """Compile the match rules of each entity type.
+
+        Args:
+            entity_configs: The ``entities`` configuration section
+            entity_order: Entity types in matching priority order
+            max_signatures: Distinct column signatures memoized
+        """
+        self._rules: List[Tuple[str, FrozenSet[str], FrozenSet[str]]] = []
+        for entity_type in entity_order:
+            entity_config = entity_configs.get(entity_type, {})
+            field_mappings = entity_config.get("field_mappings", {})
+            sources = {
+                column for column in field_mappings.get("direct", {}).values()
+                if isinstance(column, str)
+            }
+            for mapping in field_mappings.get("multi_source", {}).values():
+                sources.update(mapping.get("sources", []))
+            self._rules.append(
+                (entity_type, frozenset(entity_config.get("key_fields", [])), frozenset(sources))
+            )
+        self.max_signatures = max_signatures
+        self._memo: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def _classify(self, columns: FrozenSet[str]) -> Tuple[str, ...]:
+        return tuple(
+            entity_type for entity_type, key_fields, sources in self._rules
+            if key_fields <= columns and not sources.isdisjoint(columns)
+        )
+
+    def matching_types(self, record: Dict[str, Any]) -> Tuple[str, ...]:
+        """Get every entity type a record matches, in priority order."""
+        # Records read with one header share column order, so the key
+        # tuple is a cheaper signature than building a set per record
+        signature = tuple(record)
+        matches = self._memo.get(signature)
+        if matches is None:
+            matches = self._classify(frozenset(signature))
+            if len(self._memo) < self.max_signatures:
+                self._memo[signature] = matches
+        return matches
+
+    def match(self, record: Dict[str, Any]) -> Optional[str]:
+        """Get the first entity type a record matches."""
+        matches = self.matching_types(record)
+        return matches[0] if matches else None
+
+    def matches(self, record: Dict[str, Any], entity_type: str) -> bool:
+        """Check whether a record matches an entity type."""
+        return entity_type in self.matching_types(record)
+
+    @property
+    def signatures(self) -> int:
+        """Number of memoized column signatures."""
+        return len(self._memo)
 
 class DataProcessor(IProcessor, IConfigurable):
     """Main data processing coordinator."""
@@ -38,14 +138,47 @@ class DataProcessor(IProcessor, IConfigurable):
         self.store = store
         self._config: Dict[str, Any] = {}
         self._entity_configs: Dict[str, Dict[str, Any]] = {}
+        self._scheduler: Optional[EntityScheduler] = None
+        self._entity_order: List[str] = []
+        self._matcher: Optional[EntityMatcher] = None
+        self._executor: Optional[Executor] = None
+        self._stats_lock = threading.Lock()
         self._initialized = False
         self.stats = ProcessingStats()
-    
-    @contextmanager
-    def _get_executor(self, max_workers: int) -> Iterator[ThreadPoolExecutor]:
-        """Context manager for thread pool executor."""
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            yield executor
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes get the processor once, to map and validate;
+        # entities are stored by the parent, so the store stays behind
+        state = self.__dict__.copy()
+        state['store'] = None
+        state['_executor'] = None
+        state['_stats_lock'] = None
+        state['stats'] = ProcessingStats()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def _create_executor(self) -> Executor:
+        """Create the configured ``executor``: threads for I/O-bound stores,
+        processes for CPU-bound mapping.
+
+        Process workers receive the mapper and validator once, when they
+        start, and only map and validate; the parent stores what they
+        return, so the store is never copied into a worker.
+        """
+        executor_type = self._config.get("executor", "thread")
+        if executor_type not in EXECUTOR_TYPES:
+            raise ProcessingError(f"Unknown executor {executor_type!r}, expected one of {EXECUTOR_TYPES}")
+        max_workers = self._config.get("max_workers", 4)
+        if executor_type == "process":
+            try:
+                pickle.dumps(self)
+            except Exception as e:
+                raise ProcessingError(f"Executor 'process' requires a picklable mapper and validator: {str(e)}") from e
+            return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(self,))
+        return ThreadPoolExecutor(max_workers=max_workers)
             
     def configure(self, config: ComponentConfig) -> None:
         """Configure processor.
@@ -57,50 +190,70 @@ class DataProcessor(IProcessor, IConfigurable):
             raise ProcessingError("Valid ComponentConfig required")
             
         self._config = config.settings or {}
-        self._executor = ThreadPoolExecutor(
-            max_workers=self._config.get("max_workers", 4)
-        )
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         self._entity_configs = self._config.get("entities", {})
+        # Entity order is fixed by configuration, so resolve it once
+        self._scheduler = EntityScheduler(self._entity_configs)
+        self._entity_order = self._scheduler.order
+        self._matcher = EntityMatcher(self._entity_configs, self._entity_order)
+        # Workers copy the configured processor
+        self._executor = self._create_executor()
         self.stats = ProcessingStats()
         self.stats.start_time = time.time()
         self._initialized = True
         
     def process_batch(self, records: List[Dict[str, Any]], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
         """Process a batch of records.
+
+        Records are split into work units of ``work_unit_size`` records,
+        by default an even share of each chunk per worker, and each unit is
+        processed by one executor task with its own statistics, merged once
+        the unit is done. With the process executor, units are mapped and
+        validated in the workers and stored here.
         
         Args:
             records: List of records to process
             batch_size: Optional override for configured batch size
             
         Returns:
-            List of processed records
+            List of processed records, in input order
         """
-        if not self._initialized:
+        if not self._initialized or self._executor is None:
             raise ProcessingError("Processor not configured")
             
         effective_batch_size = batch_size or self._config.get("batch_size", 1000)
-        results = []
         max_workers = self._config.get("max_workers", 4)
+        in_processes = isinstance(self._executor, ProcessPoolExecutor)
+        results = []
         
         try:
-            with self._get_executor(max_workers) as executor:
-                # Process records in chunks
-                for chunk in chunk_list(records, effective_batch_size):
-                    futures = []
-                    
-                    # Submit processing tasks
-                    for record in chunk:
-                        future = executor.submit(self._process_record, record)
-                        futures.append(future)
-                        
-                    # Collect results
-                    for future in futures:
-                        try:
-                            if result := future.result():
-                                results.append(result)
-                        except Exception as e:
-                            self.stats.failed_records += 1
-                            self.stats.validation_errors.append(str(e))
+            # Process records in chunks
+            for chunk in chunk_list(records, effective_batch_size):
+                unit_size = self._config.get("work_unit_size") or -(-len(chunk) // max_workers)
+                units = list(chunk_list(chunk, unit_size))
+                if in_processes:
+                    futures = [self._executor.submit(_prepare_in_worker, unit) for unit in units]
+                else:
+                    futures = [self._executor.submit(self._process_chunk, unit) for unit in units]
+                # Collect in submission order so results keep input order
+                for unit, future in zip(units, futures):
+                    try:
+                        if in_processes:
+                            unit_results, unit_stats = self._store_chunk(*future.result())
+                        else:
+                            unit_results, unit_stats = future.result()
+                    except Exception as e:
+                        # The unit's statistics are lost with it, so count every record as failed
+                        with self._stats_lock:
+                            self.stats.total_records += len(unit)
+                            self.stats.failed_records += len(unit)
+                            self.stats.validation_errors.append(f"Work unit failed: {str(e)}")
+                        continue
+                    with self._stats_lock:
+                        self.stats.merge(unit_stats)
+                    results.extend(unit_results)
         except Exception as e:
             self.stats.end_time = time.time()
             raise ProcessingError(f"Batch processing failed: {str(e)}") from e
@@ -108,31 +261,129 @@ class DataProcessor(IProcessor, IConfigurable):
         self.stats.end_time = time.time()
         return results
 
-    def _process_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Process a single record."""
-        self.stats.total_records += 1
-        
+    def process_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Process a single record as its first matching entity type."""
+        if not self._initialized:
+            raise ProcessingError("Processor not configured")
+        results, stats = self._process_chunk([record])
+        with self._stats_lock:
+            self.stats.merge(stats)
+        return results[0] if results else None
+
+    def _process_chunk(self, records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], ProcessingStats]:
+        """Process a work unit of records into results and the unit's statistics."""
+        stats = ProcessingStats()
+        results = []
+        for record in records:
+            if result := self._process_record(record, stats):
+                results.append(result)
+        return results, stats
+
+    def _prepare_chunk(self, records: List[Dict[str, Any]]) -> Tuple[List[Tuple[str, Dict[str, Any]]], ProcessingStats]:
+        """Map and validate a work unit into (entity type, entity data) pairs and the unit's statistics."""
+        stats = ProcessingStats()
+        prepared = []
+        for record in records:
+            if entity := self._prepare_record(record, stats):
+                prepared.append(entity)
+        return prepared, stats
+
+    def _store_chunk(self, prepared: List[Tuple[str, Dict[str, Any]]],
+                     stats: ProcessingStats) -> Tuple[List[Dict[str, Any]], ProcessingStats]:
+        """Store the entities of a work unit prepared by ``_prepare_chunk``."""
+        results = []
+        for entity_type, entity_data in prepared:
+            try:
+                self._store_entity(entity_type, entity_data, stats)
+            except Exception as e:
+                self._record_failure(stats, e)
+                continue
+            results.append(entity_data)
+        return results, stats
+
+    def _prepare_record(self, record: Dict[str, Any],
+                        stats: ProcessingStats) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Map and validate a record as its first matching entity type."""
+        stats.total_records += 1
+        stats.metrics.increment("records")
+
         try:
-            # Get potential entity types in processing order
-            entity_types = sorted(
-                [(name, cfg.get("processing", {}).get("processing_order", 999)) 
-                 for name, cfg in self._entity_configs.items()],
-                key=lambda x: x[1]
-            )
-            
-            # Try processing as each entity type in order
-            for entity_type, _ in entity_types:
-                if self._matches_entity_definition(record, entity_type):
-                    return self._process_as_entity(record, entity_type)
-            
-            raise ProcessingError("Record does not match any entity definition")
-                
+            # First matching entity type in dependency order
+            entity_type = self._matcher.match(record) if self._matcher else None
+            if entity_type is None:
+                raise ProcessingError("Record does not match any entity definition")
+            return entity_type, self._prepare_entity(record, entity_type, stats)
         except Exception as e:
-            self.stats.failed_records += 1
-            error_msg = f"Record processing failed: {str(e)}"
-            self.stats.validation_errors.append(error_msg)
+            self._record_failure(stats, e)
             return None
+
+    @staticmethod
+    def _record_failure(stats: ProcessingStats, error: Exception) -> None:
+        """Count a failed record."""
+        stats.failed_records += 1
+        stats.validation_errors.append(f"Record processing failed: {str(error)}")
+
+    def _process_record(self, record: Dict[str, Any],
+                        stats: Optional[ProcessingStats] = None) -> Optional[Dict[str, Any]]:
+        """Process a single record."""
+        stats = stats if stats is not None else self.stats
+        prepared = self._prepare_record(record, stats)
+        if prepared is None:
+            return None
+        results, _ = self._store_chunk([prepared], stats)
+        return results[0] if results else None
             
+    def process_stages(self, records: Iterable[Dict[str, Any]],
+                       batch_size: Optional[int] = None) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+        """Process records through every entity stage.
+
+        Each chunk of records is offered to every entity type it matches.
+        Stages run on their own worker pools, sized by each entity's
+        ``concurrency.max_workers``, in dependency order, so independent
+        entity types process a chunk in parallel while dependent ones start
+        once their dependencies have finished it.
+
+        Args:
+            records: Records to process
+            batch_size: Optional override for configured batch size
+
+        Returns:
+            Iterator of processed entities per entity type, one item per chunk
+        """
+        if not self._initialized or self._scheduler is None:
+            raise ProcessingError("Processor not configured")
+
+        effective_batch_size = batch_size or self._config.get("batch_size", 1000)
+
+        def chunks() -> Iterator[List[Dict[str, Any]]]:
+            iterator = iter(records)
+            while chunk := list(islice(iterator, effective_batch_size)):
+                with self._stats_lock:
+                    self.stats.total_records += len(chunk)
+                yield chunk
+
+        try:
+            yield from self._scheduler.run(chunks(), self._process_stage)
+        finally:
+            self.stats.end_time = time.time()
+
+    def _process_stage(self, entity_type: str, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process the records of a chunk that match an entity type."""
+        stats = ProcessingStats()
+        results = []
+        for record in chunk:
+            if not self._matches_entity_definition(record, entity_type):
+                continue
+            try:
+                if entity_data := self._process_as_entity(record, entity_type, stats):
+                    results.append(entity_data)
+            except Exception as e:
+                stats.failed_records += 1
+                stats.validation_errors.append(f"{entity_type} processing failed: {str(e)}")
+        with self._stats_lock:
+            self.stats.merge(stats)
+        return results
+
     def process_stream(self, records: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """Process records as a stream."""
         if not self._initialized:
@@ -152,79 +403,86 @@ class DataProcessor(IProcessor, IConfigurable):
             yield from self.process_batch(batch)
             
     def get_stats(self) -> Dict[str, Any]:
-        """Get processing statistics."""
-        with Timer() as timer:
-            stats = {
-                "total_records": self.stats.total_records,
-                "processed_records": self.stats.processed_records,
-                "failed_records": self.stats.failed_records,
-                "processing_time": timer.elapsed,
-                "entity_counts": self.stats.entity_counts,
-                "error_count": len(self.stats.validation_errors),
-                "errors": self.stats.validation_errors[-100:]  # Last 100 errors
+        """Get processing statistics.
+
+        ``processing_time`` runs from ``configure()`` to the end of the last
+        batch, ``latency`` summarizes per-stage (map, validate, store) times
+        in seconds and ``rates`` are counters per second over that time.
+        """
+        with self._stats_lock:
+            stats = self.stats
+            start_time = stats.start_time or time.time()
+            processing_time = max((stats.end_time or time.time()) - start_time, 0.0)
+            return {
+                "total_records": stats.total_records,
+                "processed_records": stats.processed_records,
+                "failed_records": stats.failed_records,
+                "processing_time": processing_time,
+                "records_per_second": stats.total_records / processing_time if processing_time else 0.0,
+                "entity_counts": dict(stats.entity_counts),
+                "latency": stats.metrics.histograms(),
+                "rates": stats.metrics.rates(processing_time) if processing_time else {},
+                "error_count": stats.validation_errors.total,
+                "error_counts": stats.validation_errors.counts(),
+                "errors": stats.validation_errors.messages()[-100:]  # Last 100 errors
             }
-        return stats
         
     def _matches_entity_definition(self, record: Dict[str, Any], entity_type: str) -> bool:
         """Check if record matches entity definition from config."""
-        entity_config = self._entity_configs.get(entity_type, {})
-        
-        # Check key fields
-        key_fields = entity_config.get("key_fields", [])
-        if not all(field in record for field in key_fields):
-            return False
-            
-        # Check field mappings
-        field_mappings = entity_config.get("field_mappings", {})
-        
-        # Check direct mappings
-        direct_mappings = field_mappings.get("direct", {})
-        if any(target in record for target in direct_mappings.values()):
-            return True
-            
-        # Check multi-source mappings
-        multi_source = field_mappings.get("multi_source", {})
-        for mapping in multi_source.values():
-            sources = mapping.get("sources", [])
-            if any([source in record for source in sources]):
-                return True
-                
-        return False
+        if self._matcher is None:
+            raise ProcessingError("Processor not configured")
+        return self._matcher.matches(record, entity_type)
         
-    def _process_as_entity(self, record: Dict[str, Any], entity_type: str) -> Optional[Dict[str, Any]]:
+    def _process_as_entity(self, record: Dict[str, Any], entity_type: str,
+                           stats: Optional[ProcessingStats] = None) -> Optional[Dict[str, Any]]:
         """Process record as specific entity type."""
+        stats = stats if stats is not None else self.stats
+        entity_data = self._prepare_entity(record, entity_type, stats)
+        self._store_entity(entity_type, entity_data, stats)
+        return entity_data
+
+    def _prepare_entity(self, record: Dict[str, Any], entity_type: str,
+                        stats: ProcessingStats) -> Dict[str, Any]:
+        """Map and validate a record as an entity type."""
+        metrics = stats.metrics
         # Map record to entity
-        entity_data = self.mapper.map_entity(cast(EntityType, entity_type), record)
+        with metrics.time("map"):
+            entity_data = self.mapper.map_entity(cast(EntityType, entity_type), record)
         if not entity_data:
-            self.stats.mapping_errors.extend(self.mapper.get_errors())
+            stats.mapping_errors.extend(self.mapper.get_errors())
             raise ProcessingError("Entity mapping failed")
             
         # Validate entity
-        if not self.validator.validate(cast(EntityType, entity_type), entity_data):
-            self.stats.validation_errors.extend(self.validator.get_validation_errors())
+        with metrics.time("validate"):
+            valid = self.validator.validate(cast(EntityType, entity_type), entity_data)
+        if not valid:
+            stats.validation_errors.extend(self.validator.get_validation_errors())
             raise ProcessingError("Entity validation failed")
-            
-        # Store entity
-        result = self.store.save_entity(cast(EntityType, entity_type), cast(EntityData, entity_data))
+        return entity_data
+
+    def _store_entity(self, entity_type: str, entity_data: Dict[str, Any], stats: ProcessingStats) -> None:
+        """Store a mapped and validated entity."""
+        with stats.metrics.time("store"):
+            result = self.store.save_entity(cast(EntityType, entity_type), cast(EntityData, entity_data))
         if not result:
             raise ProcessingError("Entity storage failed")
             
         # Update stats
-        self.stats.processed_records += 1
-        self.stats.entity_counts[entity_type] = \
-            self.stats.entity_counts.get(entity_type, 0) + 1
-            
-        return entity_data
+        stats.processed_records += 1
+        stats.entity_counts[entity_type] = stats.entity_counts.get(entity_type, 0) + 1
         
     def cleanup(self) -> None:
         """Clean up resources."""
-        if hasattr(self, '_executor'):
+        if self._executor is not None:
             self._executor.shutdown(wait=True)
+            self._executor = None
         self.stats.end_time = time.time()
         self.stats = ProcessingStats()
         self._initialized = False
 
 __all__ = [
+    'EXECUTOR_TYPES',
     'ProcessingStats',
+    'EntityMatcher',
     'DataProcessor'
 ]
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""Index of entity keys for resolving entity references to IDs."""
+from typing import Dict, Any, List, Mapping, Optional, Iterable, Iterator, NamedTuple, Sequence, Tuple, Union
+import hashlib
+import logging
+import threading
+
+from .entity_ids import _KEY_SEPARATOR
+from .entity_registry import SpillableKeyStore
+from .error_sink import ErrorSink
+
+logger = logging.getLogger(__name__)
+
+# Separator of key values in template references, e.g. "097:1700:N001"
+DEFAULT_TEMPLATE_SEPARATOR = ":"
+
+KeyValue = Union[Dict[str, Any], Sequence[Any], str]
+
+class ResolvedReference(NamedTuple):
+    """Reference resolved after its source entity was stored.
+
+    The target ID belongs in ``id_field`` of the object at the dotted
+    ``field`` path of the source entity, next to the ``key_value`` it was
+    resolved from under ``key_field``.
+    """
+    source_type: str
+    source_id: str
+    field: str
+    target_type: str
+    target_id: str
+    id_field: str = 'entity_id'
+    key_field: str = 'key'
+    key_value: Any = None
+
+class _Miss(NamedTuple):
+    """Reference that could not be resolved when its entity was stored."""
+    field: str
+    target_type: str
+    key: Tuple[str, ...]
+    full: bool
+    id_field: str = 'entity_id'
+    key_field: str = 'key'
+    key_value: Any = None
+
+class ReferenceIndex:
+    """Maps entity keys to stored entity IDs.
+
+    Entities are added as they are stored, so resolving a reference is a
+    hash probe instead of a store read. Keys are held as compact digests in
+    a ``SpillableKeyStore``, so memory stays bounded by ``max_memory_keys``.
+    Entity types listed in ``prefix_entity_types`` are also indexed
+    under each leading part of their key, so template references such as an
+    agency code alone resolve to the first matching entity.
+
+    References that do not resolve when their entity is stored, e.g. back
+    references to entities processed later, are deferred and retried by
+    ``resolve_deferred``; those still unresolved are reported in bulk.
+    """
+
+    def __init__(self, key_fields: Mapping[str, Sequence[str]],
+                 reference_fields: Optional[Mapping[str, Sequence[str]]] = None,
+                 template_fields: Optional[Mapping[str, Sequence[Tuple[str, str]]]] = None,
+                 prefix_entity_types: Iterable[str] = (),
+                 max_memory_keys: int = 1_000_000, spill_path: Optional[str] = None,
+                 max_deferred: int = 1_000_000,
+                 template_separator: str = DEFAULT_TEMPLATE_SEPARATOR):
+        """Initialize index.
+
+        Args:
+            key_fields: Key field names per entity type
+            reference_fields: Entity reference fields per entity type
+            template_fields: (field, target entity type) template reference
+                objects per entity type
+            prefix_entity_types: Entity types also indexed by key prefix
+            max_memory_keys: Keys held in memory before spilling to disk
+            spill_path: Spill file path, defaults to a temporary file removed on close
+            max_deferred: Deferred references kept for ``resolve_deferred``;
+                further misses are reported as unresolved right away
+            template_separator: Separator of key values in template references
+        """
+        self._keys = SpillableKeyStore(max_memory_keys, spill_path, spill_prefix="reference-index-")
+        self._key_fields = {name: tuple(fields) for name, fields in key_fields.items()}
+        self._reference_fields = {name: tuple(fields) for name, fields in (reference_fields or {}).items()}
+        self._template_fields = {name: tuple(fields) for name, fields in (template_fields or {}).items()}
+        self._prefix_types = set(prefix_entity_types)
+        self.max_deferred = max_deferred
+        self.template_separator = template_separator
+
+        self._deferred: List[Tuple[str, str, _Miss]] = []
+        self._unresolved = ErrorSink()
+        self._stats = {'resolved': 0, 'deferred': 0, 'late_resolved': 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, entities: Dict[str, Any], **kwargs: Any) -> 'ReferenceIndex':
+        """Create index from the ``entities`` configuration section.
+
+        Reference fields come from ``field_mappings.reference``. Template
+        mappings that name an ``entity`` are template references to it, and
+        that entity is indexed by key prefix.
+        """
+        key_fields: Dict[str, Sequence[str]] = {}
+        reference_fields: Dict[str, List[str]] = {}
+        template_fields: Dict[str, List[Tuple[str, str]]] = {}
+        for name, entity_config in (entities or {}).items():
+            if not isinstance(entity_config, dict):
+                continue
+            if entity_config.get('key_fields'):
+                key_fields[name] = entity_config['key_fields']
+            field_mappings = entity_config.get('field_mappings') or {}
+            for field_name, mapping in (field_mappings.get('reference') or {}).items():
+                if isinstance(mapping, dict) and mapping.get('entity'):
+                    reference_fields.setdefault(name, []).append(field_name)
+            for field_name, mapping in (field_mappings.get('template') or {}).items():
+                if isinstance(mapping, dict) and mapping.get('entity'):
+                    template_fields.setdefault(name, []).append((field_name, mapping['entity']))
+
+        kwargs.setdefault('prefix_entity_types', {target for fields in template_fields.values() for _, target in fields})
+        return cls(key_fields, reference_fields, template_fields, **kwargs)
+
+    @staticmethod
+    def _digest(entity_type: str, values: Sequence[str], full: bool) -> bytes:
+        """Digest an entity type and key values; full keys and prefixes never collide."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{entity_type}{_KEY_SEPARATOR}{'F' if full else len(values)}".encode('utf-8'))
+        hasher.update((_KEY_SEPARATOR + _KEY_SEPARATOR.join(values)).encode('utf-8'))
+        return hasher.digest()
+
+    @staticmethod
+    def _normalize(value: Any) -> str:
+        return "" if value is None else str(value)
+
+    def _entity_key(self, entity_type: str, entity: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+        """Get an entity's key values, or None if it has no key."""
+        key_fields = self._key_fields.get(entity_type)
+        if not key_fields:
+            return None
+        data = entity.get('data')
+        if not isinstance(data, dict):
+            data = {}
+        values = tuple(
+            self._normalize(entity[name] if name in entity else data.get(name))
+            for name in key_fields
+        )
+        return values if any(values) else None
+
+    def add(self, entity_type: str, entity: Dict[str, Any], entity_id: str) -> bool:
+        """Index a stored entity.
+
+        Returns:
+            False if the entity has no key values
+        """
+        key = self._entity_key(entity_type, entity)
+        if key is None:
+            return False
+        with self._lock:
+            self._keys.put(self._digest(entity_type, key, True), entity_id)
+            if entity_type in self._prefix_types:
+                for length in range(1, len(key)):
+                    if key[length - 1]:
+                        self._keys.put(self._digest(entity_type, key[:length], False), entity_id)
+        return True
+
+    def _key_values(self, entity_type: str, key: KeyValue) -> Tuple[Tuple[str, ...], bool]:
+        """Get (values, is full key) for a reference key.
+
+        Dict keys name key fields, missing fields are empty. Template
+        strings and sequences give leading key values.
+        """
+        if isinstance(key, dict):
+            key_fields = self._key_fields.get(entity_type, tuple(key))
+            return tuple(self._normalize(key.get(name)) for name in key_fields), True
+        if isinstance(key, str):
+            key = key.split(self.template_separator)
+        values = tuple(self._normalize(value) for value in key)
+        return values, len(values) == len(self._key_fields.get(entity_type, ()))
+
+    def lookup(self, entity_type: str, key: KeyValue) -> Optional[str]:
+        """Get the ID of the entity with a key.
+
+        Args:
+            entity_type: Referenced entity type
+            key: Key field dict, key value sequence or template key string
+        """
+        values, full = self._key_values(entity_type, key)
+        if not any(values):
+            return None
+        with self._lock:
+            return self._keys.get(self._digest(entity_type, values, full))
+
+    def __contains__(self, item: Tuple[str, KeyValue]) -> bool:
+        return self.lookup(*item) is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def spilled(self) -> bool:
+        """Whether keys have been spilled to disk."""
+        return self._keys.spilled
+
+    def resolve_entity(self, entity_type: str, entity: Dict[str, Any]) -> List[_Miss]:
+        """Resolve an entity's references in place.
+
+        Resolved entity references get an ``entity_id``; template reference
+        objects get an ``<name>_id`` for each resolved template value. Misses
+        of template objects are reported under the object's dotted path,
+        e.g. ``agencies.funding``.
+
+        Returns:
+            Unresolved references, to pass to ``defer`` once the entity is stored
+        """
+        misses: List[_Miss] = []
+        resolved = 0
+        for field_name in self._reference_fields.get(entity_type, ()):
+            reference = entity.get(field_name)
+            if not isinstance(reference, dict) or 'key' not in reference:
+                continue
+            target = reference.get('entity')
+            if not isinstance(target, str):
+                continue
+            entity_id = self.lookup(target, reference['key'])
+            if entity_id is not None:
+                reference['entity_id'] = entity_id
+                resolved += 1
+            else:
+                values, full = self._key_values(target, reference['key'])
+                misses.append(_Miss(field_name, target, values, full, key_value=reference['key']))
+
+        for field_name, target in self._template_fields.get(entity_type, ()):
+            for container, path in self._iter_template_objects(entity.get(field_name), field_name):
+                templates = sorted(
+                    ((name, value) for name, value in container.items()
+                     if isinstance(value, str) and value and not name.endswith('_id')),
+                    key=lambda item: item[1].count(self.template_separator), reverse=True
+                )
+                for rank, (name, template_key) in enumerate(templates):
+                    entity_id = self.lookup(target, template_key)
+                    if entity_id is not None:
+                        container[f"{name}_id"] = entity_id
+                        resolved += 1
+                    elif rank == 0:
+                        # Only the most specific template of an object is reported
+                        values, full = self._key_values(target, template_key)
+                        misses.append(_Miss(path, target, values, full, f"{name}_id", name, template_key))
+        if resolved:
+            with self._lock:
+                self._stats['resolved'] += resolved
+        return misses
+
+    @staticmethod
+    def _iter_template_objects(value: Any, path: str) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """Yield (object, dotted path) for objects holding template values."""
+        if not isinstance(value, dict):
+            return
+        if any(isinstance(item, str) for item in value.values()):
+            yield value, path
+        for name, item in list(value.items()):
+            if isinstance(item, dict):
+                yield from ReferenceIndex._iter_template_objects(item, f"{path}.{name}")
+
+    def defer(self, entity_type: str, entity_id: str, misses: Iterable[_Miss]) -> None:
+        """Defer a stored entity's unresolved references to ``resolve_deferred``."""
+        with self._lock:
+            for miss in misses:
+                if len(self._deferred) < self.max_deferred:
+                    self._deferred.append((entity_type, entity_id, miss))
+                    self._stats['deferred'] += 1
+                else:
+                    self._report(entity_type, entity_id, miss)
+
+    def _report(self, entity_type: str, entity_id: str, miss: _Miss) -> None:
+        """Record an unresolved reference."""
+        self._unresolved.add(
+            f"{entity_type}.{miss.field}",
+            f"Unresolved {miss.target_type} reference in {entity_type} {entity_id}: {{value}}",
+            field=miss.field, value=self.template_separator.join(miss.key)
+        )
+
+    def resolve_deferred(self) -> List[ResolvedReference]:
+        """Retry deferred references once all entities are stored.
+
+        References still unresolved are counted per ``<entity>.<field>``
+        and available from ``get_unresolved``.
+
+        Returns:
+            References resolved by this retry
+        """
+        with self._lock:
+            deferred, self._deferred = self._deferred, []
+            resolved = []
+            for entity_type, entity_id, miss in deferred:
+                target_id = self._keys.get(self._digest(miss.target_type, miss.key, miss.full))
+                if target_id is None:
+                    self._report(entity_type, entity_id, miss)
+                else:
+                    resolved.append(ResolvedReference(entity_type, entity_id, miss.field, miss.target_type,
+                                                      target_id, miss.id_field, miss.key_field, miss.key_value))
+            self._stats['late_resolved'] += len(resolved)
+        return resolved
+
+    def get_unresolved(self) -> Dict[str, Any]:
+        """Get the unresolved reference report.
+
+        Returns:
+            Total count, counts per ``<entity>.<field>`` and sample messages
+        """
+        return {
+            'total': self._unresolved.total,
+            'counts': self._unresolved.counts(),
+            'samples': self._unresolved.messages()
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get resolution statistics."""
+        stats = dict(self._stats)
+        stats.update(keys=len(self), pending=len(self._deferred), unresolved=self._unresolved.total)
+        return stats
+
+    def close(self) -> None:
+        """Release memory and the spill file."""
+        with self._lock:
+            self._deferred.clear()
+            self._keys.close()
+
+__all__ = ['ReferenceIndex', 'ResolvedReference']
@@ -1,7 +1,15 @@
 """Core relationship functionality."""
-from typing import Dict, Any, Optional, List, Set
+from typing import Dict, Any, Optional, List, Set, Iterable, Sequence, Tuple, Union
+from array import array
+from collections import deque
 from enum import Enum
+import json
+import os
+import struct
+import threading
 from .types import EntityType, RelationType, Cardinality  # Import from types instead of redefining
+from .exceptions import StorageError
+from .reference_index import DEFAULT_TEMPLATE_SEPARATOR, ResolvedReference
 
 class RelationshipManager:
     """Manages entity relationships."""
@@ -56,4 +64,372 @@ class RelationshipManager:
         """Generate unique key for relationship."""
         return f"{source}:{target}"
 
-__all__ = ['RelationshipManager']
\ No newline at end of file
+# Traversal directions: along relationship edges, against them, or both
+OUTGOING = "outgoing"
+INCOMING = "incoming"
+BOTH = "both"
+
+# Edge store file signature
+_EDGE_FILE_MAGIC = b"USAEDGE1"
+
+class _Adjacency:
+    """Edges of one relationship as parallel node index arrays.
+
+    Duplicate edges are appended as they arrive and removed by compaction,
+    which runs when the arrays double in size and before queries. A
+    compressed adjacency (offsets into a neighbour array) is built on the
+    first query after edges change, per direction.
+    """
+
+    # Edge count below which appends never trigger compaction
+    COMPACT_MIN = 4096
+
+    def __init__(self) -> None:
+        self.sources = array('L')
+        self.targets = array('L')
+        self._compacted = 0
+        self._index: Dict[str, Tuple[array, array]] = {}
+
+    def add(self, source: int, target: int) -> None:
+        self.sources.append(source)
+        self.targets.append(target)
+        self._index.clear()
+        if len(self.sources) >= max(self.COMPACT_MIN, 2 * self._compacted):
+            self.compact()
+
+    def compact(self) -> None:
+        """Remove duplicate edges, keeping edges sorted by source."""
+        if len(self.sources) != self._compacted:
+            pairs = sorted(set(zip(self.sources, self.targets)))
+            self.sources = array('L', (source for source, _ in pairs))
+            self.targets = array('L', (target for _, target in pairs))
+            self._compacted = len(self.sources)
+
+    def __len__(self) -> int:
+        self.compact()
+        return len(self.sources)
+
+    def neighbours(self, node: int, direction: str) -> array:
+        """Get neighbour node indexes of a node in one direction."""
+        index = self._index.get(direction)
+        if index is None:
+            self.compact()
+            index = self._index[direction] = self._build(direction)
+        offsets, neighbours = index
+        if node + 1 >= len(offsets):
+            return array('L')
+        return neighbours[offsets[node]:offsets[node + 1]]
+
+    def _build(self, direction: str) -> Tuple[array, array]:
+        """Build compressed adjacency by counting sort on the origin node."""
+        origins, ends = (self.sources, self.targets) if direction == OUTGOING else (self.targets, self.sources)
+        node_count = max(origins) + 1 if origins else 0
+        offsets = array('L', bytes(array('L').itemsize * (node_count + 1)))
+        for origin in origins:
+            offsets[origin + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+        position = array('L', offsets)
+        neighbours = array('L', bytes(array('L').itemsize * len(origins)))
+        for origin, end in zip(origins, ends):
+            neighbours[position[origin]] = end
+            position[origin] += 1
+        return offsets, neighbours
+
+def get_field_relationships(entities: Optional[Dict[str, Any]]) -> Dict[Tuple[str, str], str]:
+    """Map (entity type, reference field) to the relationship id it names.
+
+    Reference mappings name their relationship with ``relationship``;
+    template mappings map each template object to one with
+    ``relationships``, keyed by the dotted path of the object.
+    """
+    field_relationships: Dict[Tuple[str, str], str] = {}
+    for entity_type, entity_config in (entities or {}).items():
+        if not isinstance(entity_config, dict):
+            continue
+        field_mappings = entity_config.get('field_mappings') or {}
+        for field_name, mapping in (field_mappings.get('reference') or {}).items():
+            if isinstance(mapping, dict) and mapping.get('relationship'):
+                field_relationships[(entity_type, field_name)] = mapping['relationship']
+        for field_name, mapping in (field_mappings.get('template') or {}).items():
+            if isinstance(mapping, dict):
+                for name, relationship_id in (mapping.get('relationships') or {}).items():
+                    field_relationships[(entity_type, f"{field_name}.{name}")] = relationship_id
+    return field_relationships
+
+class EdgeStore:
+    """Materialized relationship edges with adjacency traversal.
+
+    Entity IDs are interned to integer node indexes and each relationship
+    id in the ``relationships`` configuration keeps its edges as compact
+    unsigned integer arrays, so traversals never load entity bodies.
+    Edges point from the relationship's ``sourceEntity`` to its
+    ``targetEntity``; duplicate edges are ignored.
+    """
+
+    def __init__(self, relationships: Optional[Iterable[Dict[str, Any]]] = None,
+                 field_relationships: Optional[Dict[Tuple[str, str], str]] = None):
+        """Initialize store.
+
+        Args:
+            relationships: The ``relationships`` configuration section
+            field_relationships: Relationship id per (entity type, reference
+                field); template objects use their dotted path as field
+        """
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        for definition in relationships or []:
+            if isinstance(definition, dict) and definition.get('id'):
+                self._definitions[definition['id']] = definition
+        self._field_relationships = dict(field_relationships or {})
+        self._node_index: Dict[str, int] = {}
+        self._nodes: List[str] = []
+        self._edges: Dict[str, _Adjacency] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'EdgeStore':
+        """Create store from the ``relationships`` and ``entities`` sections.
+
+        Reference mappings name their relationship with ``relationship``;
+        template mappings map each template object to one with
+        ``relationships``.
+        """
+        return cls(config.get('relationships', []), get_field_relationships(config.get('entities')))
+
+    def get_definition(self, relationship_id: str) -> Optional[Dict[str, Any]]:
+        """Get a relationship's configuration."""
+        return self._definitions.get(relationship_id)
+
+    @property
+    def relationship_ids(self) -> List[str]:
+        """Relationship ids with edges."""
+        return list(self._edges)
+
+    def _intern(self, entity_id: str) -> int:
+        node = self._node_index.get(entity_id)
+        if node is None:
+            node = self._node_index[entity_id] = len(self._nodes)
+            self._nodes.append(entity_id)
+        return node
+
+    def add_edge(self, relationship_id: str, source_id: str, target_id: str) -> None:
+        """Add an edge from a relationship's source entity to its target entity."""
+        with self._lock:
+            source, target = self._intern(source_id), self._intern(target_id)
+            edges = self._edges.get(relationship_id)
+            if edges is None:
+                edges = self._edges[relationship_id] = _Adjacency()
+            edges.add(source, target)
+
+    def add_reference(self, relationship_id: str, entity_type: str, entity_id: str,
+                      referenced_id: str) -> None:
+        """Add the edge for a reference from an entity to another entity.
+
+        The edge is oriented by the relationship definition: when the
+        referencing entity is the relationship's target, the referenced
+        entity is its source.
+        """
+        definition = self._definitions.get(relationship_id, {})
+        if definition.get('targetEntity') == entity_type and definition.get('sourceEntity') != entity_type:
+            self.add_edge(relationship_id, referenced_id, entity_id)
+        else:
+            self.add_edge(relationship_id, entity_id, referenced_id)
+
+    def add_entity_edges(self, entity_type: str, entity_id: str, entity: Dict[str, Any]) -> int:
+        """Add edges for an entity's resolved references.
+
+        Entity references need an ``entity_id``; a template object links to
+        its most specific resolved template value, e.g. an agency office
+        over the agency alone.
+
+        Returns:
+            Number of edges emitted
+        """
+        emitted = 0
+        for (source_type, path), relationship_id in self._field_relationships.items():
+            if source_type != entity_type:
+                continue
+            value: Any = entity
+            for part in path.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            if not isinstance(value, dict):
+                continue
+            referenced_id = value.get('entity_id') if 'key' in value else self._most_specific_id(value)
+            if referenced_id:
+                self.add_reference(relationship_id, entity_type, entity_id, referenced_id)
+                emitted += 1
+        return emitted
+
+    @staticmethod
+    def _most_specific_id(template_object: Dict[str, Any]) -> Optional[str]:
+        """Get the resolved ID of the template value with the most key parts."""
+        resolved = [
+            (value.count(DEFAULT_TEMPLATE_SEPARATOR), template_object[f"{name}_id"])
+            for name, value in template_object.items()
+            if isinstance(value, str) and f"{name}_id" in template_object
+        ]
+        return max(resolved)[1] if resolved else None
+
+    def add_resolved(self, reference: ResolvedReference) -> bool:
+        """Add the edge for a reference resolved after its entity was stored.
+
+        Returns:
+            False if the reference field has no relationship
+        """
+        relationship_id = self._field_relationships.get((reference.source_type, reference.field))
+        if relationship_id is None:
+            return False
+        self.add_reference(relationship_id, reference.source_type, reference.source_id, reference.target_id)
+        return True
+
+    def count_edges(self, relationship_id: Optional[str] = None) -> int:
+        """Count distinct edges of one or all relationships."""
+        with self._lock:
+            if relationship_id is not None:
+                edges = self._edges.get(relationship_id)
+                return len(edges) if edges else 0
+            return sum(len(edges) for edges in self._edges.values())
+
+    def __len__(self) -> int:
+        return self.count_edges()
+
+    def _neighbours(self, node: int, relationship_ids: Sequence[str], direction: str) -> Iterable[int]:
+        for relationship_id in relationship_ids:
+            edges = self._edges.get(relationship_id)
+            if edges is None:
+                continue
+            if direction in (OUTGOING, BOTH):
+                yield from edges.neighbours(node, OUTGOING)
+            if direction in (INCOMING, BOTH):
+                yield from edges.neighbours(node, INCOMING)
+
+    def get_related_entities(self, entity_id: str,
+                             relationship_id: Union[str, Sequence[str], None] = None,
+                             direction: str = BOTH, depth: int = 1) -> List[str]:
+        """Get IDs of entities connected to an entity.
+
+        Args:
+            entity_id: Starting entity ID
+            relationship_id: Relationship id or ids to follow; all by default
+            direction: ``outgoing`` follows edges from source to target,
+                ``incoming`` the reverse, ``both`` either way
+            depth: Number of hops
+
+        Returns:
+            Related entity IDs in breadth-first order, excluding the start
+        """
+        if direction not in (OUTGOING, INCOMING, BOTH):
+            raise ValueError(f"Invalid direction: {direction}")
+        if relationship_id is None:
+            relationship_ids: Sequence[str] = list(self._edges)
+        elif isinstance(relationship_id, str):
+            relationship_ids = [relationship_id]
+        else:
+            relationship_ids = list(relationship_id)
+
+        with self._lock:
+            start = self._node_index.get(entity_id)
+            if start is None:
+                return []
+            visited = {start}
+            result: List[str] = []
+            queue = deque([(start, 0)])
+            while queue:
+                node, level = queue.popleft()
+                if level >= depth:
+                    continue
+                for neighbour in self._neighbours(node, relationship_ids, direction):
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        result.append(self._nodes[neighbour])
+                        queue.append((neighbour, level + 1))
+            return result
+
+    def traverse(self, entity_id: str, path: Sequence[Tuple[str, str]]) -> List[str]:
+        """Follow a path of (relationship id, direction) steps from an entity.
+
+        For example, all contracts of a parent recipient::
+
+            store.traverse(parent_id, [("recipient_to_parent", "incoming"),
+                                       ("recipient_to_contract", "outgoing")])
+
+        Returns:
+            IDs of the entities reached by the last step
+        """
+        with self._lock:
+            start = self._node_index.get(entity_id)
+            if start is None:
+                return []
+            frontier = [start]
+            for relationship_id, direction in path:
+                reached: Dict[int, None] = {}
+                for node in frontier:
+                    for neighbour in self._neighbours(node, [relationship_id], direction):
+                        reached.setdefault(neighbour)
+                frontier = list(reached)
+            return [self._nodes[node] for node in frontier]
+
+    def merge(self, other: 'EdgeStore') -> int:
+        """Add another store's edges.
+
+        Returns:
+            Number of new edges
+        """
+        before = self.count_edges()
+        for relationship_id, edges in other._edges.items():
+            for source, target in zip(edges.sources, edges.targets):
+                self.add_edge(relationship_id, other._nodes[source], other._nodes[target])
+        return self.count_edges() - before
+
+    def save(self, path: str) -> None:
+        """Write the store to a file.
+
+        The file holds a JSON header with node IDs and per-relationship edge
+        counts followed by the raw edge arrays.
+        """
+        with self._lock:
+            for edges in self._edges.values():
+                edges.compact()
+            header = json.dumps({
+                'itemsize': array('L').itemsize,
+                'nodes': self._nodes,
+                'relationships': {rid: len(edges) for rid, edges in self._edges.items()}
+            }).encode('utf-8')
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(_EDGE_FILE_MAGIC)
+                    f.write(struct.pack('<Q', len(header)))
+                    f.write(header)
+                    for edges in self._edges.values():
+                        edges.sources.tofile(f)
+                        edges.targets.tofile(f)
+            except OSError as e:
+                raise StorageError(f"Failed to save edges to {path}: {str(e)}")
+
+    def load(self, path: str) -> int:
+        """Add the edges of a file written by ``save``.
+
+        Returns:
+            Number of new edges
+        """
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(_EDGE_FILE_MAGIC)) != _EDGE_FILE_MAGIC:
+                    raise StorageError(f"Not an edge store file: {path}")
+                header = json.loads(f.read(struct.unpack('<Q', f.read(8))[0]))
+                if header['itemsize'] != array('L').itemsize:
+                    raise StorageError(f"Edge store file {path} was written on an incompatible platform")
+                loaded = EdgeStore()
+                loaded._nodes = header['nodes']
+                for relationship_id, count in header['relationships'].items():
+                    edges = loaded._edges[relationship_id] = _Adjacency()
+                    edges.sources.fromfile(f, count)
+                    edges.targets.fromfile(f, count)
+        except (OSError, EOFError, ValueError, KeyError, struct.error) as e:
+            raise StorageError(f"Failed to load edges from {path}: {str(e)}")
+        return self.merge(loaded)
+
+__all__ = ['RelationshipManager', 'EdgeStore', 'get_field_relationships', 'OUTGOING', 'INCOMING', 'BOTH']
\ No newline at end of file
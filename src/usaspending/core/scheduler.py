@@ -0,0 +1,229 @@
+"""Dependency-aware scheduling of entity processing stages.
+
+Builds the entity dependency graph from each entity's ``entity_processing``
+settings once and runs entity stages over a stream of chunks. Every stage has
+its own worker pool sized by ``concurrency.max_workers``; a stage starts on a
+chunk as soon as the stages it depends on have finished that chunk, so
+independent entity types run in parallel and chunks flow through the stages
+as a pipeline.
+
+Only ``required`` dependencies and ``references`` to entities processed
+earlier (lower ``processing_order``) are ordering constraints. Self
+references, ``referenced_by`` entries and references to later entities are
+back references, resolved by the reference index after the referencing
+entity is stored, and do not affect the order.
+
+A stage with more than one worker processes several chunks at once, so it
+may finish them out of input order. Where the entity stored last for a
+repeated ID must be the one from the latest row, give that stage
+``max_workers: 1``.
+"""
+from typing import Dict, Any, List, Mapping, Optional, Callable, Iterable, Iterator, Tuple, TypeVar
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+import logging
+
+from .exceptions import ConfigurationError, ProcessingError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Processing order of entities that do not declare one
+DEFAULT_PROCESSING_ORDER = 999
+
+# Dependency types that always constrain stage order
+HARD_DEPENDENCY_TYPES = {'required'}
+
+# Dependency types that constrain stage order when the target runs earlier
+REFERENCE_DEPENDENCY_TYPES = {'references'}
+
+@dataclass
+class EntityStage:
+    """Scheduled processing stage of one entity type."""
+    name: str
+    order: int = DEFAULT_PROCESSING_ORDER
+    max_workers: int = 1
+    depends_on: List[str] = field(default_factory=list)
+    back_references: List[str] = field(default_factory=list)
+
+def _processing_settings(entity_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Get an entity's processing settings, accepting the legacy ``processing`` key."""
+    return entity_config.get('entity_processing') or entity_config.get('processing') or {}
+
+class EntityScheduler:
+    """Runs entity stages over chunks in dependency order."""
+
+    def __init__(self, entities: Mapping[str, Any], default_workers: int = 1,
+                 max_pending_chunks: Optional[int] = None):
+        """Build the stage graph.
+
+        Args:
+            entities: The ``entities`` configuration section
+            default_workers: Workers for stages without concurrency settings
+            max_pending_chunks: Chunks in flight before ``run`` waits for the
+                oldest; defaults to twice the largest stage worker count
+
+        Raises:
+            ConfigurationError: If a required dependency is unknown or the
+                dependencies form a cycle
+        """
+        self._stages: Dict[str, EntityStage] = {}
+        for name, entity_config in (entities or {}).items():
+            if not isinstance(entity_config, dict):
+                continue
+            settings = _processing_settings(entity_config)
+            if not settings.get('enabled', True):
+                continue
+            concurrency = settings.get('concurrency') or {}
+            workers = concurrency.get('max_workers', default_workers) if concurrency.get('enabled', True) else 1
+            self._stages[name] = EntityStage(
+                name=name,
+                order=settings.get('processing_order', DEFAULT_PROCESSING_ORDER),
+                max_workers=max(1, int(workers or 1))
+            )
+
+        for name, entity_config in (entities or {}).items():
+            if name in self._stages:
+                self._add_dependencies(self._stages[name], _processing_settings(entity_config))
+
+        self._order = self._sort()
+        self.max_pending_chunks = max_pending_chunks or 2 * max(
+            (stage.max_workers for stage in self._stages.values()), default=1
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs: Any) -> 'EntityScheduler':
+        """Create scheduler from a configuration with an ``entities`` section."""
+        return cls(config.get('entities', {}), **kwargs)
+
+    def _add_dependencies(self, stage: EntityStage, settings: Dict[str, Any]) -> None:
+        """Classify an entity's declared dependencies into ordering edges and back references."""
+        for dependency in settings.get('dependencies') or []:
+            if isinstance(dependency, str):
+                target, dep_type = dependency, 'required'
+            else:
+                target, dep_type = dependency.get('entity'), dependency.get('type', 'required')
+            if not target or target == stage.name:
+                continue
+
+            if target not in self._stages:
+                if dep_type in HARD_DEPENDENCY_TYPES:
+                    raise ConfigurationError(
+                        f"Entity '{stage.name}' requires unknown or disabled entity '{target}'"
+                    )
+                logger.debug(f"Ignoring dependency of '{stage.name}' on inactive entity '{target}'")
+                continue
+
+            is_edge = dep_type in HARD_DEPENDENCY_TYPES or (
+                dep_type in REFERENCE_DEPENDENCY_TYPES and self._stages[target].order < stage.order
+            )
+            bucket = stage.depends_on if is_edge else stage.back_references
+            if target not in bucket:
+                bucket.append(target)
+
+    def _sort(self) -> List[str]:
+        """Topologically sort stages, breaking ties by processing order and name."""
+        remaining = {name: set(stage.depends_on) for name, stage in self._stages.items()}
+        order: List[str] = []
+        while remaining:
+            ready = sorted(
+                (name for name, deps in remaining.items() if not deps),
+                key=lambda name: (self._stages[name].order, name)
+            )
+            if not ready:
+                raise ConfigurationError(
+                    f"Entity dependencies form a cycle: {', '.join(sorted(remaining))}"
+                )
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    @property
+    def order(self) -> List[str]:
+        """Entity types in dependency order."""
+        return list(self._order)
+
+    @property
+    def stages(self) -> List[EntityStage]:
+        """Stages in dependency order."""
+        return [self._stages[name] for name in self._order]
+
+    def get_stage(self, entity_type: str) -> Optional[EntityStage]:
+        """Get the stage of an entity type."""
+        return self._stages.get(entity_type)
+
+    def levels(self) -> List[List[str]]:
+        """Group entity types into levels whose members can run in parallel."""
+        depth: Dict[str, int] = {}
+        for name in self._order:
+            depth[name] = 1 + max((depth[dep] for dep in self._stages[name].depends_on), default=-1)
+        levels: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for name in self._order:
+            levels[depth[name]].append(name)
+        return levels
+
+    def run(self, chunks: Iterable[T], stage_func: Callable[[str, T], R]) -> Iterator[Dict[str, R]]:
+        """Run every stage over every chunk.
+
+        Results are yielded per chunk, in chunk order, as a mapping of entity
+        type to ``stage_func`` result. At most ``max_pending_chunks`` chunks
+        are in flight, so chunk iterators are consumed lazily.
+
+        Args:
+            chunks: Chunks to process
+            stage_func: Called as ``stage_func(entity_type, chunk)``
+
+        Raises:
+            ProcessingError: If a stage fails on a chunk
+        """
+        executors = {
+            stage.name: ThreadPoolExecutor(max_workers=stage.max_workers,
+                                           thread_name_prefix=f"stage-{stage.name}")
+            for stage in self.stages
+        }
+        pending: "deque[Tuple[int, Dict[str, Future]]]" = deque()
+
+        def run_stage(name: str, chunk: T, dependencies: List[Future]) -> R:
+            for dependency in dependencies:
+                # Raises if the dependency failed, so dependents are not run on partial input
+                dependency.result()
+            return stage_func(name, chunk)
+
+        def collect(index: int, futures: Dict[str, Future]) -> Dict[str, R]:
+            results = {}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    raise ProcessingError(f"Stage '{name}' failed on chunk {index}: {str(e)}") from e
+            return results
+
+        try:
+            for index, chunk in enumerate(chunks):
+                futures: Dict[str, Future] = {}
+                for name in self._order:
+                    dependencies = [futures[dep] for dep in self._stages[name].depends_on]
+                    futures[name] = executors[name].submit(run_stage, name, chunk, dependencies)
+                pending.append((index, futures))
+                while len(pending) >= self.max_pending_chunks:
+                    yield collect(*pending.popleft())
+            while pending:
+                yield collect(*pending.popleft())
+        finally:
+            for _, futures in pending:
+                for future in futures.values():
+                    future.cancel()
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+__all__ = [
+    'DEFAULT_PROCESSING_ORDER',
+    'EntityScheduler',
+    'EntityStage'
+]
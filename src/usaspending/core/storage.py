@@ -1,17 +1,34 @@
 """Storage implementations for entity persistence."""
-from typing import Dict, Any, Optional, List, Protocol, Generator, TypeVar, Generic, cast
+from typing import Dict, Any, Optional, List, Protocol, Generator, TypeVar, Generic, Iterable, Iterator, Tuple, IO, cast
 from abc import abstractmethod
+from dataclasses import dataclass, field
+from itertools import islice
 import os
+import gzip
 import json
 import sqlite3
+import threading
+import zlib
 from pathlib import Path
 from contextlib import contextmanager
 
 from .types import EntityData
 from .exceptions import StorageError
+from .entity_ids import EntityIdGenerator
+from .entity_serializer import EntityJSONEncoder
 
 T = TypeVar('T', bound=Dict[str, Any])
 
+# Statements are reused verbatim so sqlite3's per-connection statement cache
+# keeps them prepared across calls.
+_INSERT_ENTITY_SQL = "INSERT OR REPLACE INTO entities (id, type, data) VALUES (?, ?, ?)"
+
+def _iter_batches(items: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    """Split an iterable into lists of at most batch_size items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
 class IStorageStrategy(Protocol, Generic[T]):
     """Storage strategy interface."""
     
@@ -19,6 +36,11 @@ class IStorageStrategy(Protocol, Generic[T]):
     def save_entity(self, entity_type: str, entity: T) -> str:
         """Save an entity and return its ID."""
         ...
+
+    @abstractmethod
+    def save_entities(self, entity_type: str, entities: Iterable[T]) -> List[str]:
+        """Save entities in bulk and return their IDs."""
+        ...
         
     @abstractmethod
     def get_entity(self, entity_type: str, entity_id: str) -> Optional[T]:
@@ -48,10 +70,32 @@ class IStorageStrategy(Protocol, Generic[T]):
 class SQLiteStorage(IStorageStrategy[Dict[str, Any]]):
     """SQLite-based entity storage."""
     
-    def __init__(self, db_path: str, max_connections: int = 5):
+    def __init__(self, db_path: str, max_connections: int = 5, batch_size: int = 1000,
+                 journal_mode: str = "WAL", synchronous: str = "NORMAL",
+                 cache_size: int = -64000, cached_statements: int = 128,
+                 id_generator: Optional[EntityIdGenerator] = None):
+        """Initialize storage.
+
+        Args:
+            db_path: Database file path
+            max_connections: Maximum pooled connections
+            batch_size: Entities per transaction for bulk saves
+            journal_mode: SQLite journal mode pragma
+            synchronous: SQLite synchronous pragma
+            cache_size: SQLite cache_size pragma (negative values are KiB)
+            cached_statements: Prepared statements cached per connection
+            id_generator: Entity ID generator, defaults to content digests
+        """
         self.db_path = db_path
         self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.cached_statements = cached_statements
+        self.id_generator = id_generator or EntityIdGenerator()
         self._conn_pool: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
         self._initialize_db()
         
     @contextmanager
@@ -82,31 +126,55 @@ class SQLiteStorage(IStorageStrategy[Dict[str, Any]]):
         
     def _get_connection(self) -> sqlite3.Connection:
         """Get a database connection."""
-        if not self._conn_pool:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-            
-        return self._conn_pool.pop()
+        with self._pool_lock:
+            if self._conn_pool:
+                return self._conn_pool.pop()
+
+        # Pooled connections are handed between writer threads
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
         
     def _return_connection(self, conn: sqlite3.Connection) -> None:
         """Return a connection to the pool."""
-        if len(self._conn_pool) < self.max_connections:
-            self._conn_pool.append(conn)
-        else:
-            conn.close()
+        with self._pool_lock:
+            if len(self._conn_pool) < self.max_connections:
+                self._conn_pool.append(conn)
+                return
+        conn.close()
     
     def save_entity(self, entity_type: str, entity: Dict[str, Any]) -> str:
         """Save an entity."""
-        entity_id = str(hash(json.dumps(entity, sort_keys=True)))
+        entity_id = self.id_generator.generate(entity_type, entity)
         
         with self.get_connection_context() as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO entities (id, type, data) VALUES (?, ?, ?)",
-                (entity_id, entity_type, json.dumps(entity))
-            )
+            conn.execute(_INSERT_ENTITY_SQL, (entity_id, entity_type, json.dumps(entity, cls=EntityJSONEncoder)))
             
         return entity_id
+
+    def save_entities(self, entity_type: str, entities: Iterable[Dict[str, Any]]) -> List[str]:
+        """Save entities in bulk, one transaction per batch."""
+        entity_ids: List[str] = []
+
+        for batch in _iter_batches(entities, self.batch_size):
+            rows = []
+            for entity in batch:
+                entity_id = self.id_generator.generate(entity_type, entity)
+                rows.append((entity_id, entity_type, json.dumps(entity, cls=EntityJSONEncoder)))
+                entity_ids.append(entity_id)
+
+            with self.get_connection_context() as conn:
+                conn.executemany(_INSERT_ENTITY_SQL, rows)
+
+        return entity_ids
     
     def get_entity(self, entity_type: str, entity_id: str) -> Optional[Dict[str, Any]]:
         """Get an entity by ID."""
@@ -159,17 +227,20 @@ class SQLiteStorage(IStorageStrategy[Dict[str, Any]]):
 
     def cleanup(self) -> None:
         """Clean up resources."""    
-        for conn in self._conn_pool:
-            conn.close()
-        self._conn_pool.clear()
+        with self._pool_lock:
+            for conn in self._conn_pool:
+                conn.close()
+            self._conn_pool.clear()
 
 class FileSystemStorage(IStorageStrategy[Dict[str, Any]]):
     """File system based entity storage."""
     
-    def __init__(self, base_path: str, max_files_per_dir: int = 1000, compression: bool = True):
+    def __init__(self, base_path: str, max_files_per_dir: int = 1000, compression: bool = True,
+                 id_generator: Optional[EntityIdGenerator] = None):
         self.base_path = Path(base_path)
         self.max_files_per_dir = max_files_per_dir
         self.compression = compression
+        self.id_generator = id_generator or EntityIdGenerator()
         self._ensure_base_dir()
         
     def _ensure_base_dir(self) -> None:
@@ -179,20 +250,25 @@ class FileSystemStorage(IStorageStrategy[Dict[str, Any]]):
     def _get_entity_path(self, entity_type: str, entity_id: str) -> Path:
         """Get path for entity file."""
         type_dir = self.base_path / entity_type
-        shard = str(hash(entity_id) % self.max_files_per_dir)
+        # crc32 is stable across processes, unlike hash() on strings
+        shard = str(zlib.crc32(entity_id.encode('utf-8')) % self.max_files_per_dir)
         shard_dir = type_dir / shard
         shard_dir.mkdir(parents=True, exist_ok=True)
         return shard_dir / f"{entity_id}.json"
         
     def save_entity(self, entity_type: str, entity: Dict[str, Any]) -> str:
         """Save an entity."""
-        entity_id = str(hash(json.dumps(entity, sort_keys=True)))
+        entity_id = self.id_generator.generate(entity_type, entity)
         path = self._get_entity_path(entity_type, entity_id)
         
         with open(path, 'w') as f:
-            json.dump(entity, f)
+            json.dump(entity, f, cls=EntityJSONEncoder)
             
         return entity_id
+
+    def save_entities(self, entity_type: str, entities: Iterable[Dict[str, Any]]) -> List[str]:
+        """Save entities in bulk."""
+        return [self.save_entity(entity_type, entity) for entity in entities]
         
     def get_entity(self, entity_type: str, entity_id: str) -> Optional[Dict[str, Any]]:
         """Get an entity by ID."""
@@ -250,8 +326,306 @@ class FileSystemStorage(IStorageStrategy[Dict[str, Any]]):
         # No cleanup needed for file system storage
         pass
 
+# Index entry: (segment number, byte offset, record length)
+SegmentEntry = Tuple[int, int, int]
+
+@dataclass
+class _SegmentState:
+    """Open segment and offset index for one entity type."""
+    index: Dict[str, SegmentEntry] = field(default_factory=dict)
+    compressed: Dict[int, bool] = field(default_factory=dict)
+    segment: int = 0
+    size: int = 0
+    total_bytes: int = 0
+    dead_bytes: int = 0
+    data_file: Optional[IO[bytes]] = None
+    index_file: Optional[IO[str]] = None
+
+class SegmentedFileStorage(IStorageStrategy[Dict[str, Any]]):
+    """Append-only segmented file storage.
+
+    Entities of a type are appended as JSON lines to rolling segment files.
+    Each segment has a sidecar index of ``entity_id, offset, length`` lines,
+    replayed on first access to rebuild an in-memory offset index. Updates
+    append a new version and deletes append a tombstone, so writes never
+    rewrite existing data. With compression enabled each record is written
+    as its own gzip member, keeping records individually addressable while
+    the segment remains a valid gzip stream.
+
+    Superseded versions and deleted records are dead bytes. On cleanup, a
+    type whose dead bytes reach ``compact_ratio`` of its records is
+    compacted: the latest version of each live entity is rewritten into
+    new segments and the old segments are removed, bounding both disk use
+    and the index replayed on reopen.
+    """
+
+    SEGMENT_PREFIX = "segment-"
+    TOMBSTONE = -1
+
+    def __init__(self, base_path: str, max_segment_size: int = 64 * 1024 * 1024,
+                 compression: bool = True, id_generator: Optional[EntityIdGenerator] = None,
+                 compact_ratio: Optional[float] = 0.5):
+        self.base_path = Path(base_path)
+        self.max_segment_size = max_segment_size
+        self.compression = compression
+        self.compact_ratio = compact_ratio
+        self.id_generator = id_generator or EntityIdGenerator()
+        self._states: Dict[str, _SegmentState] = {}
+        self._lock = threading.RLock()
+        self.base_path.mkdir(parents=True, exist_ok=True)
+
+    def _type_dir(self, entity_type: str) -> Path:
+        """Get directory for an entity type."""
+        return self.base_path / entity_type
+
+    def _segment_path(self, entity_type: str, segment: int, compressed: bool) -> Path:
+        """Get path for a segment data file."""
+        suffix = ".jsonl.gz" if compressed else ".jsonl"
+        return self._type_dir(entity_type) / f"{self.SEGMENT_PREFIX}{segment:06d}{suffix}"
+
+    def _index_path(self, entity_type: str, segment: int) -> Path:
+        """Get path for a segment index file."""
+        return self._type_dir(entity_type) / f"{self.SEGMENT_PREFIX}{segment:06d}.idx"
+
+    def _get_state(self, entity_type: str) -> _SegmentState:
+        """Get segment state for a type, replaying existing indexes once."""
+        state = self._states.get(entity_type)
+        if state is not None:
+            return state
+
+        state = _SegmentState()
+        type_dir = self._type_dir(entity_type)
+        if type_dir.exists():
+            index_paths = sorted(type_dir.glob(f"{self.SEGMENT_PREFIX}*.idx"))
+            for index_path in index_paths:
+                segment = int(index_path.stem[len(self.SEGMENT_PREFIX):])
+                state.compressed[segment] = self._segment_path(entity_type, segment, True).exists()
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        entity_id, offset, length = line.rstrip('\n').split('\t')
+                        previous = state.index.pop(entity_id, None)
+                        if previous is not None:
+                            state.dead_bytes += previous[2]
+                        if int(length) != self.TOMBSTONE:
+                            state.index[entity_id] = (segment, int(offset), int(length))
+                            state.total_bytes += int(length)
+            if index_paths:
+                state.segment = max(state.compressed)
+                data_path = self._segment_path(
+                    entity_type, state.segment, state.compressed[state.segment]
+                )
+                state.size = data_path.stat().st_size if data_path.exists() else 0
+
+        self._states[entity_type] = state
+        return state
+
+    def _open_segment(self, entity_type: str, state: _SegmentState) -> None:
+        """Open the active segment for appending, rolling over when full."""
+        if state.data_file is not None and state.size < self.max_segment_size:
+            return
+
+        # Roll over a full segment, or one written with another compression setting
+        if state.size > 0 and (state.size >= self.max_segment_size
+                               or state.compressed.get(state.segment) != self.compression):
+            self._close_segment(state)
+            state.segment += 1
+            state.size = 0
+
+        self._type_dir(entity_type).mkdir(parents=True, exist_ok=True)
+        state.compressed[state.segment] = self.compression
+        state.data_file = open(self._segment_path(entity_type, state.segment, self.compression), 'ab')
+        state.index_file = open(self._index_path(entity_type, state.segment), 'a', encoding='utf-8')
+
+    @staticmethod
+    def _close_segment(state: _SegmentState) -> None:
+        """Close open segment files."""
+        if state.data_file is not None:
+            state.data_file.close()
+            state.data_file = None
+        if state.index_file is not None:
+            state.index_file.close()
+            state.index_file = None
+
+    @staticmethod
+    def _flush(state: _SegmentState) -> None:
+        """Flush pending appends so they are visible to readers."""
+        if state.data_file is not None:
+            state.data_file.flush()
+        if state.index_file is not None:
+            state.index_file.flush()
+
+    def _encode(self, entity: Dict[str, Any]) -> bytes:
+        """Encode an entity record."""
+        record = json.dumps(entity, cls=EntityJSONEncoder).encode('utf-8') + b"\n"
+        if self.compression:
+            return gzip.compress(record, mtime=0)
+        return record
+
+    @staticmethod
+    def _decode(data: bytes, compressed: bool) -> Dict[str, Any]:
+        """Decode an entity record."""
+        if compressed:
+            data = gzip.decompress(data)
+        return cast(Dict[str, Any], json.loads(data))
+
+    def _append(self, entity_type: str, state: _SegmentState, entity_id: str,
+                entity: Dict[str, Any]) -> None:
+        """Append an entity record and its index entry."""
+        self._append_record(entity_type, state, entity_id, self._encode(entity))
+
+    def _append_record(self, entity_type: str, state: _SegmentState, entity_id: str,
+                       record: bytes) -> None:
+        """Append an encoded record and its index entry."""
+        self._open_segment(entity_type, state)
+        assert state.data_file is not None and state.index_file is not None  # For mypy
+
+        offset = state.size
+        state.data_file.write(record)
+        state.index_file.write(f"{entity_id}\t{offset}\t{len(record)}\n")
+        state.size += len(record)
+        previous = state.index.get(entity_id)
+        if previous is not None:
+            state.dead_bytes += previous[2]
+        state.total_bytes += len(record)
+        state.index[entity_id] = (state.segment, offset, len(record))
+
+    def save_entity(self, entity_type: str, entity: Dict[str, Any]) -> str:
+        """Save an entity."""
+        entity_id = self.id_generator.generate(entity_type, entity)
+        with self._lock:
+            self._append(entity_type, self._get_state(entity_type), entity_id, entity)
+        return entity_id
+
+    def save_entities(self, entity_type: str, entities: Iterable[Dict[str, Any]]) -> List[str]:
+        """Save entities in bulk."""
+        entity_ids: List[str] = []
+        with self._lock:
+            state = self._get_state(entity_type)
+            for entity in entities:
+                entity_id = self.id_generator.generate(entity_type, entity)
+                self._append(entity_type, state, entity_id, entity)
+                entity_ids.append(entity_id)
+        return entity_ids
+
+    def _read_record(self, entity_type: str, state: _SegmentState, entry: SegmentEntry) -> Dict[str, Any]:
+        """Read a single record by index entry."""
+        segment, offset, length = entry
+        compressed = state.compressed[segment]
+        with open(self._segment_path(entity_type, segment, compressed), 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        try:
+            return self._decode(data, compressed)
+        except (OSError, ValueError) as e:
+            raise StorageError(f"Invalid segment record at {segment}:{offset}: {str(e)}")
+
+    def get_entity(self, entity_type: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Get an entity by ID."""
+        with self._lock:
+            state = self._get_state(entity_type)
+            entry = state.index.get(entity_id)
+            if entry is None:
+                return None
+            self._flush(state)
+        return self._read_record(entity_type, state, entry)
+
+    def delete_entity(self, entity_type: str, entity_id: str) -> bool:
+        """Delete an entity by appending a tombstone."""
+        with self._lock:
+            state = self._get_state(entity_type)
+            if entity_id not in state.index:
+                return False
+            self._open_segment(entity_type, state)
+            assert state.index_file is not None  # For mypy
+            state.index_file.write(f"{entity_id}\t0\t{self.TOMBSTONE}\n")
+            state.dead_bytes += state.index.pop(entity_id)[2]
+            return True
+
+    def _read_records(self, entity_type: str, state: _SegmentState,
+                      entries: Iterable[Tuple[str, SegmentEntry]]) -> Generator[Tuple[str, int, bytes], None, None]:
+        """Read raw records with sequential reads; entries must be in segment order.
+
+        Yields:
+            Entity ID, source segment and encoded record
+        """
+        current_segment: Optional[int] = None
+        f: Optional[IO[bytes]] = None
+        try:
+            for entity_id, (segment, offset, length) in entries:
+                if segment != current_segment:
+                    if f is not None:
+                        f.close()
+                    current_segment = segment
+                    f = open(self._segment_path(entity_type, segment, state.compressed[segment]), 'rb')
+                assert f is not None  # For mypy
+                if f.tell() != offset:
+                    f.seek(offset)
+                yield entity_id, segment, f.read(length)
+        finally:
+            if f is not None:
+                f.close()
+
+    def list_entities(self, entity_type: str) -> Generator[Dict[str, Any], None, None]:
+        """Stream live entities in segment order with sequential reads."""
+        with self._lock:
+            state = self._get_state(entity_type)
+            self._flush(state)
+            entries = sorted(state.index.items(), key=lambda item: item[1])
+
+        for _, segment, data in self._read_records(entity_type, state, entries):
+            try:
+                yield self._decode(data, state.compressed[segment])
+            except (OSError, ValueError):
+                continue  # Skip invalid entities but continue processing
+
+    def compact(self, entity_type: str) -> None:
+        """Rewrite the live records of a type into new segments and remove the old ones.
+
+        New segments are numbered after the existing ones, so an interrupted
+        compaction replays to the same entities: the copies supersede their
+        originals.
+        """
+        with self._lock:
+            state = self._get_state(entity_type)
+            self._close_segment(state)
+            old_segments = sorted(state.compressed)
+            entries = sorted(state.index.items(), key=lambda item: item[1])
+
+            compacted = _SegmentState(segment=state.segment + 1)
+            for entity_id, segment, data in self._read_records(entity_type, state, entries):
+                if state.compressed[segment] != self.compression:
+                    data = self._encode(self._decode(data, state.compressed[segment]))
+                self._append_record(entity_type, compacted, entity_id, data)
+            self._close_segment(compacted)
+
+            for segment in old_segments:
+                self._segment_path(entity_type, segment, state.compressed[segment]).unlink(missing_ok=True)
+                self._index_path(entity_type, segment).unlink(missing_ok=True)
+            self._states[entity_type] = compacted
+
+    def _needs_compaction(self, state: _SegmentState) -> bool:
+        """Check whether dead bytes reach the compaction ratio."""
+        return (self.compact_ratio is not None and state.dead_bytes > 0
+                and state.dead_bytes >= self.compact_ratio * state.total_bytes)
+
+    def count_entities(self, entity_type: str) -> int:
+        """Count entities of a type."""
+        with self._lock:
+            return len(self._get_state(entity_type).index)
+
+    def cleanup(self) -> None:
+        """Compact types with enough dead bytes, then flush and close open segments."""
+        with self._lock:
+            for entity_type in list(self._states):
+                if self._needs_compaction(self._states[entity_type]):
+                    self.compact(entity_type)
+            for state in self._states.values():
+                self._close_segment(state)
+            self._states.clear()
+
 __all__ = [
     'IStorageStrategy',
     'SQLiteStorage',
-    'FileSystemStorage'
+    'FileSystemStorage',
+    'SegmentedFileStorage'
 ]
\ No newline at end of file
@@ -1,11 +1,12 @@
 """Core data transformation functionality."""
-from typing import Dict, Any, List, Optional, Callable, Type, Literal, TypeVar, Generic, Protocol, cast
+from typing import Dict, Any, List, Optional, Callable, Sequence, Tuple, Type, Literal, TypeVar, Generic, Protocol, cast
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import re
 from .types import TransformationRule, TransformerType
 from .exceptions import TransformationError
+from .columnar import ColumnarTransformer
+from .patterns import pattern_registry
 
 @dataclass
 class BaseTransformParams:
@@ -103,7 +104,8 @@ class StringTransformer(BaseTransformer[StringTransformParams]):
                 result = result.ljust(parameters.length, parameters.pad_char)
                 
         if parameters.pattern:
-            if not re.match(parameters.pattern, result):
+            compiled = pattern_registry.get(parameters.pattern)
+            if compiled is None or not compiled.match(result):
                 raise TransformationError(f"Value does not match pattern: {parameters.pattern}")
                 
         return result
@@ -277,6 +279,7 @@ class TransformationEngine:
     def __init__(self) -> None:
         """Initialize transformation engine."""
         self.factory = TransformerFactory()
+        self._columnar: Dict[Tuple[str, ...], Tuple[Dict[str, Any], ColumnarTransformer]] = {}
         
     def transform_value(self, value: Any, rule: TransformationRule) -> Any:
         """Transform a value using a rule."""
@@ -300,6 +303,27 @@ class TransformationEngine:
                         f"Error transforming field {rule.field_name}: {str(e)}")
                         
         return result
+
+    def get_columnar_transformer(self, field_properties: Dict[str, Any],
+                                 columns: Sequence[str]) -> ColumnarTransformer:
+        """Get the compiled columnar transformer for a set of columns."""
+        key = tuple(columns)
+        cached = self._columnar.get(key)
+        if cached is None or cached[0] is not field_properties:
+            cached = (field_properties, ColumnarTransformer.from_field_properties(field_properties, key))
+            self._columnar[key] = cached
+        return cached[1]
+
+    def transform_batch(self, records: Sequence[Dict[str, Any]],
+                        field_properties: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Transform a batch of records in columnar mode using ``field_properties`` operations.
+
+        Invalid values are left unchanged and reported in the transformer's ``errors``.
+        """
+        if not records:
+            return []
+        transformer = self.get_columnar_transformer(field_properties, list(records[0]))
+        return transformer.transform_records(records)
     
     def _get_params_class(self, transform_type: TransformerType) -> Type[BaseTransformParams]:
         """Get the parameter class for a transformer type."""
@@ -333,5 +357,6 @@ __all__ = [
     
     # Factory and Engine
     'TransformerFactory',
-    'TransformationEngine'
+    'TransformationEngine',
+    'ColumnarTransformer'
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 """Core type definitions and type management system."""
-from typing import Dict, List, Any, Set, Optional, Union, TypedDict, DefaultDict, Literal, Type, TypeVar, NewType, cast, NamedTuple, Generic, Protocol
+from typing import Dict, List, Any, Set, Optional, Pattern, Iterator, Tuple, Union, TypedDict, DefaultDict, Literal, Type, TypeVar, NewType, cast, NamedTuple, Generic, Protocol
 from enum import Enum, auto
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -147,6 +147,8 @@ class ValidationRule:
     groups: List[str] = field(default_factory=list)
     dependencies: List[str] = field(default_factory=list)
     validation_context: Optional[Dict[str, Any]] = None
+    # Compiled form of parameters['pattern'], set when the rule is registered
+    compiled_pattern: Optional[Pattern[str]] = field(default=None, repr=False, compare=False)
 
 @dataclass
 class ValidationResult:
@@ -158,6 +160,68 @@ class ValidationResult:
     rule_type: Optional[RuleType] = None
     validation_context: Optional[Dict[str, Any]] = None
 
+@dataclass
+class BatchValidationResult:
+    """Result of validating a batch of records.
+
+    Failures are stored as one bitmap per rule, with bit ``i`` set when row
+    ``i`` failed the rule. Messages are only formatted when requested.
+    """
+    row_count: int
+    rules: List[ValidationRule] = field(default_factory=list)
+    bitmaps: List[bytearray] = field(default_factory=list)
+    # Messages from entity-level validators, which report errors eagerly
+    row_errors: Dict[int, List[str]] = field(default_factory=dict)
+
+    @staticmethod
+    def _is_set(bitmap: bytearray, row: int) -> bool:
+        return bool(bitmap[row >> 3] & (1 << (row & 7)))
+
+    def is_valid(self, row: Optional[int] = None) -> bool:
+        """Check whether a row, or the whole batch when row is None, passed."""
+        if row is None:
+            return not self.row_errors and not any(any(bitmap) for bitmap in self.bitmaps)
+        return row not in self.row_errors and not any(self._is_set(b, row) for b in self.bitmaps)
+
+    def invalid_rows(self) -> List[int]:
+        """Get indices of rows that failed any rule."""
+        rows = set(self.row_errors)
+        rows.update(row for row, _ in self.iter_failures())
+        return sorted(rows)
+
+    def failure_count(self) -> int:
+        """Count (row, rule) failures."""
+        return (sum(bin(byte).count('1') for bitmap in self.bitmaps for byte in bitmap) +
+                sum(len(errors) for errors in self.row_errors.values()))
+
+    def iter_failures(self) -> Iterator[Tuple[int, ValidationRule]]:
+        """Yield (row, rule) pairs for every rule failure."""
+        for rule, bitmap in zip(self.rules, self.bitmaps):
+            for byte_index, byte in enumerate(bitmap):
+                while byte:
+                    bit = byte & -byte
+                    yield (byte_index << 3) + bit.bit_length() - 1, rule
+                    byte ^= bit
+
+    @staticmethod
+    def format_message(rule: ValidationRule) -> str:
+        """Format the error message of a failed rule."""
+        return rule.message or f"Field '{rule.field_name}' failed {rule.rule_type.value} validation"
+
+    def iter_messages(self) -> Iterator[Tuple[int, str]]:
+        """Yield (row, message) pairs, formatting messages on demand."""
+        for row, rule in self.iter_failures():
+            yield row, self.format_message(rule)
+        for row, errors in sorted(self.row_errors.items()):
+            for error in errors:
+                yield row, error
+
+    def get_messages(self, row: int) -> List[str]:
+        """Get the error messages of one row."""
+        messages = [self.format_message(rule) for rule, bitmap in zip(self.rules, self.bitmaps)
+                    if self._is_set(bitmap, row)]
+        return messages + self.row_errors.get(row, [])
+
 TransformerType = Literal["string", "numeric", "date", "boolean", "enum"]
 
 @dataclass
@@ -248,6 +312,7 @@ __all__ = [
     'Cardinality',
     'ValidationRule',
     'ValidationResult',
+    'BatchValidationResult',
     'ValidationSeverity',
     'RuleType',
     'ComponentTypeConfig',
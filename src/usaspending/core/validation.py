@@ -6,6 +6,8 @@ from .interfaces import IValidationMediator
 from .types import ValidationRule, RuleSet
 from .exceptions import ValidationError
 from .utils import safe_operation
+from .patterns import pattern_registry
+from .error_sink import ErrorSink
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,7 @@ class BaseValidator(ABC):
     def __init__(self) -> None:
         """Initialize validator."""
         self._rules: List[ValidationRule] = []
-        self._errors: List[str] = []
+        self._errors = ErrorSink()
         self._initialized: bool = False
         self._enabled: bool = True
         self._rule_sets: Dict[str, RuleSet] = {}
@@ -95,6 +97,7 @@ class ValidationService(BaseValidator):
         
     def add_validation_rule(self, rule: ValidationRule) -> None:
         """Add a validation rule."""
+        pattern_registry.compile_rule(rule)
         if rule.field_name not in self._rule_sets:
             self._rule_sets[rule.field_name] = RuleSet(rule.field_name, [])
         self._rule_sets[rule.field_name].rules.append(rule)
@@ -1,7 +1,36 @@
 """Validation mediator implementation."""
-from typing import Dict, Any, List, Optional, Sequence, Union
+from typing import Dict, Any, List, Optional, Callable, Pattern, Sequence, Union
+import re
 from ..core.interfaces import IValidationMediator, IValidator
-from ..core.types import ValidationRule, RuleSet, EntityType
+from ..core.types import ValidationRule, RuleSet, EntityType, BatchValidationResult
+from ..core.patterns import pattern_registry
+from ..core.error_sink import ErrorSink
+
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Marks fields absent from a record in batch columns
+_MISSING = object()
+
+ValueCheck = Callable[[Any, Dict[str, Any]], bool]
+
+def _escape(text: str) -> str:
+    """Escape literal braces for use in a message template."""
+    return str(text).replace('{', '{{').replace('}', '}}')
+
+class _CompiledRule:
+    """A rule compiled into a value check and its default error message.
+
+    ``check(value, context)`` returns whether the value passes; only the
+    required rule fails None. ``message`` is None for custom rules, whose
+    validator reports its own errors.
+    """
+
+    __slots__ = ('rule', 'check', 'message')
+
+    def __init__(self, rule: ValidationRule, check: ValueCheck, message: Optional[str]):
+        self.rule = rule
+        self.check = check
+        self.message = message
 
 class ValidationMediator(IValidationMediator):
     """Implementation of validation mediation."""
@@ -9,8 +38,9 @@ class ValidationMediator(IValidationMediator):
     def __init__(self) -> None:
         """Initialize validation mediator."""
         self._rule_sets: Dict[str, RuleSet] = {}
+        self._compiled: Dict[str, List[_CompiledRule]] = {}
         self._validators: Dict[str, IValidator] = {}
-        self._errors: List[str] = []
+        self._errors = ErrorSink()
         self._stats = {
             'validated_fields': 0,
             'validation_errors': 0
@@ -18,11 +48,140 @@ class ValidationMediator(IValidationMediator):
 
     def register_rules(self, field_name: str, rules: Sequence[ValidationRule]) -> None:
         """Register validation rules for a field."""
-        rule_set = RuleSet(
-            name=field_name,
-            rules=list(rules)
-        )
-        self._rule_sets[field_name] = rule_set
+        self.register_rule_set(RuleSet(name=field_name, rules=list(rules)))
+
+    def register_rule_set(self, rule_set: RuleSet) -> None:
+        """Register a rule set, compiling its rules once."""
+        compiled = []
+        for rule in rule_set.rules:
+            pattern_registry.compile_rule(rule)
+            compiled_rule = self._compile_rule(rule)
+            if compiled_rule is not None:
+                compiled.append(compiled_rule)
+        self._rule_sets[rule_set.name] = rule_set
+        self._compiled[rule_set.name] = compiled
+
+    def _compile_rule(self, rule: ValidationRule) -> Optional[_CompiledRule]:
+        """Compile a rule into a value check, or None if it always passes."""
+        rule_type = rule.rule_type.value
+        params = rule.parameters or {}
+
+        if rule_type == "required":
+            return _CompiledRule(rule, lambda value, context: value is not None, "Field '{field}' is required")
+
+        check: Optional[Callable[[Any], bool]] = None
+        message = ""
+        if rule_type == "type" and params.get("value"):
+            expected_type = params["value"]
+            check = lambda value: self._check_type(value, expected_type)
+            message = f"Field '{{field}}' must be of type {expected_type}"
+        elif rule_type == "pattern" and params.get("pattern"):
+            pattern = rule.compiled_pattern or params["pattern"]
+            check = lambda value: self._check_pattern(value, pattern)
+            message = "Field '{field}' must match pattern " + _escape(params["pattern"])
+        elif rule_type == "range":
+            min_val, max_val = params.get("min"), params.get("max")
+            check = lambda value: self._check_range(value, min_val, max_val)
+            message = f"Field '{{field}}' must be within range {min_val} to {max_val}"
+        elif rule_type == "enum" and params.get("values"):
+            valid_values = set(params["values"])
+            check = lambda value: str(value) in valid_values
+            message = "Field '{field}' must be one of: " + _escape(', '.join(params["values"]))
+        elif rule_type == "length":
+            min_len, max_len = params.get("min"), params.get("max")
+            check = lambda value: self._check_length(value, min_len, max_len)
+            message = f"Field '{{field}}' length must be between {min_len or 0} and {max_len or 'unlimited'}"
+        elif rule_type == "custom" and params.get("validator"):
+            validator_name = params["validator"]
+
+            # Validators may be registered after the rule
+            def check_custom(value: Any, context: Dict[str, Any]) -> bool:
+                validator = self._validators.get(validator_name)
+                return validator is None or validator.validate(rule.field_name, {"value": value}, context=context)
+            return _CompiledRule(rule, lambda value, context: value is None or check_custom(value, context), None)
+
+        if check is None:
+            return None
+        value_check = check
+        return _CompiledRule(rule, lambda value, context: value is None or value_check(value), message)
+
+    def _active_rules(self, field_name: str) -> List[_CompiledRule]:
+        """Get the compiled rules of a field's enabled rule set that are enabled."""
+        rule_set = self._rule_sets.get(field_name)
+        if rule_set is None or not rule_set.enabled:
+            return []
+        return [compiled for compiled in self._compiled.get(field_name, ())
+                if getattr(compiled.rule, 'enabled', True)]
+
+    def validate_batch(self, entity_type: Union[EntityType, str], records: Sequence[Dict[str, Any]],
+                       context: Optional[Dict[str, Any]] = None,
+                       skip_empty: bool = False) -> BatchValidationResult:
+        """Validate a batch of records column by column.
+
+        Each rule is evaluated over its field's column in one pass, recording
+        failures in a per-rule row bitmap. Error messages are not built
+        unless read from the result, and ``get_validation_errors`` is not
+        affected.
+
+        Args:
+            entity_type: Entity type of the records
+            records: Records to validate
+            context: Validation context passed to custom validators
+            skip_empty: Treat empty strings, e.g. empty CSV cells, as
+                absent fields rather than values to check
+
+        Returns:
+            Batch result with per-rule failure bitmaps
+        """
+        context = context or {}
+        row_count = len(records)
+        result = BatchValidationResult(row_count=row_count)
+
+        # Entity-level validators run per record, as in validate()
+        validator = self._validators.get(str(entity_type))
+        if validator is not None:
+            for row, data in enumerate(records):
+                if hasattr(validator, 'clear_errors'):
+                    validator.clear_errors()
+                if not validator.validate(str(entity_type), data, context):
+                    errors = validator.get_errors() if hasattr(validator, 'get_errors') else []
+                    result.row_errors[row] = list(errors) or [f"Validation failed for {entity_type}"]
+            return result
+
+        present: set = set()
+        for data in records:
+            present.update(data.keys())
+
+        for field_name in self._rule_sets:
+            if field_name not in present:
+                continue
+            rules = self._active_rules(field_name)
+            if not rules:
+                continue
+            column = [data.get(field_name, _MISSING) for data in records]
+            if skip_empty:
+                column = [_MISSING if value == "" else value for value in column]
+            field_failures = bytearray((row_count + 7) >> 3)
+
+            for compiled in rules:
+                check = compiled.check
+                bitmap = bytearray((row_count + 7) >> 3)
+                failed = False
+                for row, value in enumerate(column):
+                    if value is not _MISSING and not check(value, context):
+                        bitmap[row >> 3] |= 1 << (row & 7)
+                        failed = True
+                if failed:
+                    result.rules.append(compiled.rule)
+                    result.bitmaps.append(bitmap)
+                    for i, byte in enumerate(bitmap):
+                        field_failures[i] |= byte
+
+            validated = row_count - column.count(_MISSING) if _MISSING in column else row_count
+            self._stats['validated_fields'] += validated
+            self._stats['validation_errors'] += sum(bin(byte).count('1') for byte in field_failures)
+
+        return result
 
     def register_validator(self, entity_type: Union[EntityType, str], validator: IValidator) -> None:
         """Register a validator for an entity type."""
@@ -62,90 +221,37 @@ class ValidationMediator(IValidationMediator):
 
     def _validate_field(self, field_name: str, value: Any, validation_context: Dict[str, Any]) -> bool:
         """Internal method to validate a field value using registered rules."""
-        rule_set = self._rule_sets.get(field_name)
-        if not rule_set:
+        if field_name not in self._rule_sets:
             return True  # No rules to validate against
 
-        is_valid = self._validate_against_ruleset(rule_set, value, validation_context)
+        is_valid = self._validate_against_rules(self._active_rules(field_name), value, validation_context)
         if not is_valid:
             self._stats['validation_errors'] += 1
         self._stats['validated_fields'] += 1
         
         return is_valid
         
-    def _validate_against_ruleset(self, rule_set: RuleSet, value: Any, validation_context: Dict[str, Any]) -> bool:
-        """Validate a value against rules in a ruleset."""
-        if not rule_set:
-            return True
-            
+    def _validate_against_rules(self, rules: Sequence[_CompiledRule], value: Any,
+                                validation_context: Dict[str, Any]) -> bool:
+        """Validate a value against compiled rules, recording an error per failed rule."""
         is_valid = True
-        
-        for rule in rule_set.rules:
-            if not getattr(rule, 'enabled', True):
+        for compiled in rules:
+            if compiled.check(value, validation_context):
                 continue
-                
-            # Basic validation logic for different rule types
-            rule_type = rule.rule_type.value
-            
-            # Required field validation
-            if rule_type == "required" and value is None:
-                self._errors.append(rule.message or f"Field '{rule.field_name}' is required")
-                is_valid = False
-                continue
-                
-            # Skip other validations if value is None (unless it was required)
-            if value is None:
+            is_valid = False
+            if compiled.message is not None:
+                self._add_error(compiled.rule, compiled.message, value)
                 continue
-                
-            # Type validation
-            if rule_type == "type":
-                expected_type = rule.parameters.get("value")
-                if expected_type and not self._check_type(value, expected_type):
-                    self._errors.append(rule.message or f"Field '{rule.field_name}' must be of type {expected_type}")
-                    is_valid = False
-                    
-            # Pattern validation
-            elif rule_type == "pattern":
-                pattern = rule.parameters.get("pattern")
-                if pattern and not self._check_pattern(value, pattern):
-                    self._errors.append(rule.message or f"Field '{rule.field_name}' must match pattern {pattern}")
-                    is_valid = False
-                    
-            # Range validation
-            elif rule_type == "range":
-                min_val = rule.parameters.get("min")
-                max_val = rule.parameters.get("max")
-                if not self._check_range(value, min_val, max_val):
-                    self._errors.append(rule.message or f"Field '{rule.field_name}' must be within range {min_val} to {max_val}")
-                    is_valid = False
-                    
-            # Enumeration validation
-            elif rule_type == "enum":
-                valid_values = rule.parameters.get("values", [])
-                if valid_values and str(value) not in valid_values:
-                    self._errors.append(rule.message or f"Field '{rule.field_name}' must be one of: {', '.join(valid_values)}")
-                    is_valid = False
-                    
-            # Length validation
-            elif rule_type == "length":
-                min_len = rule.parameters.get("min")
-                max_len = rule.parameters.get("max")
-                if not self._check_length(value, min_len, max_len):
-                    self._errors.append(rule.message or f"Field '{rule.field_name}' length must be between {min_len or 0} and {max_len or 'unlimited'}")
-                    is_valid = False
-                    
-            # Custom validation (delegated to a registered validator)
-            elif rule_type == "custom":
-                validator_name = rule.parameters.get("validator")
-                if validator_name and validator_name in self._validators:
-                    validator = self._validators[validator_name]
-                    if not validator.validate(rule.field_name, {"value": value}, context=validation_context):
-                        if hasattr(validator, 'get_errors'):
-                            self._errors.extend(validator.get_errors())
-                        is_valid = False
-                        
+            # Custom validators report their own errors
+            validator = self._validators.get(str(compiled.rule.parameters.get("validator")))
+            if validator is not None and hasattr(validator, 'get_errors'):
+                self._errors.extend(validator.get_errors())
         return is_valid
         
+    def _add_error(self, rule: ValidationRule, default_message: str, value: Any) -> None:
+        """Record a rule failure; the message is formatted when errors are read."""
+        self._errors.add(rule.id, rule.message or default_message, field=rule.field_name, value=value)
+
     def _check_type(self, value: Any, expected_type: str) -> bool:
         """Check if value matches the expected type."""
         if expected_type == "string":
@@ -160,24 +266,17 @@ class ValidationMediator(IValidationMediator):
             # Basic check for ISO date format
             if not isinstance(value, str):
                 return False
-            try:
-                import re
-                return bool(re.match(r'^\d{4}-\d{2}-\d{2}$', value))
-            except:
-                return False
+            return bool(_ISO_DATE.match(value))
         elif expected_type == "array" or expected_type == "list":
             return isinstance(value, (list, tuple))
         elif expected_type == "object" or expected_type == "dict":
             return isinstance(value, dict)
         return True  # Unknown types considered valid
         
-    def _check_pattern(self, value: Any, pattern: str) -> bool:
+    def _check_pattern(self, value: Any, pattern: Union[str, Pattern[str]]) -> bool:
         """Check if value matches the pattern."""
-        try:
-            import re
-            return bool(re.search(pattern, str(value)))
-        except Exception:
-            return False
+        compiled = pattern_registry.get(pattern) if isinstance(pattern, str) else pattern
+        return compiled is not None and compiled.search(str(value)) is not None
             
     def _check_range(self, value: Any, min_val: Optional[float], max_val: Optional[float]) -> bool:
         """Check if numeric value is within range."""
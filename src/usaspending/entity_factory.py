@@ -13,6 +13,7 @@ from .core.types import (
 )
 from .core.exceptions import EntityError
 from .core.utils import safe_operation
+from .core.csv_reader import get_role_field_mappings
 
 logger = logging.getLogger(__name__)
 
@@ -57,20 +58,40 @@ class EntityFactory(BaseEntityFactory, IConfigurable):
             raise EntityError("Entity configuration must be a dictionary")
             
         entity_config: EntityConfigDict = {
-            'fields': config.get('fields', {}),
+            'fields': config.get('fields') or self._mapped_fields(config),
             'validations': config.get('validations', {}),
             'transformations': config.get('transformations', {}),
             'metadata': config.get('metadata', {})
         }
         
-        self._entities[str(entity_type)] = entity_config
+        self._entities[self._type_key(entity_type)] = entity_config
+
+    @staticmethod
+    def _mapped_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the fields of an entity without a ``fields`` section.
+
+        These are its key fields and every target of its ``field_mappings``
+        and those of its roles, so extracted entities keep the fields they
+        were mapped to.
+        """
+        fields: Dict[str, Any] = {name: {} for name in config.get('key_fields', [])}
+        for field_mappings in get_role_field_mappings(config):
+            for mappings in field_mappings.values():
+                if isinstance(mappings, dict):
+                    fields.update((name, {}) for name in mappings)
+        return fields
+
+    @staticmethod
+    def _type_key(entity_type: Any) -> str:
+        """Get the configuration key of an entity type, e.g. ``contract``."""
+        return entity_type.value if isinstance(entity_type, EntityType) else str(entity_type)
 
     def create_entity(self, entity_type: EntityType, data: Dict[str, Any]) -> Optional[EntityData]:
         """Create an entity instance."""
         if not self._initialized:
             raise EntityError("Factory not initialized")
             
-        config = self._entities.get(str(entity_type))
+        config = self._entities.get(self._type_key(entity_type))
         if not config:
             if self._strict_mode:
                 raise EntityError(f"No configuration for entity type: {entity_type}")
@@ -79,7 +100,7 @@ class EntityFactory(BaseEntityFactory, IConfigurable):
         try:
             # Create base entity with validated/transformed data
             result: EntityData = {
-                'type': str(entity_type),
+                'type': self._type_key(entity_type),
                 'data': self._process_entity_data(data, config),
                 'metadata': {
                     'created': datetime.utcnow().isoformat(),
@@ -100,12 +121,12 @@ class EntityFactory(BaseEntityFactory, IConfigurable):
 
     def get_entity_config(self, entity_type: EntityType) -> Optional[EntityConfig]:
         """Get entity configuration."""
-        config_dict = self._entities.get(str(entity_type))
+        config_dict = self._entities.get(self._type_key(entity_type))
         if config_dict is None:
             return None
         # Convert EntityConfigDict to EntityConfig with correct types
         return EntityConfig(
-            name=str(entity_type),
+            name=self._type_key(entity_type),
             fields=config_dict['fields'],
             validations=[v for v in config_dict['validations'].values()],  # Convert dict to list
             key_fields=config_dict.get('metadata', {}).get('key_fields', [])  # Get key fields from metadata
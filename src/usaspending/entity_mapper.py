@@ -1,18 +1,72 @@
 """Entity mapping implementation."""
-from typing import Dict, Any, Optional, List, Callable, cast, TypeVar, Union, Generic, overload, Sequence
+from typing import Dict, Any, Optional, List, Callable, NamedTuple, Tuple, cast, TypeVar, Union, Generic, overload, Sequence
 import logging
+from functools import partial
 from decimal import Decimal
 from datetime import datetime
 from .core.interfaces import IEntityMapper
 from .core.types import MappingResult, EntityType, ComponentConfig, FieldType, ValidationRule, EntityData
 from .core.validation import BaseValidator
 from .core.exceptions import MappingError
+from .core.formula import compile_formula
+from .core.error_sink import ErrorSink
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=EntityData)
 CalcFunc = Callable[[Sequence[Any]], Any]
 
+class DerivedFieldOp(NamedTuple):
+    """Compiled derived field calculation."""
+    target_field: str
+    source_fields: Tuple[str, ...]
+    compute: CalcFunc
+    default: Any
+    required: bool
+
+class MappingPlan(NamedTuple):
+    """Compiled mapping configuration for one entity type."""
+    required_fields: Tuple[str, ...]
+    direct: Tuple[Tuple[str, Any], ...]
+    derived: Tuple[DerivedFieldOp, ...]
+
+def _decimals(values: Sequence[Any]) -> List[Decimal]:
+    return [Decimal(str(v)) for v in values if v is not None]
+
+def _calc_sum(values: Sequence[Any], **_: Any) -> Any:
+    return sum(_decimals(values))
+
+def _calc_avg(values: Sequence[Any], **_: Any) -> Any:
+    decimals = _decimals(values)
+    return sum(decimals) / len(decimals) if decimals else None
+
+def _calc_concat(values: Sequence[Any], **kwargs: Any) -> Any:
+    return kwargs.get('separator', '').join(str(v) for v in values if v is not None)
+
+def _calc_first_non_null(values: Sequence[Any], **_: Any) -> Any:
+    return next((v for v in values if v is not None), None)
+
+def _calc_count(values: Sequence[Any], **_: Any) -> Any:
+    return len([v for v in values if v is not None])
+
+def _calc_min(values: Sequence[Any], **_: Any) -> Any:
+    return min(_decimals(values), default=None)
+
+def _calc_max(values: Sequence[Any], **_: Any) -> Any:
+    return max(_decimals(values), default=None)
+
+# Built-in calculation functions; module-level so mappers pickle into worker processes
+CALCULATION_FUNCTIONS: Dict[str, CalcFunc] = {
+    'sum': _calc_sum,
+    'avg': _calc_avg,
+    'concat': _calc_concat,
+    'first_non_null': _calc_first_non_null,
+    'coalesce': _calc_first_non_null,
+    'count': _calc_count,
+    'min': _calc_min,
+    'max': _calc_max
+}
+
 class EntityMapper(BaseValidator, IEntityMapper, Generic[T]):
     """Implements entity mapping functionality."""
 
@@ -20,19 +74,21 @@ class EntityMapper(BaseValidator, IEntityMapper, Generic[T]):
         """Initialize entity mapper."""
         super().__init__()
         self._mappings: Dict[str, Dict[str, Any]] = {}
+        self._plans: Dict[str, MappingPlan] = {}
         self._initialized: bool = False
-        self._errors: List[str] = []
-        self._calculation_functions: Dict[str, CalcFunc] = {
-            'sum': lambda values, **_: sum(Decimal(str(v)) for v in values if v is not None),
-            'avg': lambda values, **_: (sum(Decimal(str(v)) for v in values if v is not None) / 
-                                   len([v for v in values if v is not None])) if any(v is not None for v in values) else None,
-            'concat': lambda values, **kwargs: kwargs.get('separator', '').join(str(v) for v in values if v is not None),
-            'first_non_null': lambda values, **_: next((v for v in values if v is not None), None),
-            'coalesce': lambda values, **_: next((v for v in values if v is not None), None),
-            'count': lambda values, **_: len([v for v in values if v is not None]),
-            'min': lambda values, **_: min((Decimal(str(v)) for v in values if v is not None), default=None),
-            'max': lambda values, **_: max((Decimal(str(v)) for v in values if v is not None), default=None)
-        }
+        self._errors = ErrorSink()
+        self._calculation_functions: Dict[str, CalcFunc] = dict(CALCULATION_FUNCTIONS)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Plans hold closures; worker processes recompile them
+        state = self.__dict__.copy()
+        state['_plans'] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._initialized:
+            self._compile_plans()
 
     def configure(self, config: ComponentConfig) -> None:
         """Configure mapper with settings."""
@@ -40,8 +96,38 @@ class EntityMapper(BaseValidator, IEntityMapper, Generic[T]):
             raise ValueError("Invalid mapper configuration")
         
         self._mappings = config.settings.get('mappings', {})
+        self._compile_plans()
         self._initialized = True
 
+    def _compile_plans(self) -> None:
+        """Compile every entity's mapping configuration into a mapping plan."""
+        self._plans = {
+            entity_type: self._compile_plan(mapping_config)
+            for entity_type, mapping_config in self._mappings.items()
+        }
+
+    def _compile_plan(self, mapping_config: Dict[str, Any]) -> MappingPlan:
+        """Compile one entity's mapping configuration."""
+        direct = tuple(
+            (target_field, source_info.get('field'))
+            for target_field, source_info in mapping_config.get('field_mappings', {}).items()
+        )
+        derived = tuple(
+            DerivedFieldOp(
+                target_field=target_field,
+                source_fields=tuple(calculation.get('source_fields', [])),
+                compute=self._compile_calculation(calculation),
+                default=calculation.get('default'),
+                required=calculation.get('required', False)
+            )
+            for target_field, calculation in mapping_config.get('derived_mappings', {}).items()
+        )
+        return MappingPlan(
+            required_fields=tuple(mapping_config.get('required_fields', [])),
+            direct=direct,
+            derived=derived
+        )
+
     def add_validation_rule(self, rule: ValidationRule) -> None:
         """Add a validation rule."""
         if rule not in self._rules:
@@ -61,94 +147,112 @@ class EntityMapper(BaseValidator, IEntityMapper, Generic[T]):
             self._errors.append("Mapper not initialized")
             return False
             
-        if entity_id not in self._mappings:
+        plan = self._plans.get(entity_id)
+        if plan is None:
             self._errors.append(f"No mapping configuration for entity type: {entity_id}")
             return False
-            
-        mapping_config = self._mappings[entity_id]
-        required_fields = mapping_config.get('required_fields', [])
-        
-        for field in required_fields:
+        return self._check_required(plan, data)
+
+    def _check_required(self, plan: MappingPlan, data: Dict[str, Any]) -> bool:
+        """Check a plan's required fields are present."""
+        for field in plan.required_fields:
             if field not in data:
                 self._errors.append(f"Required field missing: {field}")
                 return False
-                
         return True
 
     def map_entity(self, entity_type: EntityType, data: Dict[str, Any]) -> Dict[str, Any]:
         """Map source data to target entity format."""
-        if not self.validate(str(entity_type), data, {}):
+        if not self._initialized:
+            self._errors.append("Mapper not initialized")
+            return {}
+
+        plan = self._plans.get(str(entity_type))
+        if plan is None:
+            self._errors.append(f"No mapping configuration for entity type: {entity_type}")
+            return {}
+        if not self._check_required(plan, data):
             return {}
             
         result: Dict[str, Any] = {}
-        mapping_config = self._mappings[str(entity_type)]
         
         # Direct field mappings
-        field_mappings = mapping_config.get('field_mappings', {})
-        for target_field, source_info in field_mappings.items():
-            source_field = source_info.get('field')
+        for target_field, source_field in plan.direct:
             if source_field in data:
                 result[target_field] = data[source_field]
                 
         # Derived fields
-        derived_mappings = mapping_config.get('derived_mappings', {})
-        for target_field, calculation in derived_mappings.items():
+        for op in plan.derived:
+            field_values = [data.get(field) for field in op.source_fields]
             try:
-                result[target_field] = self._calculate_derived_field(
-                    calculation, data
-                )
+                if any(v is not None for v in field_values):
+                    result[op.target_field] = op.compute(field_values)
+                elif op.default is not None:
+                    result[op.target_field] = op.default
+                elif op.required:
+                    raise MappingError("Required derived field has no source values")
+                else:
+                    result[op.target_field] = None
             except Exception as e:
-                self._errors.append(f"Error calculating derived field {target_field}: {str(e)}")
+                self._errors.append(f"Error calculating derived field {op.target_field}: {str(e)}")
                 
         return result
 
-    def _calculate_derived_field(self, calculation: Dict[str, Any], data: Dict[str, Any]) -> Any:
-        """Calculate derived field value based on calculation rules."""
+    def _compile_calculation(self, calculation: Dict[str, Any]) -> CalcFunc:
+        """Compile a derived field calculation into a function of its source values.
+
+        Configuration errors are deferred to a function that raises, so they
+        are reported per record like calculation failures.
+        """
+        def fail(message: str) -> CalcFunc:
+            def raise_error(values: Sequence[Any]) -> Any:
+                raise MappingError(message)
+            return raise_error
+
         calc_type = calculation.get('type')
         if not calc_type:
-            raise MappingError("Calculation type is required")
-
-        source_fields = calculation.get('source_fields', [])
-        field_values = [data.get(field) for field in source_fields]
-
-        # Handle empty source fields based on configuration
-        if not any(v is not None for v in field_values):
-            default_value = calculation.get('default')
-            if default_value is not None:
-                return default_value
-            if calculation.get('required', False):
-                raise MappingError("Required derived field has no source values")
-            return None
-
-        try:
-            if calc_type == 'custom':
-                func_name = calculation.get('function')
-                if not func_name or func_name not in self._calculation_functions:
-                    raise MappingError(f"Unknown calculation function: {func_name}")
-                params = calculation.get('parameters', {})
-                return self._calculation_functions[func_name](field_values, **params)
-
-            if calc_type == 'formula':
-                formula = calculation.get('formula')
-                if not formula:
-                    raise MappingError("Formula is required for formula calculation type")
-                # Basic formula evaluation - extend this based on requirements
-                return eval(formula, {"__builtins__": {}}, {
-                    f"val{i}": v for i, v in enumerate(field_values)
-                })
-
-            if calc_type in self._calculation_functions:
-                params = calculation.get('parameters', {})
-                return self._calculation_functions[calc_type](field_values, **params)
-
-            raise MappingError(f"Unsupported calculation type: {calc_type}")
-
-        except Exception as e:
-            raise MappingError(f"Calculation failed: {str(e)}")
+            return fail("Calculation type is required")
+
+        func: Optional[Callable[..., Any]] = None
+        params = calculation.get('parameters', {})
+
+        if calc_type == 'custom':
+            func_name = calculation.get('function')
+            if not func_name or func_name not in self._calculation_functions:
+                return fail(f"Calculation failed: Unknown calculation function: {func_name}")
+            func = self._calculation_functions[func_name]
+
+        elif calc_type == 'formula':
+            formula = calculation.get('formula')
+            if not formula:
+                return fail("Calculation failed: Formula is required for formula calculation type")
+            try:
+                func = compile_formula(formula)
+            except MappingError as e:
+                return fail(f"Calculation failed: {str(e)}")
+            params = {}
+
+        elif calc_type in self._calculation_functions:
+            func = self._calculation_functions[calc_type]
+
+        else:
+            return fail(f"Calculation failed: Unsupported calculation type: {calc_type}")
+
+        bound = partial(func, **params) if params else func
+
+        def compute(values: Sequence[Any]) -> Any:
+            try:
+                return bound(values)
+            except Exception as e:
+                raise MappingError(f"Calculation failed: {str(e)}")
+        return compute
 
     def register_calculation_function(self, name: str, func: CalcFunc) -> None:
         """Register a custom calculation function."""
         self._calculation_functions[name] = func
+        # Plans bind functions at compile time
+        if self._initialized:
+            self._compile_plans()
 
     def clear_errors(self) -> None:
         """Clear error messages."""
@@ -1,12 +1,15 @@
 """USASpending entity mediation system."""
-from typing import Dict, Any, Optional, List, cast
+from typing import Dict, Any, Optional, List, Callable, Tuple, cast
 import logging
 from .core.interfaces import IConfigurable
 from .core.entity_base import BaseEntityMediator
 from .core.config import ComponentConfig
 from .core.types import EntityData, EntityType, ValidationRule
-from .core.exceptions import EntityError
+from .core.exceptions import EntityError, StorageError
 from .core.utils import safe_operation
+from .core.patterns import pattern_registry
+from .core.error_sink import ErrorSink
+from .core.profiling import Profiler
 from .core.entity_base import IEntityFactory, IEntityStore, IEntityMapper
 
 logger = logging.getLogger(__name__)
@@ -25,17 +28,11 @@ class USASpendingEntityMediator(BaseEntityMediator, IConfigurable):
         self._mapper = mapper
         self._entity_configs: Dict[str, Dict[str, Any]] = {}
         self._validation_rules: Dict[str, Dict[str, Any]] = {}
+        self._rule_index: Dict[Tuple[Optional[str], str], List[Dict[str, Any]]] = {}
         self._initialized = False
         self._strict_mode = False
         self._batch_size = 1000
-        self._errors: List[str] = []
-        self._stats: Dict[str, int] = {
-            "created": 0,
-            "stored": 0,
-            "retrieved": 0,
-            "validated": 0,
-            "errors": 0
-        }
+        self._errors = ErrorSink()
         
     def configure(self, config: ComponentConfig) -> None:
         """Configure with settings."""
@@ -48,47 +45,152 @@ class USASpendingEntityMediator(BaseEntityMediator, IConfigurable):
         self._entity_configs = settings.get('entities', {})
         self._initialized = True
 
-    def add_validation_rule(self, rule: ValidationRule) -> None:
-        """Add a validation rule."""
+    def add_validation_rule(self, rule: ValidationRule, entity_type: Optional[str] = None) -> None:
+        """Add a validation rule.
+
+        Args:
+            rule: Rule to add
+            entity_type: Entity type the rule applies to; defaults to
+                ``rule.validation_context['entity_type']``, or all types
+        """
         if not rule:
             raise EntityError("Validation rule is required")
         rule_id = getattr(rule, 'id', None) or str(len(self._validation_rules))
+        if entity_type is None and rule.validation_context:
+            entity_type = rule.validation_context.get('entity_type')
         self._validation_rules[rule_id] = {
+            **(rule.parameters or {}),
+            'id': rule_id,
             'type': rule.rule_type.value.lower(),
             'field_name': rule.field_name,
+            'entity_type': self._type_key(entity_type) if entity_type else None,
             'parameters': rule.parameters,
+            'pattern': pattern_registry.compile_rule(rule),
             'message': rule.message,
             'enabled': rule.enabled
         }
+        self._index_rules()
 
     def remove_validation_rule(self, rule_id: str) -> None:
         """Remove a validation rule."""
         if rule_id in self._validation_rules:
             del self._validation_rules[rule_id]
+            self._index_rules()
+
+    @staticmethod
+    def _type_key(entity_type: Any) -> str:
+        """Get the rule index key of an entity type, e.g. ``contract``."""
+        return entity_type.value if isinstance(entity_type, EntityType) else str(entity_type)
+
+    def _index_rules(self) -> None:
+        """Index enabled rules by (entity_type, field_name); None entity type applies to all."""
+        index: Dict[Tuple[Optional[str], str], List[Dict[str, Any]]] = {}
+        for rule in self._validation_rules.values():
+            if rule.get('enabled', True) and rule.get('field_name'):
+                index.setdefault((rule['entity_type'], rule['field_name']), []).append(rule)
+        self._rule_index = index
+
+    def _get_field_rules(self, entity_type: Optional[str], field_name: str) -> List[Dict[str, Any]]:
+        """Get rules for a field of an entity type, including rules for all types."""
+        rules = self._rule_index.get((None, field_name), [])
+        if entity_type is not None:
+            typed = self._rule_index.get((entity_type, field_name))
+            if typed:
+                rules = rules + typed if rules else typed
+        return rules
 
     def _validate_entity_data(self, entity_type: str, data: Dict[str, Any]) -> bool:
         """Implementation of entity validation."""
+        if not self._rule_index:
+            return True
+        type_key = self._type_key(entity_type)
         validation_context = {
-            'entity_type': entity_type,
-            'config': self._entity_configs.get(entity_type, {})
+            'entity_type': type_key,
+            'config': self._entity_configs.get(type_key, {})
         }
 
-        for rule_id, rule in self._validation_rules.items():
-            if not self._validate_rule(data, rule, validation_context):
-                return False
+        for field_name, value in data.items():
+            for rule in self._get_field_rules(type_key, field_name):
+                if not self._validate_rule(data, rule, validation_context):
+                    return False
         return True
 
     def _validate_field_value(self, field_name: str, value: Any, entity_type: Optional[str] = None) -> bool:
         """Implementation of field validation."""
-        validation_context = {'entity_type': entity_type} if entity_type else {}
-        applicable_rules = [rule for rule in self._validation_rules.values() 
-                          if rule.get('field_name') == field_name]
-        
-        for rule in applicable_rules:
+        type_key = self._type_key(entity_type) if entity_type else None
+        validation_context = {'entity_type': type_key} if type_key else {}
+
+        for rule in self._get_field_rules(type_key, field_name):
             if not self._validate_rule({field_name: value}, rule, validation_context):
                 return False
         return True
 
+    def _add_error(self, rule: Dict[str, Any], default_message: str, value: Any) -> None:
+        """Record a rule failure; the message is formatted when errors are read."""
+        self._errors.add(rule.get('id'), rule.get('message') or default_message,
+                         field=rule['field_name'], value=value)
+
+    def _check_required(self, value: Any, rule: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        """Check a required field has a non-blank value."""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            self._add_error(rule, "Field {field} is required", value)
+            return False
+        return True
+
+    def _check_pattern(self, value: Any, rule: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        """Check a value matches the rule's pattern.
+
+        A rule whose pattern is missing or failed to compile rejects every
+        value rather than letting it through unchecked.
+        """
+        pattern = rule.get('pattern')
+        if isinstance(pattern, str):
+            pattern = pattern_registry.get(pattern)
+        if pattern is None:
+            # Braces in the pattern are escaped; messages are format templates
+            pattern_text = repr((rule.get('parameters') or {}).get('pattern')).replace('{', '{{').replace('}', '}}')
+            self._errors.add(rule.get('id'), f"Invalid pattern {pattern_text} for field {{field}}",
+                             field=rule['field_name'], value=value)
+            return False
+        if not pattern.match(str(value)):
+            self._add_error(rule, "Field {field} does not match pattern", value)
+            return False
+        return True
+
+    def _check_range(self, value: Any, rule: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        """Check a numeric value is within the rule's bounds."""
+        try:
+            num_value = float(value)
+        except (ValueError, TypeError):
+            self._add_error(rule, "Invalid numeric value for {field}", value)
+            return False
+
+        min_val = rule.get('min')
+        max_val = rule.get('max')
+        if min_val is not None and num_value < min_val:
+            self._add_error(rule, f"Value below minimum {min_val}", value)
+            return False
+        if max_val is not None and num_value > max_val:
+            self._add_error(rule, f"Value above maximum {max_val}", value)
+            return False
+        return True
+
+    def _check_custom(self, value: Any, rule: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        """Check a value with the rule's custom validate function."""
+        validate_func = rule.get('validate')
+        if validate_func and not validate_func(value, context):
+            self._add_error(rule, "Custom validation failed for {field}", value)
+            return False
+        return True
+
+    # Rule type -> check method
+    _RULE_CHECKS: Dict[str, Callable[['USASpendingEntityMediator', Any, Dict[str, Any], Dict[str, Any]], bool]] = {
+        'required': _check_required,
+        'pattern': _check_pattern,
+        'range': _check_range,
+        'custom': _check_custom,
+    }
+
     def _validate_rule(self, data: Dict[str, Any], rule: Dict[str, Any], context: Dict[str, Any]) -> bool:
         """Validate data against a rule configuration."""
         try:
@@ -101,43 +203,10 @@ class USASpendingEntityMediator(BaseEntityMediator, IConfigurable):
             if not field_name or field_name not in data:
                 return True
 
-            value = data[field_name]
-            
-            if rule_type == 'required' and (value is None or (isinstance(value, str) and not value.strip())):
-                self._errors.append(rule.get('message', f"Field {field_name} is required"))
-                return False
-                
-            elif rule_type == 'pattern':
-                import re
-                pattern = rule.get('pattern')
-                if pattern and not re.match(pattern, str(value)):
-                    self._errors.append(rule.get('message', f"Field {field_name} does not match pattern"))
-                    return False
-                    
-            elif rule_type == 'range':
-                try:
-                    num_value = float(value)
-                    min_val = rule.get('min')
-                    max_val = rule.get('max')
-                    
-                    if min_val is not None and num_value < min_val:
-                        self._errors.append(rule.get('message', f"Value below minimum {min_val}"))
-                        return False
-                        
-                    if max_val is not None and num_value > max_val:
-                        self._errors.append(rule.get('message', f"Value above maximum {max_val}"))
-                        return False
-                except (ValueError, TypeError):
-                    self._errors.append(rule.get('message', f"Invalid numeric value for {field_name}"))
-                    return False
-                    
-            elif rule_type == 'custom' and 'validate' in rule:
-                validate_func = rule['validate']
-                if not validate_func(value, context):
-                    self._errors.append(rule.get('message', f"Custom validation failed for {field_name}"))
-                    return False
-
-            return True
+            check = self._RULE_CHECKS.get(rule_type)
+            if check is None:
+                return True
+            return check(self, data[field_name], rule, context)
 
         except Exception as e:
             logger.error(f"Rule validation error: {str(e)}")
@@ -151,53 +220,87 @@ class USASpendingEntityMediator(BaseEntityMediator, IConfigurable):
         """Process an entity."""
         try:
             # Map raw data using configuration-driven mapping
-            mapped_data = self._mapper.map_entity(entity_type, data)
+            with self._metrics.time("map"):
+                mapped_data = self._mapper.map_entity(entity_type, data)
             if not mapped_data:
                 self._errors.extend(self._mapper.get_errors())
-                self._stats["errors"] += 1
+                self._metrics.increment("errors")
                 return None
 
-            # Validate mapped data
-            self._stats["validated"] += 1
-            if not self.validate_entity(str(entity_type), mapped_data):
-                self._stats["errors"] += 1
-                return None
+            return self._save_mapped_entity(entity_type, mapped_data)
 
-            # Create and store entity
-            entity = self._factory.create_entity(entity_type, mapped_data)
-            if not entity:
-                self._stats["errors"] += 1
-                return None
+        except Exception as e:
+            return self._processing_failed(e)
 
-            self._stats["created"] += 1
-            entity_id = self._store.save_entity(entity_type, cast(EntityData, entity))
-            if entity_id:
-                self._stats["stored"] += 1
-                return entity_id
+    @safe_operation
+    def process_mapped_entity(self, entity_type: EntityType, data: Dict[str, Any]) -> Optional[str]:
+        """Process entity data that is already mapped, e.g. by ``EntityExtractor``."""
+        try:
+            return self._save_mapped_entity(entity_type, data)
+        except Exception as e:
+            return self._processing_failed(e)
+
+    @safe_operation
+    def update_entity(self, entity_type: EntityType, entity_id: str, updates: Dict[str, Any]) -> bool:
+        """Merge fields, e.g. relationship aggregates, into a stored entity."""
+        update = getattr(self._store, 'update_entity', None)
+        if update is None:
+            raise StorageError(f"{type(self._store).__name__} does not support entity updates")
+        return bool(update(entity_type, entity_id, updates))
+
+    def instrument(self, profiler: Profiler) -> None:
+        """Attach profiler stage timers to the validate, create and save hot paths.
 
-            self._errors.append(f"Failed to store {entity_type}")
-            self._stats["errors"] += 1
+        Records are mapped by ``EntityExtractor``, whose ``instrument``
+        times the map stage.
+        """
+        profiler.instrument(self, 'validate_entity', 'validate')
+        profiler.instrument(self._factory, 'create_entity', 'create')
+        profiler.instrument(self._store, 'save_entity', 'save')
+
+    def _save_mapped_entity(self, entity_type: EntityType, mapped_data: Dict[str, Any]) -> Optional[str]:
+        """Validate, create and store mapped entity data."""
+        # Validate mapped data
+        self._metrics.increment("validated")
+        with self._metrics.time("validate"):
+            valid = self.validate_entity(self._type_key(entity_type), mapped_data)
+        if not valid:
+            self._metrics.increment("errors")
             return None
 
-        except Exception as e:
-            logger.error(f"Entity processing failed: {str(e)}")
-            self._errors.append(f"Processing failed: {str(e)}")
-            self._stats["errors"] += 1
-            if self._strict_mode:
-                raise
+        # Create and store entity
+        with self._metrics.time("create"):
+            entity = self._factory.create_entity(entity_type, mapped_data)
+        if not entity:
+            self._metrics.increment("errors")
             return None
 
+        self._metrics.increment("created")
+        with self._metrics.time("store"):
+            entity_id = self._store.save_entity(entity_type, cast(EntityData, entity))
+        if entity_id:
+            self._metrics.increment("stored")
+            return entity_id
+
+        self._errors.append(f"Failed to store {entity_type}")
+        self._metrics.increment("errors")
+        return None
+
+    def _processing_failed(self, error: Exception) -> Optional[str]:
+        """Record an entity processing failure, re-raising in strict mode."""
+        logger.error(f"Entity processing failed: {str(error)}")
+        self._errors.append(f"Processing failed: {str(error)}")
+        self._metrics.increment("errors")
+        if self._strict_mode:
+            raise error
+        return None
+
     def cleanup(self) -> None:
         """Clean up resources."""
         self._entity_configs.clear()
         self._validation_rules.clear()
-        self._stats = {
-            "created": 0,
-            "stored": 0, 
-            "retrieved": 0,
-            "validated": 0,
-            "errors": 0
-        }
+        self._rule_index.clear()
+        self._metrics.reset()
         self._errors.clear()
         self._initialized = False
 
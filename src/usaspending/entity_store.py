@@ -1,11 +1,14 @@
 """Entity storage system."""
-from typing import Dict, Any, Optional, List, Generator, cast, TypeVar, Generic
+from typing import Dict, Any, Optional, List, Generator, Iterable, Union, cast, TypeVar, Generic
 import logging
+import threading
 from .core.entity_base import IEntityStore, EntityData
 from .core.interfaces import IConfigurable
 from .core.config import ComponentConfig
 from .core.types import EntityType
-from .core.storage import IStorageStrategy, SQLiteStorage, FileSystemStorage
+from .core.storage import IStorageStrategy, SQLiteStorage, FileSystemStorage, SegmentedFileStorage
+from .core.entity_ids import EntityIdGenerator
+from .core.entity_registry import SeenKeyRegistry
 from .core.exceptions import StorageError
 from .core.utils import safe_operation
 
@@ -13,6 +16,26 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=EntityData)
 
+def _merge_fields(target: Dict[str, Any], updates: Dict[str, Any]) -> None:
+    """Merge fields into a dict, merging objects into existing objects."""
+    for name, value in updates.items():
+        current = target.get(name)
+        if isinstance(value, dict) and isinstance(current, dict):
+            _merge_fields(current, value)
+        else:
+            target[name] = value
+
+def _update_stored_entity(store: IEntityStore, entity_type: EntityType, entity_id: str,
+                          updates: Dict[str, Any]) -> bool:
+    """Merge fields into a stored entity and write it back under the same ID."""
+    entity = store.get_entity(entity_type, entity_id)
+    if entity is None:
+        return False
+    target = entity['data'] if isinstance(entity.get('data'), dict) else entity
+    _merge_fields(target, updates)
+    store.save_entity(entity_type, entity)
+    return True
+
 class EntityStore(IEntityStore, IConfigurable):
     """Entity storage manager using strategy pattern."""
     
@@ -29,19 +52,36 @@ class EntityStore(IEntityStore, IConfigurable):
             
         settings = config.settings
         self._strict_mode = settings.get('strict_mode', False)
+
+        # Stable IDs from entities.*.key_fields
+        id_generator = EntityIdGenerator.from_config(settings.get('entities', {}))
         
         # Initialize storage strategy
         storage_type = settings.get('storage_type', 'filesystem')
         if storage_type == "sqlite":
             self._storage = SQLiteStorage(
                 settings.get('path', 'entities.db'),
-                max_connections=settings.get('max_connections', 5)
+                max_connections=settings.get('max_connections', 5),
+                batch_size=settings.get('batch_size', 1000),
+                journal_mode=settings.get('journal_mode', 'WAL'),
+                synchronous=settings.get('synchronous', 'NORMAL'),
+                cache_size=settings.get('cache_size', -64000),
+                id_generator=id_generator
+            )
+        elif storage_type == "segmented":
+            self._storage = SegmentedFileStorage(
+                settings.get('path', 'entities'),
+                max_segment_size=settings.get('max_segment_size', 64 * 1024 * 1024),
+                compression=settings.get('compression', True),
+                id_generator=id_generator,
+                compact_ratio=settings.get('compact_ratio', 0.5)
             )
         else:
             self._storage = FileSystemStorage(
                 settings.get('path', 'entities'),
                 max_files_per_dir=settings.get('max_files_per_dir', 1000),
-                compression=settings.get('compression', True)
+                compression=settings.get('compression', True),
+                id_generator=id_generator
             )
             
         self._initialized = True
@@ -50,45 +90,200 @@ class EntityStore(IEntityStore, IConfigurable):
         """Check if store is initialized."""
         if not self._initialized or not self._storage:
             raise StorageError("Entity store is not initialized")
+
+    @staticmethod
+    def _type_name(entity_type: Union[EntityType, str]) -> str:
+        """Get the storage name of an entity type, e.g. ``agency``."""
+        return entity_type.value if isinstance(entity_type, EntityType) else str(entity_type)
         
     @safe_operation
     def save_entity(self, entity_type: EntityType, entity: Dict[str, Any]) -> str:
         """Save an entity and return its ID."""
         self._check_initialized()
         assert self._storage is not None  # For mypy
-        return self._storage.save_entity(str(entity_type), entity)
+        return self._storage.save_entity(self._type_name(entity_type), entity)
+
+    @safe_operation
+    def save_entities(self, entity_type: EntityType, entities: Iterable[Dict[str, Any]]) -> List[str]:
+        """Save entities in bulk and return their IDs."""
+        self._check_initialized()
+        assert self._storage is not None  # For mypy
+        return self._storage.save_entities(self._type_name(entity_type), entities)
         
     @safe_operation
     def get_entity(self, entity_type: EntityType, entity_id: str) -> Optional[Dict[str, Any]]:
         """Get an entity by ID."""
         self._check_initialized()
         assert self._storage is not None  # For mypy
-        return self._storage.get_entity(str(entity_type), entity_id)
+        return self._storage.get_entity(self._type_name(entity_type), entity_id)
         
     @safe_operation
     def delete_entity(self, entity_type: EntityType, entity_id: str) -> bool:
         """Delete an entity."""
         self._check_initialized()
         assert self._storage is not None  # For mypy
-        return self._storage.delete_entity(str(entity_type), entity_id)
+        return self._storage.delete_entity(self._type_name(entity_type), entity_id)
         
     @safe_operation
     def list_entities(self, entity_type: EntityType) -> Generator[Dict[str, Any], None, None]:
         """Stream entities of a type."""
         self._check_initialized()
         assert self._storage is not None  # For mypy
-        yield from self._storage.list_entities(str(entity_type))
+        yield from self._storage.list_entities(self._type_name(entity_type))
         
     @safe_operation
     def count_entities(self, entity_type: EntityType) -> int:
         """Count entities of a type."""
         self._check_initialized()
         assert self._storage is not None  # For mypy
-        return self._storage.count_entities(str(entity_type))
+        return self._storage.count_entities(self._type_name(entity_type))
+
+    @safe_operation
+    def update_entity(self, entity_type: EntityType, entity_id: str, updates: Dict[str, Any]) -> bool:
+        """Merge fields into a stored entity.
+
+        Factory-created entities keep their fields under ``data``, so updates
+        go there when present. Objects are merged into stored objects, so
+        ``{'location_ref': {'entity_id': ...}}`` keeps the reference key.
+        Returns False if the entity is not stored.
+        """
+        return _update_stored_entity(self, entity_type, entity_id, updates)
         
     def cleanup(self) -> None:
         """Clean up resources."""
         if self._storage:
             self._storage.cleanup()
 
-__all__ = ['EntityStore']
\ No newline at end of file
+class DeduplicatingEntityStore(IEntityStore, IConfigurable):
+    """Entity store wrapper that writes each reference entity once per run.
+
+    Reference entities such as agencies, recipients and locations repeat on
+    every transaction row. Their stable key-field IDs are tracked in a
+    ``SeenKeyRegistry`` and repeats are answered with the known ID instead
+    of being written again. A key is registered once its entity is written,
+    so an entity whose write fails is written again when it repeats. Other
+    entity types pass straight through.
+    """
+
+    DEFAULT_ENTITY_TYPES = ('agency', 'recipient', 'location')
+
+    def __init__(self, store: IEntityStore) -> None:
+        """Initialize with the store to write through to."""
+        self._store = store
+        self._id_generator = EntityIdGenerator()
+        self._registry: Optional[SeenKeyRegistry] = None
+        self._entity_types: set = set(self.DEFAULT_ENTITY_TYPES)
+        self._stats: Dict[str, int] = {'written': 0, 'duplicates': 0}
+        self._lock = threading.Lock()
+
+    def configure(self, config: ComponentConfig) -> None:
+        """Configure deduplication settings.
+
+        Reads ``entities`` for key fields and the ``deduplication`` section
+        for ``entity_types``, ``max_memory_keys`` and ``spill_path``.
+        """
+        if not config or not isinstance(config.settings, dict):
+            raise StorageError("Entity store configuration is required")
+
+        settings = config.settings
+        dedup_settings = settings.get('deduplication', {}) or {}
+        self._id_generator = EntityIdGenerator.from_config(settings.get('entities', {}))
+        self._entity_types = set(dedup_settings.get('entity_types', self.DEFAULT_ENTITY_TYPES))
+        if self._registry:
+            self._registry.close()
+        self._registry = SeenKeyRegistry(
+            max_memory_keys=dedup_settings.get('max_memory_keys', 1_000_000),
+            spill_path=dedup_settings.get('spill_path')
+        )
+
+    def _count(self, stat: str, count: int = 1) -> None:
+        """Add to a statistic; stores are shared by the scheduler's stage threads."""
+        with self._lock:
+            self._stats[stat] += count
+
+    def _register(self, entity_ids: Iterable[str]) -> None:
+        """Register the keys of written entities."""
+        assert self._registry is not None  # For mypy
+        written = 0
+        for entity_id in entity_ids:
+            self._registry.add(entity_id)
+            written += 1
+        self._count('written', written)
+
+    def save_entity(self, entity_type: EntityType, entity: Dict[str, Any]) -> str:
+        """Save an entity unless it was already written."""
+        type_name = EntityStore._type_name(entity_type)
+        if self._registry is None or type_name not in self._entity_types:
+            return self._store.save_entity(entity_type, entity)
+
+        entity_id = self._id_generator.generate(type_name, entity)
+        if entity_id in self._registry:
+            self._count('duplicates')
+            return entity_id
+        saved_id = self._store.save_entity(entity_type, entity)
+        # Failed writes return None and leave the key unregistered
+        if saved_id is not None:
+            self._register([entity_id])
+        return saved_id
+
+    def save_entities(self, entity_type: EntityType, entities: Iterable[Dict[str, Any]]) -> List[str]:
+        """Save entities in bulk, skipping ones already written.
+
+        Returns:
+            IDs of all entities, or None if writing the new ones failed
+        """
+        type_name = EntityStore._type_name(entity_type)
+        if self._registry is None or type_name not in self._entity_types:
+            return self._store.save_entities(entity_type, entities)
+
+        entity_ids: List[str] = []
+        new_ids: Dict[str, Dict[str, Any]] = {}
+        duplicates = 0
+        for entity in entities:
+            entity_id = self._id_generator.generate(type_name, entity)
+            entity_ids.append(entity_id)
+            if entity_id in new_ids or entity_id in self._registry:
+                duplicates += 1
+            else:
+                new_ids[entity_id] = entity
+        self._count('duplicates', duplicates)
+
+        if new_ids:
+            if self._store.save_entities(entity_type, list(new_ids.values())) is None:
+                return cast(List[str], None)
+            self._register(new_ids)
+        return entity_ids
+
+    def get_entity(self, entity_type: EntityType, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Get an entity by ID."""
+        return self._store.get_entity(entity_type, entity_id)
+
+    def delete_entity(self, entity_type: EntityType, entity_id: str) -> bool:
+        """Delete an entity."""
+        return self._store.delete_entity(entity_type, entity_id)
+
+    def list_entities(self, entity_type: EntityType) -> Generator[Dict[str, Any], None, None]:
+        """Stream entities of a type."""
+        yield from self._store.list_entities(entity_type) or ()
+
+    def count_entities(self, entity_type: EntityType) -> int:
+        """Count entities of a type."""
+        return self._store.count_entities(entity_type)
+
+    def update_entity(self, entity_type: EntityType, entity_id: str, updates: Dict[str, Any]) -> bool:
+        """Merge fields into a stored entity; updates are never deduplicated."""
+        return _update_stored_entity(self._store, entity_type, entity_id, updates)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get deduplication statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+        return {**stats, 'seen_keys': len(self._registry) if self._registry else 0}
+
+    def cleanup(self) -> None:
+        """Clean up resources."""
+        if self._registry:
+            self._registry.close()
+        self._store.cleanup()
+
+__all__ = ['EntityStore', 'DeduplicatingEntityStore']
\ No newline at end of file
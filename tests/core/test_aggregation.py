@@ -0,0 +1,78 @@
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.usaspending.core.aggregation import RelationshipAggregator
+from src.usaspending.core.exceptions import ConfigurationError
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "conversion_config.yaml"
+
+@pytest.fixture(scope="module")
+def config():
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+@pytest.fixture
+def aggregator(config):
+    aggregators = RelationshipAggregator.from_config(config)
+    assert [a.relationship_id for a in aggregators] == ['transaction_to_contract']
+    return aggregators[0]
+
+def transaction(contract_key, obligation, action_date):
+    return {
+        'contract_ref': {'entity': 'contract', 'key': {'contract_award_unique_key': contract_key}},
+        'data': {'federal_action_obligation': obligation, 'action_date': action_date}
+    }
+
+def test_running_totals_per_contract(aggregator):
+    assert aggregator.reference_field == 'contract_ref'
+    assert aggregator.add(transaction('C1', '100.50', '2024-02-01'))
+    assert aggregator.add(transaction('C1', '-20.25', '2024-01-15'))
+    assert aggregator.add(transaction('C2', '', '2024-03-01'))
+    assert not aggregator.add({'data': {'federal_action_obligation': '5'}})
+
+    assert len(aggregator) == 2
+    assert aggregator.get({'contract_award_unique_key': 'C1'}) == {
+        'total_obligation': Decimal('80.25'),
+        'transaction_count': 2,
+        'first_action_date': '2024-01-15',
+        'last_action_date': '2024-02-01',
+    }
+    assert aggregator.get({'contract_award_unique_key': 'C2'})['total_obligation'] is None
+
+def test_merge_and_file_round_trip(config, aggregator, tmp_path):
+    aggregator.add(transaction('C1', '10', '2024-01-01'))
+    shard = RelationshipAggregator.from_config(config)[0]
+    shard.add(transaction('C1', '5', '2023-12-31'))
+    shard.add(transaction('C3', '1', '2024-05-05'))
+    path = str(tmp_path / 'c.aggregates')
+    shard.save(path)
+
+    aggregator.load(path)
+
+    assert aggregator.get({'contract_award_unique_key': 'C1'}) == {
+        'total_obligation': Decimal('15'),
+        'transaction_count': 2,
+        'first_action_date': '2023-12-31',
+        'last_action_date': '2024-01-01',
+    }
+    assert aggregator.get({'contract_award_unique_key': 'C3'})['transaction_count'] == 1
+
+def test_persist_writes_target_field(aggregator):
+    aggregator.add(transaction('C1', '10', '2024-01-01'))
+    aggregator.add(transaction('C2', '10', '2024-01-01'))
+    updates = {}
+
+    result = aggregator.persist(
+        lambda entity_type, key: key['contract_award_unique_key'] if key['contract_award_unique_key'] == 'C1' else None,
+        lambda entity_type, entity_id, fields: updates.setdefault((entity_type, entity_id), fields) is not None
+    )
+
+    assert result == {'updated': 1, 'unresolved': 1}
+    assert updates[('contract', 'C1')]['transaction_totals']['total_obligation'] == '10'
+
+def test_rejects_unknown_function():
+    with pytest.raises(ConfigurationError):
+        RelationshipAggregator('r', 'transaction', 'contract', 'contract_ref', {'x': {'function': 'median', 'source': 'a'}})
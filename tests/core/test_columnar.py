@@ -0,0 +1,84 @@
+import pytest
+from decimal import Decimal
+from pathlib import Path
+
+import yaml
+
+from src.usaspending.core.columnar import ColumnarTransformer, compile_operations, records_to_columns
+from src.usaspending.core.error_sink import ErrorRecord
+from src.usaspending.core.transformers import TransformationEngine
+from src.usaspending.core.exceptions import TransformationError
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "conversion_config.yaml"
+
+@pytest.fixture(scope="module")
+def field_properties():
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        return yaml.safe_load(f)['field_properties']
+
+def test_transform_columns_applies_pipelines():
+    transformer = ColumnarTransformer({
+        'amount': [{'type': 'strip_characters', 'characters': '$,'}, {'type': 'convert_to_decimal'}],
+        'code': [{'type': 'trim'}, {'type': 'pad_left', 'character': '0', 'length': 3}],
+        'uei': [{'type': 'uppercase'}],
+    })
+    columns = transformer.transform_columns({
+        'amount': ['$1,000.25', '', None, 'bad'],
+        'code': [' 97', '012', '', None],
+        'uei': ['abc', 'DEF', None, ''],
+        'other': [1, 2, 3, 4],
+    })
+
+    assert columns['amount'] == [Decimal('1000.25'), '', None, 'bad']
+    assert columns['code'] == ['097', '012', '', None]
+    assert columns['uei'] == ['ABC', 'DEF', None, '']
+    assert columns['other'] == [1, 2, 3, 4]
+    assert transformer.errors.records() == [ErrorRecord('amount', 'Invalid decimal value: bad', 'amount', 3)]
+
+def test_transform_errors_are_bounded():
+    transformer = ColumnarTransformer({'amount': [{'type': 'convert_to_decimal'}]}, max_errors=2)
+    transformer.transform_columns({'amount': ['bad1', 'bad2', 'bad3', '1.5']})
+
+    assert transformer.errors.total == 3
+    assert transformer.errors.counts() == {'amount': 3}
+    assert [record.row_index for record in transformer.errors.records()] == [1, 2]
+
+def test_unsupported_operation():
+    with pytest.raises(TransformationError):
+        compile_operations([{'type': 'reverse'}])
+
+def test_from_field_properties_resolves_wildcards(field_properties):
+    transformer = ColumnarTransformer.from_field_properties(
+        field_properties, ['total_dollars_obligated', 'number_of_offers_source', 'unrelated'])
+    assert set(transformer.fields) == {'total_dollars_obligated', 'number_of_offers_source'}
+
+def test_transform_batch_with_config(field_properties):
+    engine = TransformationEngine()
+    records = [
+        {'federal_action_obligation': '$1,234.50', 'action_date': '01/15/2024',
+         'action_date_fiscal_year': '', 'awarding_agency_code': '97', 'is_fpds': 'y'},
+        {'federal_action_obligation': '-10.00', 'action_date': '20231001',
+         'action_date_fiscal_year': '', 'awarding_agency_code': '012', 'is_fpds': 'N'},
+    ]
+
+    result = engine.transform_batch(records, field_properties)
+
+    assert result[0] == {'federal_action_obligation': Decimal('1234.50'), 'action_date': '2024-01-15',
+                         'action_date_fiscal_year': 2024, 'awarding_agency_code': '097', 'is_fpds': 'true'}
+    assert result[1]['federal_action_obligation'] == Decimal('-10.00')
+    assert result[1]['action_date_fiscal_year'] == 2024
+    assert records[0]['action_date'] == '01/15/2024'
+    assert engine.get_columnar_transformer(field_properties, list(records[0])) is \
+        engine.get_columnar_transformer(field_properties, list(records[0]))
+
+def test_records_to_columns():
+    assert records_to_columns([{'a': 1}, {'a': 2, 'b': 3}], ['a', 'b']) == {'a': [1, 2], 'b': [None, 3]}
+
+@pytest.mark.parametrize("op_type, method", [('trim', str.strip), ('uppercase', str.upper), ('lowercase', str.lower)])
+def test_string_operations_match_str_methods(op_type, method):
+    values = [' a\x00 ', 'Mixed Case ', '\tx\n', '', None, 5]
+    (operation,) = compile_operations([{'type': op_type}])
+
+    assert operation(values, {}, lambda index, message: None) == [
+        method(v) if isinstance(v, str) else v for v in values
+    ]
@@ -0,0 +1,128 @@
+import pytest
+from pathlib import Path
+
+import yaml
+
+from src.usaspending.core.csv_reader import (
+    CSVFormat, StreamingCSVReader, compute_shards, get_source_columns, read_header
+)
+from src.usaspending.core.exceptions import FileOperationError
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "conversion_config.yaml"
+DUMMY_CSV = Path(__file__).parent.parent.parent / "input" / "dummy_CSV_data.csv"
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "contracts.csv"
+    path.write_text(
+        "\ufeffid;name;amount;unused\n"
+        "1;'Acme; Inc';100.00;x\n"
+        "2;Globex;200.00;y\n",
+        encoding="utf-8"
+    )
+    return path
+
+@pytest.fixture
+def csv_format():
+    return CSVFormat(delimiter=";", quotechar="'")
+
+def test_csv_format_from_config():
+    fmt = CSVFormat.from_config({'encoding': 'latin-1', 'delimiter': '|'})
+    assert fmt.encoding == 'latin-1'
+    assert fmt.delimiter == '|'
+    assert fmt.quotechar == '"'
+    assert fmt.has_header_row is True
+
+def test_reads_all_columns(csv_file, csv_format):
+    records = list(StreamingCSVReader(csv_file, csv_format))
+    assert records[0] == {'id': '1', 'name': 'Acme; Inc', 'amount': '100.00', 'unused': 'x'}
+    assert len(records) == 2
+
+def test_projects_columns(csv_file, csv_format):
+    reader = StreamingCSVReader(csv_file, csv_format, columns=['id', 'amount', 'missing'])
+    records = list(reader)
+    assert records == [{'id': '1', 'amount': '100.00'}, {'id': '2', 'amount': '200.00'}]
+    assert reader.projected_columns == ['id', 'amount']
+    assert reader.missing_columns == {'missing'}
+    assert reader.rows_read == 2
+
+def test_short_rows_are_padded(tmp_path):
+    path = tmp_path / "short.csv"
+    path.write_text("a,b,c\n1\n", encoding="utf-8")
+    records = list(StreamingCSVReader(path, columns=['a', 'c']))
+    assert records == [{'a': '1', 'c': ''}]
+
+def test_iter_chunks(csv_file, csv_format):
+    chunks = list(StreamingCSVReader(csv_file, csv_format, columns=['id']).iter_chunks(1))
+    assert chunks == [[{'id': '1'}], [{'id': '2'}]]
+
+def test_no_header_requires_fieldnames(csv_file):
+    with pytest.raises(FileOperationError):
+        StreamingCSVReader(csv_file, CSVFormat(has_header_row=False))
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileOperationError):
+        list(StreamingCSVReader(tmp_path / "missing.csv"))
+
+def test_get_source_columns():
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        entities = yaml.safe_load(f)['entities']
+
+    columns = get_source_columns(entities)
+    # direct, multi_source, object, nested object, reference, template and role sources
+    assert 'recipient_uei' in columns
+    assert 'funding_agency_code' in columns
+    assert 'recipient_address_line_1' in columns
+    assert 'base_and_all_options_value' in columns
+    assert 'primary_place_of_performance_zip_4' in columns
+    # Reference keys are read from the columns their key fields map to
+    assert 'primary_place_of_performance_zip_code' not in columns
+    assert 'awarding_office_code' in columns
+    assert 'uei' not in columns
+
+def test_get_source_columns_skips_object_constants():
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        entities = yaml.safe_load(f)['entities']
+    header = read_header(DUMMY_CSV)[0]
+
+    # contact.type: primary is a constant, not a column, once the header is known
+    assert 'primary' in get_source_columns(entities)
+    columns = get_source_columns(entities, header)
+    assert 'primary' not in columns
+    assert 'recipient_phone_number' in columns
+    # Direct mappings stay column references even when missing from the header
+    assert 'sam_registered' in columns
+
+def test_projection_against_fpds_header():
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        entities = yaml.safe_load(f)['entities']
+
+    reader = StreamingCSVReader(DUMMY_CSV, columns=get_source_columns(entities))
+    records = list(reader)
+    assert len(records) == 2
+    assert len(reader.header) > len(reader.projected_columns)
+    assert records[0]['contract_transaction_unique_key']
+
+@pytest.fixture
+def multiline_csv(tmp_path):
+    path = tmp_path / "multiline.csv"
+    lines = ["id,note"]
+    for i in range(200):
+        lines.append(f'{i},"line one\nline ""two""\n"' if i % 3 == 0 else f"{i},plain")
+    path.write_text("\ufeff" + "\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+@pytest.mark.parametrize("shard_count", [1, 2, 5, 50])
+def test_compute_shards_aligns_to_records(multiline_csv, shard_count):
+    expected = list(StreamingCSVReader(multiline_csv))
+    shards = compute_shards(multiline_csv, shard_count, block_size=64)
+
+    assert len(shards) <= shard_count
+    assert all(a[1] == b[0] for a, b in zip(shards, shards[1:]))
+    records = [r for s in shards for r in StreamingCSVReader(multiline_csv, byte_range=s)]
+    assert records == expected
+
+def test_read_header(multiline_csv):
+    header, offset = read_header(multiline_csv)
+    assert header == ['id', 'note']
+    assert offset == len("\ufeffid,note\n".encode("utf-8"))
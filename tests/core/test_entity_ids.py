@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+from src.usaspending.core.entity_ids import EntityIdGenerator
+
+KEY_FIELDS = {'recipient': ['uei'], 'agency': ['agency_code', 'sub_agency_code']}
+
+def test_id_uses_key_fields_only():
+    generator = EntityIdGenerator(KEY_FIELDS)
+    first = generator.generate('recipient', {'uei': 'ABC123', 'name': 'Acme'})
+    second = generator.generate('recipient', {'uei': 'ABC123', 'name': 'Acme Inc'})
+    assert first == second
+    assert len(first) == 32
+
+def test_id_reads_factory_data_payload():
+    generator = EntityIdGenerator(KEY_FIELDS)
+    assert (generator.generate('recipient', {'type': 'recipient', 'data': {'uei': 'ABC123'}}) ==
+            generator.generate('recipient', {'uei': 'ABC123'}))
+
+def test_id_distinguishes_types_and_key_boundaries():
+    generator = EntityIdGenerator({'a': ['x', 'y'], 'b': ['x', 'y']})
+    assert generator.generate('a', {'x': 'ab', 'y': 'c'}) != generator.generate('a', {'x': 'a', 'y': 'bc'})
+    assert generator.generate('a', {'x': '1', 'y': '2'}) != generator.generate('b', {'x': '1', 'y': '2'})
+
+def test_id_falls_back_to_content_digest():
+    generator = EntityIdGenerator(KEY_FIELDS)
+    # No key fields configured, or all key values empty
+    assert generator.generate('contract', {'a': 1}) == generator.generate('contract', {'a': 1})
+    assert generator.generate('contract', {'a': 1}) != generator.generate('contract', {'a': 2})
+    assert generator.generate('recipient', {'name': 'x'}) != generator.generate('recipient', {'name': 'y'})
+
+def test_from_config():
+    generator = EntityIdGenerator.from_config({
+        'agency': {'key_fields': ['agency_code']},
+        'contract': {'field_mappings': {}}
+    })
+    assert generator.get_key_fields('agency') == ['agency_code']
+    assert generator.get_key_fields('contract') == []
+    assert generator.get_key('agency', {'agency_code': '097'}) == ('097',)
+
+def test_id_is_stable_across_processes():
+    code = ("from src.usaspending.core.entity_ids import EntityIdGenerator;"
+            "print(EntityIdGenerator({'r': ['uei']}).generate('r', {'uei': 'X'}))")
+    ids = {subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                          check=True).stdout.strip() for _ in range(2)}
+    assert ids == {EntityIdGenerator({'r': ['uei']}).generate('r', {'uei': 'X'})}
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from src.usaspending.core.entity_registry import SeenKeyRegistry
+from src.usaspending.core.exceptions import StorageError
+
+def test_add_reports_new_keys():
+    registry = SeenKeyRegistry()
+    assert registry.add('ab12') is True
+    assert registry.add('ab12') is False
+    assert registry.add('not-hex') is True
+    assert 'not-hex' in registry
+    assert len(registry) == 2
+    assert not registry.spilled
+
+def test_spills_to_disk_when_bounded(tmp_path):
+    spill_path = str(tmp_path / 'seen.db')
+    registry = SeenKeyRegistry(max_memory_keys=3, spill_path=spill_path)
+    keys = [f"{i:032x}" for i in range(10)]
+
+    assert all(registry.add(key) for key in keys)
+    assert registry.spilled
+    assert len(registry._keys._memory) <= 3
+    assert not any(registry.add(key) for key in keys)
+    assert len(registry) == 10
+
+    registry.close()
+    # Caller-provided spill files are kept
+    assert os.path.exists(spill_path)
+
+def test_temporary_spill_file_removed_on_close():
+    registry = SeenKeyRegistry(max_memory_keys=1)
+    registry.add('aa')
+    registry.add('bb')
+    spill_path = registry.spill_path
+    assert spill_path and os.path.exists(spill_path)
+
+    registry.close()
+    assert not os.path.exists(spill_path)
+
+def test_invalid_bound():
+    with pytest.raises(StorageError):
+        SeenKeyRegistry(max_memory_keys=0)
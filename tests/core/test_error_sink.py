@@ -0,0 +1,45 @@
+from src.usaspending.core.error_sink import (
+    ErrorSink, get_default_max_errors, set_default_max_errors
+)
+
+def test_ring_buffer_keeps_latest_and_counts_all():
+    sink = ErrorSink(max_errors=3)
+    for i in range(10):
+        sink.add('uei_pattern' if i % 2 else 'amount_range', "Invalid {field}: {value}",
+                 field='uei', row_index=i, value=f"v{i}")
+
+    assert len(sink) == 3
+    assert sink.total == 10
+    assert sink.dropped == 7
+    assert sink.counts() == {'amount_range': 5, 'uei_pattern': 5}
+    assert sink.copy() == ['Invalid uei: v7', 'Invalid uei: v8', 'Invalid uei: v9']
+    assert [r.row_index for r in sink.records()] == [7, 8, 9]
+
+def test_list_compatible_messages():
+    sink = ErrorSink(max_errors=10)
+    sink.append("Plain {not a template}")
+    sink.extend(["a", "b"])
+
+    assert list(sink) == ["Plain {not a template}", "a", "b"]
+    assert sink.counts() == {'error': 3}
+    sink.clear()
+    assert not sink and sink.total == 0
+
+def test_lazy_formatting_keeps_unknown_placeholders():
+    sink = ErrorSink(max_errors=10)
+    sink.add('cmp', "Field {field} must be {operator} {compare_to}", field='start', value='x')
+    sink.add('pattern', "Bad {0}", field='f')
+    assert sink.messages() == ["Field start must be {operator} {compare_to}", "Bad {0}"]
+
+def test_value_references_are_truncated():
+    sink = ErrorSink(max_errors=1)
+    sink.add('long', "{value}", field='f', value="x" * 1000)
+    assert len(sink.records()[0].value_ref) < 100
+
+def test_default_bound():
+    original = get_default_max_errors()
+    try:
+        set_default_max_errors(5)
+        assert ErrorSink().max_errors == 5
+    finally:
+        set_default_max_errors(original)
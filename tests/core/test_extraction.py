@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.usaspending.core.extraction import EntityExtractor
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "conversion_config.yaml"
+
+@pytest.fixture(scope="module")
+def entities():
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        return yaml.safe_load(f)['entities']
+
+@pytest.fixture
+def row():
+    return {
+        'contract_transaction_unique_key': 'T1',
+        'contract_award_unique_key': 'C1',
+        'award_id_piid': 'P1',
+        'action_date': '2024-01-15',
+        'federal_action_obligation': '100.00',
+        'awarding_agency_code': '097',
+        'awarding_agency_name': 'DOD',
+        'awarding_sub_agency_code': '1700',
+        'awarding_office_code': 'N001',
+        'funding_agency_code': '',
+        'recipient_uei': 'UEI123',
+        'recipient_name': 'ACME',
+        'recipient_parent_uei': '',
+        'recipient_country_code': 'USA',
+        'recipient_state_code': 'VA',
+        'recipient_city_name': 'ARLINGTON',
+        'naics_code': '541330',
+        'naics_description': '',
+        'primary_place_of_performance_country_code': 'USA',
+        'primary_place_of_performance_state_code': 'MD',
+    }
+
+def test_extracts_every_entity_in_one_pass(entities, row):
+    extractor = EntityExtractor(entities, columns=list(row))
+    result = extractor.extract(row)
+
+    assert set(result) == {'agency', 'location', 'recipient', 'contract', 'transaction'}
+    assert result['agency']['agency_code'] == '097'
+    assert result['recipient']['uei'] == 'UEI123'
+    assert result['location']['state_code'] == 'VA'
+    assert result['transaction']['federal_action_obligation'] == '100.00'
+
+def test_maps_references_templates_and_constants(entities, row):
+    result = EntityExtractor(entities, columns=list(row)).extract(row)
+    contract = result['contract']
+
+    assert contract['recipient_ref'] == {'entity': 'recipient', 'key': {'uei': 'UEI123'}}
+    # Empty references are left out
+    assert 'recipient_parent_ref' not in contract
+    assert contract['place_of_performance_ref']['key']['state_code'] == 'MD'
+    assert contract['place_of_performance_ref']['reference_type'] == 'place_of_performance'
+
+    awarding = contract['agencies']['awarding']
+    assert awarding['ref'] == '097'
+    assert awarding['office_ref'] == '097:1700:N001'
+    # Templates with empty placeholders produce no reference
+    assert 'funding' not in contract['agencies']
+
+    # Values that are not header columns are constants
+    assert contract['prime_award']['is_prime'] == 'true'
+    assert result['recipient']['naics'] == {'code': '541330', 'description': ''}
+    assert result['transaction']['contract_ref']['key'] == {'contract_award_unique_key': 'C1'}
+
+def test_skips_entities_without_key_values(entities, row):
+    row['recipient_uei'] = ''
+    result = EntityExtractor(entities, columns=list(row)).extract(row)
+    assert 'recipient' not in result
+
+def test_route_to_writers_in_order(entities, row):
+    order = ['agency', 'recipient', 'location', 'contract', 'transaction']
+    extractor = EntityExtractor(entities, entity_types=order)
+    written = []
+    writers = {name: (lambda entity, name=name: written.append(name)) for name in order if name != 'location'}
+
+    counts = extractor.route([row, row], writers)
+
+    assert extractor.entity_types == order
+    assert counts == {'agency': 2, 'recipient': 2, 'contract': 2, 'transaction': 2}
+    assert written[:4] == ['agency', 'recipient', 'contract', 'transaction']
+
+def test_extract_batch_groups_by_type(entities, row):
+    batches = EntityExtractor(entities).extract_batch([row, dict(row, recipient_uei='')])
+    assert len(batches['transaction']) == 2
+    assert len(batches['recipient']) == 1
+
+def test_extracts_one_entity_per_role(entities, row):
+    row.update({'funding_agency_code': '097', 'funding_sub_agency_code': '2100', 'funding_office_code': 'W001'})
+    extracted = EntityExtractor(entities, columns=list(row)).extract_entities(row)
+
+    locations = [entity for name, entity in extracted if name == 'location']
+    assert [location['state_code'] for location in locations] == ['VA', 'MD']
+    agencies = [entity for name, entity in extracted if name == 'agency']
+    assert [agency['sub_agency_code'] for agency in agencies] == ['1700', '2100']
+
+def test_reference_key_fields_map_to_columns(entities, row):
+    from src.usaspending.core.entity_ids import EntityIdGenerator
+
+    row.update({'recipient_zip_4_code': '222011234', 'recipient_address_line_1': '1 MAIN ST'})
+    extracted = EntityExtractor(entities, columns=list(row)).extract_entities(row)
+    locations = [entity for name, entity in extracted if name == 'location']
+    recipient = dict(extracted)['recipient']
+    contract = dict(extracted)['contract']
+
+    id_generator = EntityIdGenerator.from_config(entities)
+    location_ids = [id_generator.generate('location', location) for location in locations]
+    assert recipient['location_ref']['key']['address_line_1'] == '1 MAIN ST'
+    assert id_generator.generate('location', recipient['location_ref']['key']) == location_ids[0]
+    assert id_generator.generate('location', contract['place_of_performance_ref']['key']) == location_ids[1]
@@ -0,0 +1,64 @@
+import pytest
+from pathlib import Path
+
+import yaml
+
+from src.usaspending.core.csv_reader import read_header
+from src.usaspending.core.field_index import FieldPropertyIndex, get_field_index, header_hash
+
+ROOT = Path(__file__).parent.parent.parent
+
+@pytest.fixture(scope="module")
+def field_properties():
+    with open(ROOT / "conversion_config.yaml", encoding='utf-8') as f:
+        return yaml.safe_load(f)['field_properties']
+
+def test_resolves_exact_and_wildcard_fields(field_properties):
+    header = ['federal_action_obligation', 'total_dollars_obligated',
+              'highly_compensated_officer_3_amount', 'highly_compensated_officer_6_amount',
+              'action_date', 'unknown_column']
+    index = FieldPropertyIndex(field_properties, header)
+
+    assert index.get('total_dollars_obligated').groups == ['numeric.money']
+    assert 'highly_compensated_officer_3_amount' in index
+    assert 'highly_compensated_officer_6_amount' not in index
+    assert index.unmatched_columns == ['highly_compensated_officer_6_amount', 'unknown_column']
+
+    action_date = index.get('action_date')
+    assert action_date.type == 'date'
+    assert action_date.groups[:2] == ['date.standard', 'date.not_future']
+    assert [op['type'] for op in action_date.operations] == ['normalize_date', 'strip_time']
+    assert len(action_date.validations) >= 2
+
+def test_money_pipeline_applied_once(field_properties):
+    # Matches both an exact name and "base_and_*_options_value"
+    index = FieldPropertyIndex(field_properties, ['base_and_all_options_value'])
+    assert [op['type'] for op in index.get_pipelines()['base_and_all_options_value']] == \
+        ['strip_characters', 'convert_to_decimal']
+
+def test_index_cached_by_header_hash(field_properties):
+    header = read_header(ROOT / "input" / "dummy_CSV_data.csv")[0]
+    index = get_field_index(field_properties, header)
+
+    assert get_field_index(field_properties, list(header)) is index
+    assert get_field_index(field_properties, header[:-1]) is not index
+    assert len(index) > 0
+    assert header_hash(header) == header_hash(list(header))
+
+def test_validation_rules_per_column(field_properties):
+    from src.usaspending.core.types import RuleType
+
+    index = FieldPropertyIndex(field_properties, ['recipient_uei', 'recipient_state_code',
+                                                  'federal_action_obligation', 'action_type', 'action_date'])
+    rules = index.get_validation_rules()
+
+    assert [(rule.id, rule.parameters) for rule in rules['recipient_uei']] == \
+        [('recipient_uei.pattern', {'pattern': '^[A-Z0-9]{12}$'})]
+    assert [rule.rule_type for rule in rules['recipient_state_code']] == [RuleType.PATTERN, RuleType.LENGTH]
+    assert rules['federal_action_obligation'][0].parameters == {'min': 0, 'max': None}
+    assert rules['action_type'][0].rule_type == RuleType.ENUM
+    assert 'A' in rules['action_type'][0].parameters['values']
+    assert 'FUNDING ONLY ACTION' in rules['action_type'][0].parameters['values']
+    assert rules['recipient_uei'][0].message == "Invalid UEI format for {field}: {value}"
+    # Date formats and comparisons have no value rule
+    assert 'action_date' not in rules
@@ -0,0 +1,60 @@
+import pytest
+from decimal import Decimal
+
+from src.usaspending.core.formula import compile_formula, MAX_SEQUENCE_LENGTH
+from src.usaspending.core.exceptions import MappingError
+
+@pytest.mark.parametrize("formula,values,expected", [
+    ("val0 + val1", [1, 2], 3),
+    ("val0 * val1 - val2 / 2", [Decimal('2'), Decimal('3'), Decimal('4')], Decimal('4')),
+    ("val0 if val0 is not None else val1", [None, 'b'], 'b'),
+    ("round(abs(val0), 1)", [-1.26], 1.3),
+    ("max(val0, val1) > 10 and not val2", [5, 11, False], True),
+    ("val0 in ('A', 'B')", ['C'], False),
+    ("val0 % 7 * 2", [10], 6),
+    ("42", [], 42),
+])
+def test_compile_formula(formula, values, expected):
+    assert compile_formula(formula)(values) == expected
+
+def test_missing_values_are_none():
+    assert compile_formula("val2 is None")([1]) is True
+
+def test_compile_formula_is_cached():
+    assert compile_formula("val0 * 3") is compile_formula("val0 * 3")
+
+@pytest.mark.parametrize("formula", [
+    "__import__('os')",
+    "val0.__class__",
+    "open('x')",
+    "[v for v in val0]",
+    "lambda: 1",
+    "val0[0]",
+    "other + 1",
+    "max(val0, key=abs)",
+    "val0 +",
+    "9 ** 9 ** 9",
+    "'x' * 10000000000",
+    "val0 * ('a',)",
+    "[0] * val0",
+    "'%099999999d' % val0",
+])
+def test_rejects_unsafe_or_invalid_formulas(formula):
+    with pytest.raises(MappingError):
+        compile_formula(formula)
+
+@pytest.mark.parametrize("formula,values", [
+    ("str(1) * 100000000000", []),
+    ("(val0 or 'ab') * 100000000000", [None]),
+    ("val0 * val1", [[0], 10 ** 12]),
+    ("str('%05d') % 3", []),
+    ("val0 % 3", ['%099999999d']),
+])
+def test_rejects_huge_values_when_evaluated(formula, values):
+    func = compile_formula(formula)
+    with pytest.raises(MappingError):
+        func(values)
+
+def test_bounded_repetition_is_evaluated():
+    assert compile_formula("(val0 or 'ab') * 3")([None]) == 'ababab'
+    assert len(compile_formula("str(val0) * val1")(['x', MAX_SEQUENCE_LENGTH])) == MAX_SEQUENCE_LENGTH
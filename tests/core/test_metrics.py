@@ -0,0 +1,53 @@
+import pickle
+import threading
+
+from src.usaspending.core.metrics import MetricsRegistry
+
+def test_counters_merge_across_threads():
+    metrics = MetricsRegistry()
+
+    def work():
+        for _ in range(1000):
+            metrics.increment("rows")
+        metrics.increment("errors", 5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.counters() == {"rows": 4000, "errors": 20}
+    assert metrics.rates(elapsed=2.0) == {"rows": 2000.0, "errors": 10.0}
+
+def test_latency_histograms():
+    metrics = MetricsRegistry()
+    for seconds in [0.001] * 90 + [0.1] * 10:
+        metrics.observe("store", seconds)
+    with metrics.time("map"):
+        pass
+
+    latency = metrics.histograms()
+    store = latency["store"]
+    assert store["count"] == 100
+    assert store["min"] == 0.001 and store["max"] == 0.1
+    # Percentiles are bucket upper bounds, within a factor of two
+    assert 0.001 <= store["p50"] < 0.002
+    assert store["p99"] == 0.1
+    assert latency["map"]["count"] == 1
+
+def test_merge_pickle_and_reset():
+    worker = MetricsRegistry()
+    worker.increment("rows", 3)
+    worker.observe("validate", 0.01)
+    restored = pickle.loads(pickle.dumps(worker))
+
+    metrics = MetricsRegistry()
+    metrics.increment("rows")
+    metrics.merge(restored)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"rows": 4}
+    assert snapshot["latency"]["validate"]["count"] == 1
+    metrics.reset()
+    assert metrics.counters() == {}
@@ -0,0 +1,40 @@
+from src.usaspending.core.patterns import PatternRegistry, pattern_registry
+from src.usaspending.core.types import ValidationRule, RuleType
+from src.usaspending.core.validation_mediator import ValidationMediator
+
+def make_rule(pattern):
+    return ValidationRule(id='uei', field_name='recipient_uei', rule_type=RuleType.PATTERN,
+                          parameters={'pattern': pattern}, message='Invalid UEI')
+
+def test_registry_compiles_once():
+    registry = PatternRegistry()
+    compiled = registry.get(r'^[A-Z0-9]{12}$')
+    assert compiled is registry.get(r'^[A-Z0-9]{12}$')
+    assert compiled.match('ABC123DEF456')
+    assert len(registry) == 1
+
+def test_invalid_pattern_is_cached_as_none():
+    registry = PatternRegistry()
+    assert registry.get('[unclosed') is None
+    assert registry.get('[unclosed') is None
+    assert len(registry) == 1
+
+def test_compile_rule_attaches_pattern():
+    rule = make_rule(r'^\d{6}$')
+    assert PatternRegistry().compile_rule(rule) is rule.compiled_pattern
+    assert rule.compiled_pattern.match('541512')
+
+def test_mediator_compiles_rules_on_registration():
+    mediator = ValidationMediator()
+    rule = make_rule(r'^[A-Z0-9]{12}$')
+    mediator.register_rules('recipient_uei', [rule])
+
+    assert rule.compiled_pattern is pattern_registry.get(r'^[A-Z0-9]{12}$')
+    assert mediator.validate_field('recipient_uei', 'ABC123DEF456')
+    assert not mediator.validate_field('recipient_uei', 'abc')
+    assert mediator.get_errors() == ['Invalid UEI']
+
+def test_mediator_treats_invalid_pattern_as_failure():
+    mediator = ValidationMediator()
+    mediator.register_rules('recipient_uei', [make_rule('[unclosed')])
+    assert not mediator.validate_field('recipient_uei', 'anything')
@@ -0,0 +1,209 @@
+import pytest
+
+from src.usaspending.core.processor import EntityMatcher
+
+@pytest.fixture
+def matcher():
+    entities = {
+        'recipient': {
+            'key_fields': ['uei'],
+            'field_mappings': {'direct': {'name': 'recipient_name'}}
+        },
+        'contract': {
+            'key_fields': ['contract_award_unique_key'],
+            'field_mappings': {'multi_source': {'piid': {'sources': ['award_id_piid', 'piid']}}}
+        },
+        'transaction': {
+            'key_fields': ['contract_award_unique_key'],
+            'field_mappings': {'direct': {'amount': 'federal_action_obligation'}}
+        }
+    }
+    return EntityMatcher(entities, ['recipient', 'contract', 'transaction'])
+
+def test_matches_by_key_fields_and_sources(matcher):
+    assert matcher.match({'uei': 'U1', 'recipient_name': 'ACME'}) == 'recipient'
+    # Key fields alone are not enough
+    assert matcher.match({'uei': 'U1'}) is None
+    record = {'contract_award_unique_key': 'C1', 'piid': 'P1', 'federal_action_obligation': '1'}
+    assert matcher.matching_types(record) == ('contract', 'transaction')
+    assert matcher.match(record) == 'contract'
+    assert matcher.matches(record, 'transaction')
+    assert not matcher.matches(record, 'recipient')
+
+def test_memoizes_per_column_signature(matcher):
+    for i in range(100):
+        matcher.match({'uei': f'U{i}', 'recipient_name': ''})
+        matcher.match({'contract_award_unique_key': f'C{i}', 'piid': f'P{i}'})
+    assert matcher.signatures == 2
+
+    bounded = EntityMatcher({}, [], max_signatures=1)
+    assert bounded.match({'a': 1}) is None
+    assert bounded.match({'b': 1}) is None
+    assert bounded.signatures == 1
+
+class UpperMapper:
+    def map_entity(self, entity_type, record):
+        return {key: str(value).upper() for key, value in record.items()} if record.get('name') != 'bad' else {}
+
+    def get_errors(self):
+        return ['mapping failed']
+
+class AcceptingValidator:
+    def validate(self, entity_type, data):
+        return True
+
+    def get_validation_errors(self):
+        return []
+
+class ListStore:
+    def __init__(self):
+        self.saved = []
+
+    def save_entity(self, entity_type, entity):
+        self.saved.append(entity)
+        return entity['uei']
+
+def create_processor(**settings):
+    from src.usaspending.core.config import ComponentConfig
+    from src.usaspending.core.processor import DataProcessor
+
+    processor = DataProcessor(UpperMapper(), AcceptingValidator(), ListStore())
+    processor.configure(ComponentConfig(settings={
+        'entities': {'recipient': {'key_fields': ['uei'], 'field_mappings': {'direct': {'name': 'name'}}}},
+        **settings
+    }))
+    return processor
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_process_batch_in_work_units(executor):
+    processor = create_processor(executor=executor, max_workers=2, work_unit_size=3)
+    records = [{'uei': f'u{i}', 'name': 'bad' if i == 4 else f'n{i}'} for i in range(10)]
+
+    results = processor.process_batch(records)
+    stats = processor.get_stats()
+    processor.cleanup()
+
+    assert [result['uei'] for result in results] == [f'U{i}' for i in range(10) if i != 4]
+    # Statistics come back from the workers with each unit
+    assert stats['processed_records'] == 9
+    assert stats['failed_records'] == 1
+    assert stats['error_count'] == 1
+
+def test_work_unit_stats_are_merged():
+    processor = create_processor(max_workers=3)
+    records = [{'uei': f'u{i}', 'name': 'bad' if i % 5 == 0 else 'n'} for i in range(20)]
+
+    processor.process_batch(records, batch_size=8)
+
+    stats = processor.get_stats()
+    assert stats['total_records'] == 20
+    assert stats['processed_records'] == 16
+    assert stats['failed_records'] == 4
+    assert stats['entity_counts'] == {'recipient': 16}
+    assert processor.process_record({'uei': 'x', 'name': 'y'}) == {'uei': 'X', 'name': 'Y'}
+    assert processor.get_stats()['processed_records'] == 17
+    processor.cleanup()
+
+@pytest.mark.parametrize('storage_type', ['segmented', 'sqlite', 'filesystem'])
+def test_process_executor_stores_in_parent(tmp_path, storage_type):
+    from src.usaspending.core.config import ComponentConfig
+    from src.usaspending.core.processor import DataProcessor
+    from src.usaspending.entity_store import EntityStore
+
+    entities = {'recipient': {'key_fields': ['uei'], 'field_mappings': {'direct': {'name': 'name'}}}}
+    store = EntityStore()
+    store.configure(ComponentConfig(settings={
+        'storage_type': storage_type, 'path': str(tmp_path / 'entities'), 'entities': entities
+    }))
+    processor = DataProcessor(UpperMapper(), AcceptingValidator(), store)
+    processor.configure(ComponentConfig(settings={
+        'entities': entities, 'executor': 'process', 'max_workers': 2, 'work_unit_size': 3
+    }))
+    records = [{'uei': f'u{i}', 'name': 'bad' if i == 4 else f'n{i}'} for i in range(10)]
+
+    try:
+        results = processor.process_batch(records)
+        stats = processor.get_stats()
+        stored = sorted(entity['uei'] for entity in store.list_entities('recipient'))
+    finally:
+        processor.cleanup()
+        store.cleanup()
+
+    assert len(results) == 9
+    assert stats['processed_records'] == 9
+    assert stats['failed_records'] == 1
+    assert stats['latency']['store']['count'] == 9
+    assert stored == sorted(f'U{i}' for i in range(10) if i != 4)
+
+def test_process_executor_rejects_unpicklable_mapper():
+    from src.usaspending.core.config import ComponentConfig
+    from src.usaspending.core.exceptions import ProcessingError
+    from src.usaspending.core.processor import DataProcessor
+
+    mapper = UpperMapper()
+    mapper.hook = lambda record: record
+    processor = DataProcessor(mapper, AcceptingValidator(), ListStore())
+    with pytest.raises(ProcessingError, match="picklable"):
+        processor.configure(ComponentConfig(settings={'executor': 'process'}))
+
+def test_rejects_unknown_executor():
+    from src.usaspending.core.exceptions import ProcessingError
+    with pytest.raises(ProcessingError):
+        create_processor(executor='fiber')
+
+def test_stats_report_stage_latency_and_rates():
+    processor = create_processor(max_workers=2)
+    processor.process_batch([{'uei': f'u{i}', 'name': 'n'} for i in range(6)])
+
+    stats = processor.get_stats()
+    assert set(stats['latency']) == {'map', 'validate', 'store'}
+    assert stats['latency']['store']['count'] == 6
+    assert stats['processing_time'] > 0
+    assert stats['records_per_second'] > 0
+    assert stats['rates']['records'] == stats['records_per_second']
+    processor.cleanup()
+
+def test_failed_work_unit_counts_every_record():
+    processor = create_processor(max_workers=2, work_unit_size=4)
+    process_chunk = processor._process_chunk
+
+    def fail_second_unit(records):
+        if records[0]['uei'] == 'u4':
+            raise RuntimeError("worker lost")
+        return process_chunk(records)
+
+    processor._process_chunk = fail_second_unit
+    results = processor.process_batch([{'uei': f'u{i}', 'name': 'n'} for i in range(10)])
+
+    stats = processor.get_stats()
+    assert len(results) == 6
+    assert stats['total_records'] == 10
+    assert stats['failed_records'] == 4
+    assert any('worker lost' in error for error in stats['errors'])
+    processor.cleanup()
+
+def test_process_stages_runs_every_matching_entity_type():
+    from src.usaspending.core.config import ComponentConfig
+    from src.usaspending.core.processor import DataProcessor
+
+    processor = DataProcessor(UpperMapper(), AcceptingValidator(), ListStore())
+    recipient = {'key_fields': ['uei'], 'field_mappings': {'direct': {'name': 'name'}}}
+    processor.configure(ComponentConfig(settings={'entities': {
+        'recipient': {**recipient, 'entity_processing': {'processing_order': 1,
+                                                         'concurrency': {'max_workers': 2}}},
+        'vendor': {**recipient, 'entity_processing': {
+            'processing_order': 2,
+            'dependencies': [{'entity': 'recipient', 'type': 'required'}]
+        }}
+    }}))
+    records = [{'uei': f'u{i}', 'name': 'bad' if i == 3 else 'n'} for i in range(7)]
+
+    chunks = list(processor.process_stages(records, batch_size=3))
+
+    assert len(chunks) == 3
+    assert [entity['uei'] for entity in chunks[0]['vendor']] == ['U0', 'U1', 'U2']
+    stats = processor.get_stats()
+    assert stats['total_records'] == 7
+    assert stats['entity_counts'] == {'recipient': 6, 'vendor': 6}
+    assert stats['failed_records'] == 2
+    processor.cleanup()
@@ -0,0 +1,60 @@
+import pstats
+import time
+
+import pytest
+
+from src.usaspending.core.profiling import Profiler
+from src.usaspending.core.exceptions import ConfigurationError
+
+class Store:
+    def save_entity(self, entity_type, entity):
+        return entity['id']
+
+def test_samples_instrumented_calls():
+    profiler = Profiler(sample_rate=0.25)
+    store = Store()
+    profiler.instrument(store, 'save_entity', 'save')
+    profiler.instrument(store, 'save_entity', 'save')  # already instrumented
+
+    assert [store.save_entity('t', {'id': i}) for i in range(8)] == list(range(8))
+    # Other instances are untouched
+    assert not hasattr(Store().save_entity, '_profiled_stage')
+
+    report = profiler.report()
+    assert report['save']['calls'] == 8
+    assert report['save']['count'] == 2
+    assert report['save']['estimated_total'] >= 0
+
+def test_from_config():
+    assert Profiler.from_config({'system': {}}) is None
+    profiler = Profiler.from_config({'system': {'profiling': {'enabled': True, 'sample_rate': 1}}})
+    assert profiler.sample_every == 1
+    with pytest.raises(ConfigurationError):
+        Profiler(sample_rate=0)
+    with pytest.raises(ConfigurationError):
+        Profiler(output='perf')
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_writes_cprofile_stats(tmp_path):
+    profiler = Profiler(output='cprofile', output_dir=str(tmp_path))
+    profiler.start()
+    busy(0.01)
+    path = profiler.stop('test')
+
+    assert path.endswith('.pstats')
+    assert any(name == 'busy' for _, _, name in pstats.Stats(path).stats)
+
+def test_writes_collapsed_stacks(tmp_path):
+    profiler = Profiler(output='stacks', output_dir=str(tmp_path), stack_interval=0.001)
+    profiler.start()
+    busy(0.1)
+    path = profiler.stop('test')
+
+    lines = open(path, encoding='utf-8').read().splitlines()
+    assert lines
+    assert any('test_profiling.py:busy' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
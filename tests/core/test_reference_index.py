@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from src.usaspending.core.reference_index import ReferenceIndex, ResolvedReference
+from src.usaspending.core.exceptions import StorageError
+
+@pytest.fixture
+def entities():
+    return {
+        'agency': {'key_fields': ['agency_code', 'sub_agency_code', 'office_code']},
+        'recipient': {'key_fields': ['uei']},
+        'location': {'key_fields': ['country_code', 'state_code', 'zip_code']},
+        'contract': {
+            'key_fields': ['contract_award_unique_key'],
+            'field_mappings': {
+                'reference': {
+                    'recipient_ref': {'type': 'entity_reference', 'entity': 'recipient', 'key_field': 'recipient_uei'},
+                    'location_ref': {'type': 'entity_reference', 'entity': 'location', 'key_fields': ['country_code']}
+                },
+                'template': {
+                    'agencies': {'type': 'object', 'entity': 'agency', 'fields': {}}
+                }
+            }
+        }
+    }
+
+@pytest.fixture
+def index(entities):
+    index = ReferenceIndex.from_config(entities)
+    yield index
+    index.close()
+
+def test_lookup_by_key(index):
+    assert index.add('recipient', {'uei': 'UEI1', 'name': 'A'}, 'r1')
+    assert not index.add('recipient', {'name': 'no key'}, 'r2')
+
+    assert index.lookup('recipient', {'uei': 'UEI1'}) == 'r1'
+    assert index.lookup('recipient', ['UEI1']) == 'r1'
+    assert index.lookup('recipient', {'uei': 'UEI2'}) is None
+    assert ('recipient', {'uei': 'UEI1'}) in index
+    # Factory-created entities keep their values under data
+    index.add('location', {'data': {'country_code': 'USA', 'state_code': 'VA'}}, 'l1')
+    assert index.lookup('location', {'country_code': 'USA', 'state_code': 'VA'}) == 'l1'
+
+def test_template_keys_resolve_by_prefix(index):
+    index.add('agency', {'agency_code': '097', 'sub_agency_code': '1700', 'office_code': 'N001'}, 'a1')
+    index.add('agency', {'agency_code': '097', 'sub_agency_code': '1700', 'office_code': 'N002'}, 'a2')
+
+    assert index.lookup('agency', '097:1700:N002') == 'a2'
+    # Prefixes resolve to the first entity stored
+    assert index.lookup('agency', '097:1700') == 'a1'
+    assert index.lookup('agency', '097') == 'a1'
+    # A full key with empty trailing values is not a prefix
+    assert index.lookup('agency', {'agency_code': '097'}) is None
+
+def test_resolve_entity_annotates_references(index):
+    index.add('recipient', {'uei': 'UEI1'}, 'r1')
+    index.add('agency', {'agency_code': '097', 'sub_agency_code': '1700', 'office_code': 'N001'}, 'a1')
+    contract = {
+        'contract_award_unique_key': 'C1',
+        'recipient_ref': {'entity': 'recipient', 'key': {'uei': 'UEI1'}},
+        'location_ref': {'entity': 'location', 'key': {'country_code': 'USA'}},
+        'agencies': {'awarding': {'ref': '097', 'office_ref': '097:1700:N001'}, 'funding': {'ref': None}}
+    }
+
+    misses = index.resolve_entity('contract', contract)
+
+    assert contract['recipient_ref']['entity_id'] == 'r1'
+    assert contract['agencies']['awarding'] == {
+        'ref': '097', 'office_ref': '097:1700:N001', 'ref_id': 'a1', 'office_ref_id': 'a1'
+    }
+    assert [(miss.field, miss.target_type) for miss in misses] == [('location_ref', 'location')]
+
+def test_deferred_references_resolve_late_or_report(index):
+    contract = {
+        'contract_award_unique_key': 'C1',
+        'recipient_ref': {'entity': 'recipient', 'key': {'uei': 'LATE'}},
+        'location_ref': {'entity': 'location', 'key': {'country_code': 'XXX'}}
+    }
+    index.defer('contract', 'c1', index.resolve_entity('contract', contract))
+    index.add('recipient', {'uei': 'LATE'}, 'r9')
+
+    resolved = index.resolve_deferred()
+
+    assert resolved == [ResolvedReference('contract', 'c1', 'recipient_ref', 'recipient', 'r9',
+                                          key_value={'uei': 'LATE'})]
+    report = index.get_unresolved()
+    assert report['total'] == 1
+    assert report['counts'] == {'contract.location_ref': 1}
+    assert 'XXX' in report['samples'][0]
+    assert index.get_stats()['late_resolved'] == 1
+
+def test_spills_to_disk_when_bounded(entities, tmp_path):
+    spill_path = str(tmp_path / 'refs.db')
+    index = ReferenceIndex.from_config(entities, max_memory_keys=2, spill_path=spill_path)
+    for i in range(10):
+        index.add('recipient', {'uei': f"U{i}"}, f"r{i}")
+
+    assert index.spilled
+    assert len(index) == 10
+    assert all(index.lookup('recipient', {'uei': f"U{i}"}) == f"r{i}" for i in range(10))
+    index.close()
+    assert os.path.exists(spill_path)
+
+def test_rejects_invalid_memory_bound(entities):
+    with pytest.raises(StorageError):
+        ReferenceIndex.from_config(entities, max_memory_keys=0)
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from src.usaspending.core.scheduler import EntityScheduler
+from src.usaspending.core.exceptions import ConfigurationError, ProcessingError
+
+def _entity(order, dependencies=None, workers=1, enabled=True):
+    return {
+        'entity_processing': {
+            'enabled': enabled,
+            'processing_order': order,
+            'dependencies': dependencies or [],
+            'concurrency': {'enabled': True, 'max_workers': workers}
+        }
+    }
+
+@pytest.fixture
+def entities():
+    return {
+        'agency': _entity(1, workers=2),
+        'recipient': _entity(2, [
+            {'entity': 'location', 'type': 'references'},
+            {'entity': 'recipient', 'type': 'references'}
+        ], workers=4),
+        'contract': _entity(3, [
+            {'entity': 'agency', 'type': 'references'},
+            {'entity': 'recipient', 'type': 'references'},
+            {'entity': 'location', 'type': 'references'}
+        ]),
+        'transaction': _entity(4, [{'entity': 'contract', 'type': 'required'}], workers=8),
+        'location': _entity(5, [{'entity': 'recipient', 'type': 'referenced_by'}]),
+        'disabled': _entity(6, enabled=False)
+    }
+
+def test_builds_dependency_order(entities):
+    scheduler = EntityScheduler(entities)
+    assert scheduler.order == ['agency', 'recipient', 'location', 'contract', 'transaction']
+    assert scheduler.levels() == [['agency', 'recipient', 'location'], ['contract'], ['transaction']]
+
+    # Location has a later processing order, so contract's reference to it is a back reference
+    contract = scheduler.get_stage('contract')
+    assert contract.depends_on == ['agency', 'recipient']
+    assert contract.back_references == ['location']
+    assert scheduler.get_stage('location').depends_on == []
+    assert scheduler.get_stage('transaction').max_workers == 8
+    assert scheduler.get_stage('disabled') is None
+    assert scheduler.max_pending_chunks == 16
+
+def test_cycle_raises():
+    entities = {
+        'a': _entity(1, [{'entity': 'b', 'type': 'required'}]),
+        'b': _entity(2, [{'entity': 'a', 'type': 'required'}])
+    }
+    with pytest.raises(ConfigurationError, match="cycle"):
+        EntityScheduler(entities)
+
+def test_unknown_required_dependency_raises():
+    with pytest.raises(ConfigurationError, match="unknown"):
+        EntityScheduler({'transaction': _entity(1, [{'entity': 'contract', 'type': 'required'}])})
+
+def test_run_respects_dependencies_per_chunk(entities):
+    scheduler = EntityScheduler(entities)
+    finished = set()
+    lock = threading.Lock()
+
+    def stage(name, chunk):
+        for dep in scheduler.get_stage(name).depends_on:
+            assert (dep, chunk) in finished
+        time.sleep(0.001)
+        with lock:
+            finished.add((name, chunk))
+        return f"{name}:{chunk}"
+
+    results = list(scheduler.run(range(5), stage))
+    assert len(results) == 5
+    assert results[3]['transaction'] == "transaction:3"
+    assert set(results[0]) == set(scheduler.order)
+
+def test_run_uses_stage_worker_counts(entities):
+    scheduler = EntityScheduler(entities)
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def stage(name, chunk):
+        with lock:
+            active[name] = active.get(name, 0) + 1
+            peak[name] = max(peak.get(name, 0), active[name])
+        time.sleep(0.01)
+        with lock:
+            active[name] -= 1
+
+    list(scheduler.run(range(16), stage))
+    assert peak['recipient'] > 1
+    assert peak['agency'] <= 2
+    assert peak['contract'] == 1
+
+def test_run_raises_on_stage_failure(entities):
+    scheduler = EntityScheduler(entities)
+    ran = []
+
+    def stage(name, chunk):
+        if name == 'contract':
+            raise ValueError("boom")
+        ran.append(name)
+        return None
+
+    with pytest.raises(ProcessingError, match="contract"):
+        list(scheduler.run([0], stage))
+    # Dependents of a failed stage do not run
+    assert 'transaction' not in ran
@@ -199,3 +199,62 @@ def test_severity_levels(mediator):
     errors = mediator.get_validation_errors()
     assert any(ValidationSeverity.ERROR.value in e for e in errors)
     assert any(ValidationSeverity.WARNING.value in e for e in errors)
+
+def make_rule(rule_id, field_name, rule_type, message='', **parameters):
+    return ValidationRule(id=rule_id, field_name=field_name, rule_type=rule_type,
+                          parameters=parameters, message=message)
+
+@pytest.fixture
+def batch_mediator(mediator):
+    mediator.register_rules('uei', [
+        make_rule('uei_required', 'uei', RuleType.REQUIRED, 'UEI is required'),
+        make_rule('uei_pattern', 'uei', RuleType.PATTERN, pattern=r'^[A-Z0-9]{12}$'),
+    ])
+    mediator.register_rules('amount', [make_rule('amount_range', 'amount', RuleType.RANGE, min=0)])
+    return mediator
+
+def test_validate_batch_bitmaps(batch_mediator):
+    records = [
+        {'uei': 'ABC123DEF456', 'amount': '10'},
+        {'uei': None, 'amount': '-1'},
+        {'uei': 'bad'},
+        {'amount': '5'},
+    ] + [{'uei': 'ABC123DEF456', 'amount': '1'}] * 6 + [{'uei': 'bad', 'amount': 'x'}]
+
+    result = batch_mediator.validate_batch('recipient', records)
+
+    assert result.row_count == 11
+    assert [rule.id for rule in result.rules] == ['uei_required', 'uei_pattern', 'amount_range']
+    assert all(len(bitmap) == 2 for bitmap in result.bitmaps)
+    assert result.invalid_rows() == [1, 2, 10]
+    assert result.is_valid(0) and result.is_valid(3) and not result.is_valid(10)
+    assert not result.is_valid()
+    assert result.failure_count() == 5
+    assert result.get_messages(1) == ['UEI is required', "Field 'amount' failed range validation"]
+    assert sorted(row for row, _ in result.iter_messages()) == [1, 1, 2, 10, 10]
+    assert batch_mediator.get_validation_errors() == []
+
+def test_validate_batch_all_valid(batch_mediator):
+    result = batch_mediator.validate_batch('recipient', [{'uei': 'ABC123DEF456', 'amount': 3}])
+    assert result.is_valid()
+    assert result.rules == [] and result.invalid_rows() == []
+
+def test_validate_batch_skip_empty(batch_mediator):
+    records = [{'uei': '', 'amount': ''}, {'uei': 'bad', 'amount': '1'}]
+
+    assert batch_mediator.validate_batch('recipient', records).invalid_rows() == [0, 1]
+    result = batch_mediator.validate_batch('recipient', records, skip_empty=True)
+    assert result.invalid_rows() == [1]
+    assert [rule.id for rule in result.rules] == ['uei_pattern']
+
+def test_validate_batch_uses_entity_validator(mediator):
+    class RejectOdd:
+        def validate(self, entity_type, data, context=None):
+            return data['n'] % 2 == 0
+        def get_errors(self):
+            return ['odd']
+
+    mediator.register_validator('numbers', RejectOdd())
+    result = mediator.validate_batch('numbers', [{'n': 0}, {'n': 1}])
+    assert result.invalid_rows() == [1]
+    assert list(result.iter_messages()) == [(1, 'odd')]
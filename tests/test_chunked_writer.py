@@ -183,3 +183,179 @@ def test_stats_calculation(writer):
     assert 'success_rate' in stats
     assert stats['success_rate'] == 100  # All successful
     assert stats['total_entities'] == 2
+
+class TransactionSerializer:
+    entity_type = 'transaction'
+
+    def to_dict(self, entity: EntityForTest) -> Dict[str, Any]:
+        return {'id': entity.id, 'value': entity.value}
+
+def test_chunked_writer_uses_bulk_store_path(tmp_path):
+    from src.usaspending.entity_store import EntityStore
+    from src.usaspending.core.config import ComponentConfig
+
+    serializer = TransactionSerializer()
+    store = EntityStore()
+    store.configure(ComponentConfig(settings={
+        'storage_type': 'sqlite',
+        'path': str(tmp_path / 'writer.db')
+    }))
+    writer = ChunkedWriter(store=store, serializer=serializer, chunk_size=3, worker_threads=2)
+
+    writer.write_chunk([EntityForTest(id=str(i), value=f'v{i}') for i in range(7)])
+    writer.flush()
+
+    stats = writer.get_stats()
+    assert stats['successful_writes'] == 7
+    assert stats['failed_writes'] == 0
+    assert store.count_entities(serializer.entity_type) == 7
+    store.cleanup()
+
+class GatedStore:
+    """Complete store whose bulk writes wait for a gate."""
+
+    def __init__(self, gate=None):
+        import threading
+        self.gate = gate
+        self.saved: List[Dict[str, Any]] = []
+        self.threads = set()
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def save_entities(self, entity_type, entities):
+        import threading
+        if self.gate is not None:
+            self.gate.wait()
+        entities = list(entities)
+        with self._lock:
+            self.saved.extend(entities)
+            self.threads.add(threading.get_ident())
+        return [entity['id'] for entity in entities]
+
+    def save_entity(self, entity_type, entity):
+        return self.save_entities(entity_type, [entity])[0]
+
+    def get_entity(self, entity_type, entity_id):
+        return None
+
+    def delete_entity(self, entity_type, entity_id):
+        return False
+
+    def list_entities(self, entity_type):
+        yield from self.saved
+
+    def count_entities(self, entity_type):
+        return len(self.saved)
+
+    def cleanup(self):
+        self.closed = True
+
+def test_bounded_queue_applies_backpressure():
+    import threading
+    gate = threading.Event()
+    store = GatedStore(gate)
+    writer = ChunkedWriter(store=store, serializer=TransactionSerializer(), chunk_size=1,
+                           worker_threads=1, max_pending_chunks=1)
+
+    producer = threading.Thread(
+        target=writer.write_chunk,
+        args=([EntityForTest(id=str(i), value='v') for i in range(5)],)
+    )
+    producer.start()
+    producer.join(timeout=0.5)
+    # One chunk is being written and one is queued, so the producer waits
+    assert producer.is_alive()
+    assert len(writer.buffer) == 0
+
+    gate.set()
+    producer.join(timeout=5)
+    writer.close()
+
+    stats = writer.get_stats()
+    assert stats['successful_writes'] == 5
+    assert stats['backpressure_waits'] > 0
+    assert stats['queue_size'] == 0
+
+def test_writer_threads_own_stores_and_drain_on_close():
+    stores = []
+
+    def store_factory():
+        stores.append(GatedStore())
+        return stores[-1]
+
+    writer = ChunkedWriter(store=GatedStore(), serializer=TransactionSerializer(), chunk_size=2,
+                           worker_threads=3, store_factory=store_factory)
+    async_writer = AsyncChunkedWriter(writer, max_pending_chunks=2)
+    for i in range(10):
+        async_writer.write_chunk([EntityForTest(id=f'{i}_{j}', value='v') for j in range(3)])
+
+    async_writer.flush()
+    assert writer.get_stats()['successful_writes'] == 30
+    async_writer.close()
+
+    assert len(stores) == 3
+    assert sum(len(store.saved) for store in stores) == 30
+    assert all(store.closed for store in stores)
+    assert async_writer._write_thread is None
+    assert not any(worker.is_alive() for worker in writer._workers)
+
+def test_shared_store_commits_chunks_in_order():
+    store = GatedStore()
+    writer = ChunkedWriter(store=store, serializer=TransactionSerializer(), chunk_size=2,
+                           worker_threads=3)
+    writer.write_chunk([EntityForTest(id=str(i), value='v') for i in range(20)])
+    writer.close()
+
+    assert writer.worker_threads == 1
+    assert [entity['id'] for entity in store.saved] == [str(i) for i in range(20)]
+
+def test_writer_pool_may_commit_chunks_out_of_order():
+    import threading
+    first_chunk = threading.Event()
+    committed: List[str] = []
+
+    class LoggingStore(GatedStore):
+        def save_entities(self, entity_type, entities):
+            entities = list(entities)
+            if entities[0]['id'] == '0':
+                first_chunk.wait(timeout=5)
+            committed.append(entities[0]['id'])
+            return super().save_entities(entity_type, entities)
+
+    writer = ChunkedWriter(store=GatedStore(), serializer=TransactionSerializer(), chunk_size=1,
+                           worker_threads=2, store_factory=LoggingStore)
+    writer.write_chunk([EntityForTest(id=str(i), value='v') for i in range(2)])
+    # The second chunk commits while the first one is still being written
+    deadline = time.time() + 5
+    while not committed and time.time() < deadline:
+        time.sleep(0.01)
+    first_chunk.set()
+    writer.close()
+
+    assert committed == ['1', '0']
+
+class SwallowingStore(GatedStore):
+    """Store without a bulk path that returns None on failure, as safe_operation stores do."""
+
+    def save_entities(self, entity_type, entities):
+        return None
+
+    def save_entity(self, entity_type, entity):
+        if entity['id'].startswith('fail_'):
+            return None
+        self.saved.append(entity)
+        return entity['id']
+
+def test_write_chunk_counts_swallowed_failures():
+    store = SwallowingStore()
+    writer = ChunkedWriter(store=store, serializer=TransactionSerializer(), chunk_size=2,
+                           max_retries=2, worker_threads=1)
+
+    writer.write_chunk([EntityForTest(id='fail_1', value='test1'), EntityForTest(id='2', value='test2')])
+    writer.flush()
+
+    stats = writer.get_stats()
+    assert stats['successful_writes'] == 1
+    assert stats['failed_writes'] == 1
+    assert stats['retries'] == 1
+    assert [entity['id'] for entity in store.saved] == ['2']
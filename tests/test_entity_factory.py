@@ -67,6 +67,20 @@ def test_register_entity(factory):
     assert 'new_entity' in factory._entities
     assert factory._entities['new_entity']['fields'] == {'name': {'type': 'string'}}
 
+def test_register_entity_fields_from_mappings(factory):
+    entity_config = {
+        'key_fields': ['uei'],
+        'field_mappings': {
+            'direct': {'name': 'recipient_name'},
+            'multi_source': {'state': {'sources': ['a', 'b']}},
+            'object': {},
+            'reference': {'location_ref': {'entity': 'location'}}
+        }
+    }
+
+    factory.register_entity(EntityType.RECIPIENT, entity_config)
+    assert set(factory._entities['recipient']['fields']) == {'uei', 'name', 'state', 'location_ref'}
+
 def test_create_entity_success(configured_factory):
     data = {
         'field1': 'test',
@@ -138,3 +138,47 @@ def test_invalid_entity_type(configured_mapper):
     
     assert not result  # Should return empty dict
     assert any('Unknown entity type' in err for err in configured_mapper.get_errors())
+
+@pytest.fixture
+def planned_mapper():
+    mapper = EntityMapper()
+    mapper.configure(ComponentConfig(settings={
+        'mappings': {
+            'contract': {
+                'required_fields': ['piid'],
+                'field_mappings': {'contract_id': {'field': 'piid'}},
+                'derived_mappings': {
+                    'total': {'type': 'sum', 'source_fields': ['a', 'b']},
+                    'label': {'type': 'concat', 'source_fields': ['piid', 'a'],
+                              'parameters': {'separator': '/'}},
+                    'fallback': {'type': 'sum', 'source_fields': ['missing'], 'default': 0},
+                    'scaled': {'type': 'custom', 'function': 'double', 'source_fields': ['a']},
+                    'ratio': {'type': 'formula', 'formula': 'val0 / val1', 'source_fields': ['a', 'b']}
+                }
+            }
+        }
+    }))
+    return mapper
+
+def test_configure_compiles_mapping_plans(planned_mapper):
+    plan = planned_mapper._plans['contract']
+    assert plan.required_fields == ('piid',)
+    assert plan.direct == (('contract_id', 'piid'),)
+    assert [op.target_field for op in plan.derived] == ['total', 'label', 'fallback', 'scaled', 'ratio']
+
+def test_map_entity_runs_compiled_plan(planned_mapper):
+    planned_mapper.register_calculation_function('double', lambda values, **_: values[0] * 2)
+
+    result = planned_mapper.map_entity('contract', {'piid': 'P1', 'a': 6, 'b': 4})
+
+    assert result == {'contract_id': 'P1', 'total': Decimal('10'), 'label': 'P1/6',
+                      'fallback': 0, 'scaled': 12, 'ratio': 1.5}
+
+def test_compiled_plan_reports_calculation_errors(planned_mapper):
+    result = planned_mapper.map_entity('contract', {'piid': 'P1', 'a': 1, 'b': 0})
+
+    assert 'scaled' not in result and 'ratio' not in result
+    errors = planned_mapper.get_errors()
+    assert any('Unknown calculation function: double' in err for err in errors)
+    assert any('Error calculating derived field ratio' in err for err in errors)
+    assert planned_mapper.map_entity('contract', {'a': 1}) == {}
@@ -185,3 +185,68 @@ def test_validation_rule_processing(configured_mediator):
     with pytest.raises(EntityError):
         configured_mediator.process_entity(EntityType('contract'), invalid_entity)
     assert any('Amount must be between' in err for err in configured_mediator.get_errors(EntityType('contract')))
+
+@pytest.fixture
+def rule_mediator(mediator):
+    mediator.configure(ComponentConfig(settings={'entities': {}}))
+    return mediator
+
+def make_rule(rule_id, field_name, rule_type, **parameters):
+    from src.usaspending.core.types import RuleType
+    return ValidationRule(id=rule_id, field_name=field_name, rule_type=RuleType(rule_type),
+                          parameters=parameters, message=f"{rule_id} failed")
+
+def test_rules_indexed_by_entity_type_and_field(rule_mediator):
+    rule_mediator.add_validation_rule(make_rule('uei', 'uei', 'pattern', pattern=r'^[A-Z0-9]{12}$'), 'recipient')
+    rule_mediator.add_validation_rule(make_rule('amount', 'amount', 'range', min=0), 'contract')
+    rule_mediator.add_validation_rule(make_rule('id', 'id', 'required'))
+
+    assert set(rule_mediator._rule_index) == {('recipient', 'uei'), ('contract', 'amount'), (None, 'id')}
+    assert rule_mediator.validate_entity('recipient', {'id': '1', 'uei': 'ABC123DEF456', 'amount': -5})
+    assert not rule_mediator.validate_entity(EntityType.CONTRACT, {'id': '1', 'amount': -5})
+    assert not rule_mediator.validate_entity('contract', {'id': ' ', 'amount': 5})
+    assert rule_mediator.get_validation_errors() == ['amount failed', 'id failed']
+
+def test_field_validation_uses_index(rule_mediator):
+    rule_mediator.add_validation_rule(make_rule('uei', 'uei', 'pattern', pattern=r'^[A-Z0-9]{12}$'), 'recipient')
+
+    assert not rule_mediator.validate_field('uei', 'bad', 'recipient')
+    assert rule_mediator.validate_field('uei', 'bad', 'contract')
+
+    rule_mediator.remove_validation_rule('uei')
+    assert rule_mediator.validate_field('uei', 'bad', 'recipient')
+
+def test_invalid_pattern_rejects_values(rule_mediator):
+    rule_mediator.add_validation_rule(make_rule('uei', 'uei', 'pattern', pattern='[A-Z{12}'), 'recipient')
+
+    assert not rule_mediator.validate_field('uei', 'ABC123DEF456', 'recipient')
+    assert not rule_mediator.validate_entity('recipient', {'uei': 'ABC123DEF456'})
+    assert rule_mediator.get_validation_errors() == ["Invalid pattern '[A-Z{12}' for field uei"] * 2
+
+def test_process_mapped_entity_skips_mapper(rule_mediator, mock_mapper, mock_store):
+    rule_mediator.add_validation_rule(make_rule('uei', 'uei', 'required'), 'recipient')
+
+    assert rule_mediator.process_mapped_entity('recipient', {'uei': 'ABC123DEF456'}) == '1'
+    mock_mapper.map_entity.assert_not_called()
+    assert mock_store.save_entity.call_count == 1
+
+    assert rule_mediator.process_mapped_entity('recipient', {'uei': None}) is None
+    assert mock_store.save_entity.call_count == 1
+
+    stats = rule_mediator.get_stats()
+    assert stats['stored'] == 1
+    assert stats['errors'] == 1
+    assert stats['retrieved'] == 0
+    assert stats['latency']['validate']['count'] == 2
+    assert stats['latency']['store']['count'] == 1
+    assert 'map' not in stats['latency']
+
+def test_instrument_times_hot_paths(rule_mediator, mock_store):
+    from src.usaspending.core.profiling import Profiler
+
+    profiler = Profiler(sample_rate=1)
+    rule_mediator.instrument(profiler)
+    rule_mediator.process_mapped_entity('recipient', {'uei': 'ABC123DEF456'})
+
+    report = profiler.report()
+    assert {stage: report[stage]['calls'] for stage in report} == {'validate': 1, 'create': 1, 'save': 1}
@@ -1,9 +1,9 @@
 import pytest
 from unittest.mock import Mock, MagicMock
-from src.usaspending.entity_store import EntityStore
+from src.usaspending.entity_store import EntityStore, DeduplicatingEntityStore
 from src.usaspending.core.types import EntityType, ComponentConfig
 from src.usaspending.core.exceptions import StorageError
-from src.usaspending.core.storage import SQLiteStorage, FileSystemStorage
+from src.usaspending.core.storage import SQLiteStorage, FileSystemStorage, SegmentedFileStorage
 
 @pytest.fixture
 def store():
@@ -123,3 +123,238 @@ def test_cleanup(configured_store_fs):
     # Try to save after cleanup - should raise error
     with pytest.raises(StorageError):
         configured_store_fs.save_entity(EntityType('test'), {'id': '2'})
+
+@pytest.fixture
+def sqlite_bulk_store(tmp_path):
+    store = EntityStore()
+    store.configure(ComponentConfig(settings={
+        'storage_type': 'sqlite',
+        'path': str(tmp_path / 'bulk.db'),
+        'batch_size': 2
+    }))
+    yield store
+    store.cleanup()
+
+def test_save_entities_sqlite(sqlite_bulk_store):
+    entity_type = EntityType('transaction')
+    entities = [{'id': str(i), 'amount': i} for i in range(5)]
+
+    entity_ids = sqlite_bulk_store.save_entities(entity_type, iter(entities))
+
+    assert len(entity_ids) == 5
+    assert sqlite_bulk_store.count_entities(entity_type) == 5
+    assert sqlite_bulk_store.get_entity(entity_type, entity_ids[3]) == entities[3]
+
+def test_sqlite_pragmas(sqlite_bulk_store):
+    storage = sqlite_bulk_store._storage
+    with storage.get_connection_context() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+def test_save_entities_filesystem(tmp_path):
+    store = EntityStore()
+    store.configure(ComponentConfig(settings={'path': str(tmp_path / 'entities')}))
+
+    entity_ids = store.save_entities(EntityType('agency'), [{'code': '001'}, {'code': '002'}])
+
+    assert len(entity_ids) == 2
+    assert store.count_entities(EntityType('agency')) == 2
+
+@pytest.mark.parametrize("storage_type", ["filesystem", "sqlite", "segmented"])
+def test_key_field_ids_deduplicate(tmp_path, storage_type):
+    store = EntityStore()
+    store.configure(ComponentConfig(settings={
+        'storage_type': storage_type,
+        'path': str(tmp_path / 'entities'),
+        'entities': {'recipient': {'key_fields': ['uei']}}
+    }))
+    try:
+        first = store.save_entity(EntityType.RECIPIENT, {'uei': 'ABC123', 'name': 'Acme'})
+        second = store.save_entity(EntityType.RECIPIENT, {'uei': 'ABC123', 'name': 'Acme Inc'})
+
+        assert first == second
+        assert store.count_entities(EntityType.RECIPIENT) == 1
+        assert store.get_entity(EntityType.RECIPIENT, first)['name'] == 'Acme Inc'
+    finally:
+        store.cleanup()
+
+def test_deduplicating_store_writes_reference_entities_once(tmp_path):
+    settings = {
+        'path': str(tmp_path / 'entities'),
+        'entities': {'agency': {'key_fields': ['agency_code']}},
+        'deduplication': {'entity_types': ['agency'], 'max_memory_keys': 1}
+    }
+    inner = EntityStore()
+    inner.configure(ComponentConfig(settings=settings))
+    inner.save_entity = Mock(wraps=inner.save_entity)
+    inner.save_entities = Mock(wraps=inner.save_entities)
+    store = DeduplicatingEntityStore(inner)
+    store.configure(ComponentConfig(settings=settings))
+
+    first = store.save_entity(EntityType.AGENCY, {'agency_code': '097'})
+    assert store.save_entity(EntityType.AGENCY, {'agency_code': '097'}) == first
+    ids = store.save_entities(EntityType.AGENCY, [{'agency_code': '097'}, {'agency_code': '012'},
+                                                  {'agency_code': '012'}])
+    store.save_entity(EntityType.TRANSACTION, {'id': 1})
+    store.save_entity(EntityType.TRANSACTION, {'id': 1})
+
+    assert ids[0] == first and ids[1] == ids[2]
+    assert inner.save_entity.call_count == 3  # one agency, two pass-through transactions
+    assert len(inner.save_entities.call_args.args[1]) == 1
+    assert store.count_entities(EntityType.AGENCY) == 2
+    assert store.get_stats() == {'written': 2, 'duplicates': 3, 'seen_keys': 2}
+    store.cleanup()
+
+def test_deduplicating_store_registers_keys_once_written(tmp_path):
+    settings = {
+        'path': str(tmp_path / 'entities'),
+        'entities': {'agency': {'key_fields': ['agency_code']}},
+        'deduplication': {'entity_types': ['agency']}
+    }
+    inner = EntityStore()
+    inner.configure(ComponentConfig(settings=settings))
+    save_entity, save_entities = inner.save_entity, inner.save_entities
+    # A safe_operation store returns None when a write fails
+    inner.save_entity = Mock(return_value=None)
+    inner.save_entities = Mock(return_value=None)
+    store = DeduplicatingEntityStore(inner)
+    store.configure(ComponentConfig(settings=settings))
+
+    assert store.save_entity(EntityType.AGENCY, {'agency_code': '097'}) is None
+    assert store.save_entities(EntityType.AGENCY, [{'agency_code': '012'}]) is None
+    assert store.get_stats() == {'written': 0, 'duplicates': 0, 'seen_keys': 0}
+
+    # Repeats of the failed entities are written again
+    inner.save_entity = Mock(wraps=save_entity)
+    inner.save_entities = Mock(wraps=save_entities)
+    entity_id = store.save_entity(EntityType.AGENCY, {'agency_code': '097'})
+    assert store.save_entities(EntityType.AGENCY, [{'agency_code': '012'}, {'agency_code': '097'}])[1] == entity_id
+    assert inner.save_entity.call_count == 1
+    assert len(inner.save_entities.call_args.args[1]) == 1
+    assert store.count_entities(EntityType.AGENCY) == 2
+    assert store.get_stats() == {'written': 2, 'duplicates': 1, 'seen_keys': 2}
+    store.cleanup()
+
+def make_segmented_store(path, **settings):
+    store = EntityStore()
+    store.configure(ComponentConfig(settings={
+        'storage_type': 'segmented',
+        'path': str(path),
+        **settings
+    }))
+    return store
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_segmented_store_roundtrip(tmp_path, compression):
+    store = make_segmented_store(tmp_path / 'segments', compression=compression)
+    assert isinstance(store._storage, SegmentedFileStorage)
+    entity_type = EntityType('recipient')
+    entities = [{'uei': f'UEI{i}', 'name': f'Recipient {i}'} for i in range(10)]
+
+    entity_ids = store.save_entities(entity_type, entities)
+
+    assert store.count_entities(entity_type) == 10
+    assert store.get_entity(entity_type, entity_ids[4]) == entities[4]
+    assert list(store.list_entities(entity_type)) == entities
+    assert store.delete_entity(entity_type, entity_ids[0])
+    assert not store.delete_entity(entity_type, entity_ids[0])
+    assert store.get_entity(entity_type, entity_ids[0]) is None
+    assert store.count_entities(entity_type) == 9
+    store.cleanup()
+
+def test_segmented_store_rolls_segments_and_reopens(tmp_path):
+    store = make_segmented_store(tmp_path / 'segments', max_segment_size=200, compression=False)
+    entity_type = 'transaction'
+    entities = [{'key': f'T{i:03d}', 'amount': i} for i in range(20)]
+    entity_ids = store.save_entities(entity_type, entities)
+    store.delete_entity(entity_type, entity_ids[1])
+    store.cleanup()
+
+    type_dir = tmp_path / 'segments' / 'transaction'
+    assert len(list(type_dir.glob('segment-*.jsonl'))) > 1
+    assert not list(type_dir.glob('*/*.json'))
+
+    reopened = make_segmented_store(tmp_path / 'segments', max_segment_size=200, compression=False)
+    assert reopened.count_entities(entity_type) == 19
+    assert reopened.get_entity(entity_type, entity_ids[15]) == entities[15]
+    assert list(reopened.list_entities(entity_type)) == entities[:1] + entities[2:]
+
+    # Appends continue after the last segment
+    reopened.save_entity(entity_type, {'key': 'T999', 'amount': 999})
+    assert reopened.count_entities(entity_type) == 20
+    reopened.cleanup()
+
+def test_segmented_store_compressed_segment_is_gzip_stream(tmp_path):
+    import gzip
+    import json
+
+    store = make_segmented_store(tmp_path / 'segments')
+    entities = [{'code': '001'}, {'code': '002'}]
+    store.save_entities('agency', entities)
+    store.cleanup()
+
+    segment = tmp_path / 'segments' / 'agency' / 'segment-000000.jsonl.gz'
+    with gzip.open(segment, 'rt') as f:
+        assert [json.loads(line) for line in f] == entities
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_segmented_store_compacts_superseded_versions(tmp_path, compression):
+    entities = {'contract': {'key_fields': ['key']}}
+    store = make_segmented_store(tmp_path / 'segments', compression=compression, max_segment_size=400,
+                                 entities=entities)
+    entity_type = 'contract'
+    for version in range(5):
+        store.save_entities(entity_type, [{'key': f'C{i}', 'version': version} for i in range(10)])
+    entity_ids = store.save_entities(entity_type, [{'key': f'C{i}', 'version': 5} for i in range(10)])
+    store.delete_entity(entity_type, entity_ids[0])
+    store.cleanup()
+
+    type_dir = tmp_path / 'segments' / 'contract'
+    index_lines = sum(len(path.read_text().splitlines()) for path in type_dir.glob('segment-*.idx'))
+    assert index_lines == 9
+
+    reopened = make_segmented_store(tmp_path / 'segments', compression=compression, max_segment_size=400,
+                                    entities=entities)
+    assert reopened.count_entities(entity_type) == 9
+    assert reopened.get_entity(entity_type, entity_ids[3]) == {'key': 'C3', 'version': 5}
+    assert [e['version'] for e in reopened.list_entities(entity_type)] == [5] * 9
+    reopened.save_entity(entity_type, {'key': 'C0', 'version': 6})
+    assert reopened.count_entities(entity_type) == 10
+    reopened.cleanup()
+
+def test_segmented_store_compaction_disabled(tmp_path):
+    store = make_segmented_store(tmp_path / 'segments', compression=False, compact_ratio=None,
+                                 entities={'contract': {'key_fields': ['key']}})
+    store.save_entity('contract', {'key': 'C1', 'version': 1})
+    store.save_entity('contract', {'key': 'C1', 'version': 2})
+    store.cleanup()
+
+    index = (tmp_path / 'segments' / 'contract' / 'segment-000000.idx').read_text()
+    assert len(index.splitlines()) == 2
+
+def test_factory_entities_get_stable_ids(tmp_path, caplog):
+    from src.usaspending.entity_factory import EntityFactory
+
+    entities = {
+        'contract': {'key_fields': ['key'], 'fields': {'key': {}, 'amount': {}}},
+        'transaction': {'fields': {'key': {}, 'amount': {}}}
+    }
+    factory = EntityFactory()
+    factory.configure(ComponentConfig(settings={'entities': entities}))
+    store = make_segmented_store(tmp_path / 'segments', compression=False, entities=entities)
+
+    record = {'key': 'C1', 'amount': '10.00'}
+    for entity_type in ('contract', 'transaction'):
+        first = factory.create_entity(entity_type, dict(record))
+        second = factory.create_entity(entity_type, dict(record))
+        # Creation timestamps differ but are not part of the ID
+        second['metadata']['created'] = 'later'
+        assert store.save_entity(entity_type, first) == store.save_entity(entity_type, second)
+        assert store.count_entities(entity_type) == 1
+
+    # A keyed type without key values falls back to its data, and says so
+    with caplog.at_level('ERROR'):
+        keyless = factory.create_entity('contract', {'amount': '5.00'})
+        assert store.save_entity('contract', keyless) == store.save_entity('contract', dict(keyless, metadata={}))
+    assert "no values for key fields key" in caplog.text
+    store.cleanup()
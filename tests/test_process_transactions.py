@@ -4,7 +4,13 @@ import os
 from pathlib import Path
 from unittest.mock import Mock, patch
 from decimal import Decimal
-from src.process_transactions import process_transactions, setup_validation, setup_entity_mediator
+import yaml
+from src.process_transactions import (
+    process_transactions, setup_validation, setup_entity_mediator,
+    get_shard_store_settings, merge_shard_stores, get_max_errors,
+    create_reference_index, store_extracted_entity, merge_shard_aggregates,
+    get_store_settings, process_input, read_records, DEFAULT_CONFIG_PATH
+)
 from src.usaspending.core.adapters import MoneyAdapter, DateAdapter, StringAdapter
 
 @pytest.fixture
@@ -45,6 +51,29 @@ def sample_config():
         }
     }
 
+@pytest.fixture
+def shipped_config(tmp_path):
+    """The shipped configuration with its outputs redirected to a temporary directory."""
+    with open(DEFAULT_CONFIG_PATH, encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    store_settings = config['entity_store']['config']
+    store_settings['path'] = str(tmp_path / 'entities')
+    store_settings['relationship_graph']['path'] = str(tmp_path / 'relationships.edges')
+    config['system']['profiling'] = {'enabled': False}
+    return config
+
+@pytest.fixture
+def sample_csv_path():
+    return str(Path(__file__).resolve().parents[1] / 'input' / 'dummy_CSV_data.csv')
+
+@pytest.fixture
+def pipeline_store(shipped_config, sample_csv_path):
+    """The entity store after running the shipped pipeline over the sample CSV."""
+    mediator = setup_entity_mediator(shipped_config, Mock())
+    assert process_input(shipped_config, mediator, sample_csv_path) == 2
+    yield mediator._store
+    mediator.cleanup()
+
 @pytest.fixture
 def sample_transactions():
     return [
@@ -81,7 +110,7 @@ def mock_validation_service():
 def test_process_transactions_basic(mock_config_provider, temp_input_file, sample_config):
     # Setup
     mock_config = Mock()
-    mock_config_provider.return_value.load_config.return_value = sample_config
+    mock_config_provider.return_value.get_config.return_value = sample_config
     
     # Update config with temp file path
     sample_config['system']['io']['input']['file'] = temp_input_file
@@ -129,7 +158,7 @@ def test_process_transactions_with_validation(tmp_path, sample_config, sample_tr
     with patch('src.process_transactions.ConfigProvider') as mock_config_provider, \
          patch('src.process_transactions.ValidationService') as mock_validation_service:
         
-        mock_config_provider.return_value.load_config.return_value = sample_config
+        mock_config_provider.return_value.get_config.return_value = sample_config
         mock_validation_service.return_value.validate_transaction.return_value = True
         
         # Execute
@@ -137,3 +166,321 @@ def test_process_transactions_with_validation(tmp_path, sample_config, sample_tr
         
         # Verify validation was performed
         mock_validation_service.return_value.validate_transaction.assert_called()
+
+def test_get_shard_store_settings():
+    config = {'entity_store': {'storage_type': 'sqlite', 'path': 'out/entities.db'}}
+    settings = get_shard_store_settings(config, 3)
+    assert settings['path'] == 'out/entities.shard0003.db'
+    assert config['entity_store']['path'] == 'out/entities.db'
+
+def test_merge_shard_stores(tmp_path):
+    from src.usaspending.entity_store import EntityStore
+    from src.usaspending.core.config import ComponentConfig
+
+    config = {
+        'entity_store': {'storage_type': 'filesystem', 'path': str(tmp_path / 'entities')},
+        'entities': {'agency': {}}
+    }
+    for index, entity in enumerate([{'code': '001'}, {'code': '002'}]):
+        shard_store = EntityStore()
+        shard_store.configure(ComponentConfig(settings=get_shard_store_settings(config, index)))
+        shard_store.save_entity('agency', entity)
+        shard_store.save_entity('transaction', {'id': str(index)})
+
+    assert merge_shard_stores(config, 2) == 4
+
+    store = EntityStore()
+    store.configure(ComponentConfig(settings=config['entity_store']))
+    assert store.count_entities('agency') == 2
+    assert store.count_entities('transaction') == 2
+    assert not (tmp_path / 'entities.shard0000').exists()
+
+def test_get_max_errors():
+    assert get_max_errors({'validation_service': {'config': {'max_errors': 100}}}) == 100
+    assert get_max_errors({'validation_service': {'max_errors': 5}}) == 5
+    assert get_max_errors({}) == 1000
+
+def test_store_extracted_entity_resolves_references():
+    entities = {
+        'recipient': {'key_fields': ['uei']},
+        'contract': {
+            'key_fields': ['contract_award_unique_key'],
+            'field_mappings': {'reference': {'recipient_ref': {'entity': 'recipient', 'key_field': 'recipient_uei'}}}
+        }
+    }
+    assert create_reference_index({'entities': entities}) is None
+    references = create_reference_index({
+        'entities': entities,
+        'entity_store': {'config': {'reference_index': {'enabled': True, 'max_memory_keys': 10}}}
+    })
+    mediator = Mock()
+    mediator.process_mapped_entity.side_effect = ['r1', 'c1']
+
+    store_extracted_entity(mediator, references, 'recipient', {'uei': 'U1'})
+    contract = {'contract_award_unique_key': 'C1', 'recipient_ref': {'entity': 'recipient', 'key': {'uei': 'U1'}}}
+    assert store_extracted_entity(mediator, references, 'contract', contract) == 'c1'
+    assert contract['recipient_ref']['entity_id'] == 'r1'
+    assert references.get_stats()['keys'] == 2
+    references.close()
+
+def test_merge_shard_aggregates_updates_contracts(tmp_path):
+    from src.usaspending.entity_store import EntityStore
+    from src.usaspending.core.config import ComponentConfig
+    from src.usaspending.core.aggregation import RelationshipAggregator
+
+    config = {
+        'entity_store': {'storage_type': 'filesystem', 'path': str(tmp_path / 'entities')},
+        'entities': {
+            'contract': {'key_fields': ['contract_award_unique_key']},
+            'transaction': {'field_mappings': {'reference': {'contract_ref': {
+                'entity': 'contract', 'key_field': 'contract_award_unique_key',
+                'relationship': 'transaction_to_contract'
+            }}}}
+        },
+        'relationships': [{
+            'id': 'transaction_to_contract', 'sourceEntity': 'transaction', 'targetEntity': 'contract',
+            'aggregations': {'target_field': 'totals', 'fields': {'count': {'function': 'count'}}}
+        }]
+    }
+    store = EntityStore()
+    store.configure(ComponentConfig(settings=dict(config['entity_store'], entities=config['entities'])))
+    contract_id = store.save_entity('contract', {'type': 'contract', 'data': {'contract_award_unique_key': 'C1'}})
+    transaction = {'contract_ref': {'entity': 'contract', 'key': {'contract_award_unique_key': 'C1'}}}
+    for shard_index in range(2):
+        aggregator = RelationshipAggregator.from_config(config)[0]
+        aggregator.add(transaction)
+        aggregator.save(f"{get_shard_store_settings(config, shard_index)['path']}.transaction_to_contract.aggregates")
+
+    merge_shard_aggregates(config, 2)
+
+    assert store.get_entity('contract', contract_id)['data']['totals'] == {'count': 2}
+    assert not list(tmp_path.glob('*.aggregates'))
+
+def test_shipped_config_uses_segmented_store(shipped_config, tmp_path):
+    from src.usaspending.entity_store import EntityStore
+    from src.usaspending.core.config import ComponentConfig
+    from src.usaspending.core.storage import SegmentedFileStorage
+
+    settings = get_store_settings(shipped_config)
+    assert settings['storage_type'] == 'segmented'
+    assert 'contract' in settings['entities']
+
+    store = EntityStore()
+    store.configure(ComponentConfig(settings=settings))
+    assert isinstance(store._storage, SegmentedFileStorage)
+    assert store._storage.compact_ratio == 0.5
+    store.cleanup()
+
+    shard_settings = get_shard_store_settings(shipped_config, 1)
+    assert shard_settings['storage_type'] == 'segmented'
+    assert shard_settings['path'] == str(tmp_path / 'entities.shard0001')
+
+def test_shipped_config_deduplicates_reference_entities(shipped_config):
+    # The pipeline's own import of the class
+    from src.process_transactions import DeduplicatingEntityStore
+
+    mediator = setup_entity_mediator(shipped_config, Mock())
+    try:
+        assert isinstance(mediator._store, DeduplicatingEntityStore)
+        assert mediator._store._entity_types == {'agency', 'recipient', 'location'}
+    finally:
+        mediator.cleanup()
+
+def test_pipeline_stores_mapped_fields(pipeline_store):
+    contracts = list(pipeline_store.list_entities('contract'))
+    assert len(contracts) == 2
+    contract = contracts[0]['data']
+    assert contract['contract_award_unique_key'].startswith('CONT_AWD_')
+    assert contract['piid'] == contract['award_id_piid']
+    assert contract['description']
+
+    recipient = next(pipeline_store.list_entities('recipient'))['data']
+    assert recipient['uei'] and recipient['name']
+
+    agency = next(pipeline_store.list_entities('agency'))['data']
+    assert agency['agency_code'] == '015'
+    assert agency['agency_name'] == 'Department of Justice'
+
+    location = next(pipeline_store.list_entities('location'))['data']
+    assert location['address']['line1']
+
+def test_pipeline_persists_contract_aggregates(pipeline_store):
+    contracts = list(pipeline_store.list_entities('contract'))
+    assert len(contracts) == 2
+    for contract in contracts:
+        assert contract['data']['transaction_totals'] == {
+            'total_obligation': '0.00',
+            'transaction_count': 1,
+            'first_action_date': '2024-09-30',
+            'last_action_date': '2024-09-30'
+        }
+
+def test_pipeline_edges_traverse_to_stored_entities(pipeline_store, shipped_config):
+    from src.usaspending.core.entity_ids import EntityIdGenerator
+    from src.usaspending.core.relationships import EdgeStore
+
+    edges = EdgeStore()
+    edges.load(shipped_config['entity_store']['config']['relationship_graph']['path'])
+    id_generator = EntityIdGenerator.from_config(shipped_config['entities'])
+
+    def stored_ids(entity_type):
+        return {id_generator.generate(entity_type, entity) for entity in pipeline_store.list_entities(entity_type)}
+
+    contract_ids = stored_ids('contract')
+    transaction_ids = set()
+    for contract_id in contract_ids:
+        assert pipeline_store.get_entity('contract', contract_id) is not None
+        transactions = edges.traverse(contract_id, [('transaction_to_contract', 'incoming')])
+        assert len(transactions) == 1
+        transaction_ids.update(transactions)
+        recipients = edges.traverse(contract_id, [('recipient_to_contract', 'incoming')])
+        assert len(recipients) == 1 and set(recipients) <= stored_ids('recipient')
+    assert transaction_ids == stored_ids('transaction')
+
+def test_pipeline_stores_entities_in_scheduled_stages(shipped_config, sample_csv_path):
+    import threading
+    import src.process_transactions as pipeline
+
+    threads = {}
+    store_entity_stage = pipeline.store_entity_stage
+
+    def record_thread(entity_mediator, references, entity_type, batches, **kwargs):
+        threads.setdefault(entity_type, set()).add(threading.current_thread().name)
+        return store_entity_stage(entity_mediator, references, entity_type, batches, **kwargs)
+
+    mediator = setup_entity_mediator(shipped_config, Mock())
+    try:
+        with patch.object(pipeline, 'store_entity_stage', record_thread):
+            assert process_input(shipped_config, mediator, sample_csv_path) == 2
+    finally:
+        mediator.cleanup()
+
+    assert set(threads) == set(pipeline.create_scheduler(shipped_config).order)
+    for entity_type, names in threads.items():
+        assert all(name.startswith(f"stage-{entity_type}") for name in names)
+
+def test_shipped_config_stores_repeated_ids_in_row_order(shipped_config):
+    import src.process_transactions as pipeline
+
+    scheduler = pipeline.create_scheduler(shipped_config)
+    workers = {name: scheduler.get_stage(name).max_workers for name in scheduler.order}
+    # Only transactions, one row per ID, may finish chunks out of order
+    assert workers.pop('transaction') > 1
+    assert set(workers.values()) == {1}
+
+def test_process_transactions_with_workers(shipped_config, sample_csv_path, tmp_path):
+    from src.usaspending.entity_store import EntityStore
+    from src.usaspending.core.config import ComponentConfig
+
+    config_path = tmp_path / 'config.yaml'
+    with open(config_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(shipped_config, f)
+
+    process_transactions(str(config_path), sample_csv_path, workers=2)
+
+    store = EntityStore()
+    store.configure(ComponentConfig(settings=get_store_settings(shipped_config)))
+    try:
+        assert store.count_entities('transaction') == 2
+        for contract in store.list_entities('contract'):
+            assert contract['data']['transaction_totals']['transaction_count'] == 1
+    finally:
+        store.cleanup()
+    assert not list(tmp_path.glob('*.shard*'))
+
+def test_shipped_config_resolves_references(shipped_config, sample_csv_path, tmp_path):
+    import csv
+
+    with open(sample_csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        header, rows = reader.fieldnames, list(reader)
+    # A transaction of the second row's parent recipient, performed elsewhere
+    # than its recipient's address and funded by another agency
+    parent = dict(rows[1])
+    parent.update({
+        'contract_transaction_unique_key': 'PARENT_TRANSACTION_0',
+        'contract_award_unique_key': 'CONT_AWD_PARENT',
+        'award_id_piid': 'PARENT',
+        'recipient_uei': rows[1]['recipient_parent_uei'],
+        'recipient_name': rows[1]['recipient_parent_name'],
+        'recipient_address_line_1': '942 S SHADY GROVE RD',
+        'primary_place_of_performance_city_name': 'NASHVILLE',
+        'primary_place_of_performance_county_name': 'DAVIDSON',
+        'primary_place_of_performance_zip_4': '372031234',
+        'funding_agency_code': '047',
+        'funding_agency_name': 'General Services Administration',
+        'funding_sub_agency_code': '4732',
+        'funding_office_code': '47QTCA',
+    })
+    input_path = tmp_path / 'transactions.csv'
+    with open(input_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows + [parent])
+
+    summary = {}
+    mediator = setup_entity_mediator(shipped_config, Mock())
+    try:
+        assert process_input(shipped_config, mediator, str(input_path), summary=summary) == 3
+        store = mediator._store
+        locations = [entity['data'] for entity in store.list_entities('location')]
+        agencies = [entity['data'] for entity in store.list_entities('agency')]
+        # The second row's parent is stored after it, so its ID is written back late
+        targets = {}
+        for entity in store.list_entities('recipient'):
+            recipient = entity['data']
+            for field in ('parent_ref', 'location_ref'):
+                reference = recipient[field]
+                target = store.get_entity(reference['entity'], reference['entity_id'])
+                targets[(recipient['uei'], field)] = target['data']
+    finally:
+        mediator.cleanup()
+
+    assert summary['unresolved_references']['total'] == 0, summary['unresolved_references']
+    # Three recipient addresses and three places of performance
+    assert len(locations) == 6
+    assert sum('address_line_1' in location for location in locations) == 3
+    assert {'NASHVILLE', 'MEMPHIS', 'MCLEAN'} == {location['city_name'] for location in locations}
+    assert {(agency['agency_code'], agency['sub_agency_code']) for agency in agencies} >= {('015', '1501'), ('047', '4732')}
+    assert targets[(rows[1]['recipient_uei'], 'parent_ref')]['uei'] == parent['recipient_uei']
+    assert targets[(parent['recipient_uei'], 'location_ref')]['address_line_1'] == '942 S SHADY GROVE RD'
+
+def test_profiling_samples_pipeline_stages(shipped_config, sample_csv_path):
+    shipped_config['system']['profiling'] = {'enabled': True, 'sample_rate': 1}
+    mediator = setup_entity_mediator(shipped_config, Mock())
+    with patch('src.process_transactions.stop_profiling') as stop_profiling:
+        assert process_input(shipped_config, mediator, sample_csv_path) == 2
+    mediator.cleanup()
+
+    report = stop_profiling.call_args[0][0].report()
+    assert set(report) == {'map', 'validate', 'create', 'save'}
+    # Every record is mapped once
+    assert report['map']['calls'] == 2
+
+def test_read_records_applies_field_transformations(shipped_config, sample_csv_path, tmp_path):
+    import csv
+
+    with open(sample_csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        header, rows = reader.fieldnames, list(reader)
+    rows[0].update(federal_action_obligation='$1,234.50', recipient_uei='unxeyqn41m87')
+    rows[1].update(action_date='N/A', action_type='UNKNOWN ACTION', recipient_uei='')
+    input_path = tmp_path / 'transactions.csv'
+    with open(input_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    summary = {}
+    records = list(read_records(shipped_config, str(input_path), summary=summary))
+
+    assert records[0]['federal_action_obligation'] == Decimal('1234.50')
+    assert records[0]['recipient_uei'] == 'UNXEYQN41M87'
+    assert records[0]['recipient_zip_4_code'] == '22102-4200'
+    # Values that fail to transform are kept and counted
+    assert records[1]['action_date'] == 'N/A'
+    assert summary['transformation_errors'] == {'action_date': 1}
+    # Records that fail field validation are kept and counted per rule
+    assert len(records) == len(rows)
+    assert summary['validation_failures'] == {'action_type.enum': 1}
+    assert summary['invalid_records'] == 1
@@ -82,3 +82,71 @@ def test_get_relationship_path(relationship_manager):
     assert len(path) == 2
     assert path[0].target_entity == 'vendor'
     assert path[1].target_entity == 'address'
+
+@pytest.fixture
+def edge_store():
+    from src.usaspending.core.relationships import EdgeStore
+    config = {
+        'relationships': [
+            {'id': 'recipient_to_parent', 'sourceEntity': 'recipient', 'targetEntity': 'recipient'},
+            {'id': 'recipient_to_contract', 'sourceEntity': 'recipient', 'targetEntity': 'contract'},
+            {'id': 'transaction_to_contract', 'sourceEntity': 'transaction', 'targetEntity': 'contract'},
+            {'id': 'contract_to_awarding_agency', 'sourceEntity': 'contract', 'targetEntity': 'agency'}
+        ],
+        'entities': {
+            'recipient': {'field_mappings': {'reference': {
+                'parent_ref': {'entity': 'recipient', 'relationship': 'recipient_to_parent'}}}},
+            'contract': {'field_mappings': {
+                'reference': {'recipient_ref': {'entity': 'recipient', 'relationship': 'recipient_to_contract'}},
+                'template': {'agencies': {'entity': 'agency', 'relationships': {'awarding': 'contract_to_awarding_agency'}}}
+            }},
+            'transaction': {'field_mappings': {'reference': {
+                'contract_ref': {'entity': 'contract', 'relationship': 'transaction_to_contract'}}}}
+        }
+    }
+    return EdgeStore.from_config(config)
+
+def test_edge_store_traversal(edge_store):
+    """Test edges are oriented by relationship definitions and traversed by id."""
+    edge_store.add_entity_edges('recipient', 'child', {'parent_ref': {'key': {}, 'entity_id': 'parent'}})
+    edge_store.add_entity_edges('contract', 'c1', {
+        'recipient_ref': {'key': {}, 'entity_id': 'child'},
+        'agencies': {'awarding': {'ref': '097', 'ref_id': 'a0', 'office_ref': '097:1700:N001', 'office_ref_id': 'a1'}}
+    })
+    for index in range(3):
+        edge_store.add_entity_edges('transaction', f"t{index}", {'contract_ref': {'key': {}, 'entity_id': 'c1'}})
+        # Repeated edges are stored once
+        edge_store.add_entity_edges('transaction', f"t{index}", {'contract_ref': {'key': {}, 'entity_id': 'c1'}})
+
+    assert edge_store.count_edges('transaction_to_contract') == 3
+    assert edge_store.get_related_entities('c1', 'transaction_to_contract', 'incoming') == ['t0', 't1', 't2']
+    assert edge_store.get_related_entities('child', 'recipient_to_contract', 'outgoing') == ['c1']
+    assert edge_store.get_related_entities('c1', 'contract_to_awarding_agency') == ['a1']
+    assert edge_store.get_related_entities('parent', depth=2) == ['child', 'c1']
+    assert edge_store.traverse('parent', [('recipient_to_parent', 'incoming'),
+                                          ('recipient_to_contract', 'outgoing')]) == ['c1']
+    assert edge_store.get_related_entities('unknown') == []
+
+def test_edge_store_late_references_and_persistence(edge_store, tmp_path):
+    from src.usaspending.core.relationships import EdgeStore
+    from src.usaspending.core.reference_index import ResolvedReference
+
+    assert edge_store.add_resolved(ResolvedReference('contract', 'c1', 'recipient_ref', 'recipient', 'r1'))
+    assert edge_store.add_resolved(ResolvedReference('contract', 'c1', 'agencies.awarding', 'agency', 'a1'))
+    assert not edge_store.add_resolved(ResolvedReference('contract', 'c1', 'other_ref', 'recipient', 'r1'))
+
+    path = str(tmp_path / 'graph' / 'relationships.edges')
+    edge_store.save(path)
+    loaded = EdgeStore()
+    assert loaded.load(path) == 2
+    assert loaded.get_related_entities('r1', 'recipient_to_contract', 'outgoing') == ['c1']
+    assert loaded.get_related_entities('c1', 'contract_to_awarding_agency', 'outgoing') == ['a1']
+
+def test_edge_store_load_truncated_header(tmp_path):
+    from src.usaspending.core.relationships import EdgeStore, _EDGE_FILE_MAGIC
+    from src.usaspending.core.exceptions import StorageError
+
+    path = tmp_path / 'truncated.edges'
+    path.write_bytes(_EDGE_FILE_MAGIC + b'\x01\x00')
+    with pytest.raises(StorageError):
+        EdgeStore().load(str(path))
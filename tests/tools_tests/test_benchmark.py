@@ -0,0 +1,126 @@
+"""Tests for the ingestion benchmark and synthetic data generator."""
+
+import csv
+import json
+
+import pytest
+
+from tools.benchmark import (
+    IngestionBenchmark,
+    SyntheticProfile,
+    generate_synthetic_csv,
+    read_template,
+    STAGES
+)
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        return list(reader.fieldnames), list(reader)
+
+def test_synthetic_csv_matches_contract_header(tmp_path):
+    """Synthetic files use the real header and realistic cardinalities."""
+    path = tmp_path / "synthetic.csv"
+    profile = SyntheticProfile(rows=400, agencies=5, locations=50, dirty_rate=0.0, seed=1)
+
+    assert generate_synthetic_csv(path, profile) == 400
+
+    header, rows = read_rows(path)
+    assert header == read_template()[0]
+    assert len(rows) == 400
+    assert len({row['contract_transaction_unique_key'] for row in rows}) == 400
+    assert len({row['contract_award_unique_key'] for row in rows}) <= 100
+    assert len({row['awarding_agency_code'] for row in rows}) <= 5
+    assert len({row['recipient_uei'] for row in rows}) <= 40
+    assert all(row['action_date'].startswith(('2023-1', '2024-')) for row in rows)
+
+    # Contracts keep their recipient across modifications
+    recipients = {}
+    for row in rows:
+        assert recipients.setdefault(row['contract_award_unique_key'], row['recipient_uei']) == row['recipient_uei']
+
+def test_synthetic_csv_is_reproducible_and_dirty(tmp_path):
+    """Same seed gives the same file; dirty rows carry data quality problems."""
+    profile = SyntheticProfile(rows=300, dirty_rate=1.0, seed=7)
+    generate_synthetic_csv(tmp_path / "a.csv", profile)
+    generate_synthetic_csv(tmp_path / "b.csv", profile)
+
+    assert (tmp_path / "a.csv").read_bytes() == (tmp_path / "b.csv").read_bytes()
+    _, rows = read_rows(tmp_path / "a.csv")
+    assert any(row['recipient_uei'] == '' for row in rows)
+    assert any(row['federal_action_obligation'].startswith('$') for row in rows)
+    assert any(row['recipient_name'] != row['recipient_name'].strip() for row in rows)
+
+def test_benchmark_writes_performance_report(tmp_path):
+    """A benchmark run records pipeline and stage metrics with history."""
+    benchmark = IngestionBenchmark(work_dir=tmp_path / "work", output_dir=tmp_path / "results")
+
+    report = benchmark.run(SyntheticProfile(rows=200, seed=3))
+
+    summary = report['summary']
+    assert summary['input']['rows']['avg'] == 200
+    assert summary['pipeline']['rows_per_second']['avg'] > 0
+    assert summary['pipeline']['peak_rss_mb']['avg'] > 0
+    assert summary['pipeline']['stored']['avg'] > 0
+    assert summary['pipeline']['errors']['avg'] == 0
+    # Only parent recipients that never receive an award stay unresolved
+    assert summary['pipeline']['unresolved_references']['avg'] <= 0.01 * summary['pipeline']['stored']['avg']
+    assert report['pipeline']['valid'] is True, report['pipeline']['problems']
+    assert report['pipeline']['entry_point'] == 'process_transactions.process_transactions'
+    for stage in STAGES:
+        assert f"{stage}_seconds" in summary['stages']
+    assert (tmp_path / "results" / "performance_report.json").exists()
+    assert not (tmp_path / "work").exists()
+
+    benchmark.run(SyntheticProfile(rows=50, seed=4), stages=False)
+    history = json.loads((tmp_path / "results" / "benchmark_history.json").read_text())
+    assert [run['rows'] for run in history['runs']] == [200, 50]
+    assert history['runs'][-1]['valid'] is True
+
+def test_invalid_pipeline_run_records_no_throughput(tmp_path, monkeypatch):
+    """A run that stores nothing is flagged instead of reporting throughput."""
+    import process_transactions
+    monkeypatch.setattr(process_transactions, 'process_input', lambda config, mediator, path, summary: 100)
+    benchmark = IngestionBenchmark(work_dir=tmp_path / "work", output_dir=tmp_path / "results")
+
+    report = benchmark.run(SyntheticProfile(rows=100, seed=5), stages=False)
+
+    assert report['pipeline']['valid'] is False
+    assert report['pipeline']['problems'] == ["no entities stored from 100 rows"]
+    assert report['summary']['pipeline']['valid']['avg'] == 0
+    assert 'rows_per_second' not in report['summary']['pipeline']
+
+    strict = IngestionBenchmark(work_dir=tmp_path / "strict", output_dir=tmp_path / "results", strict=True)
+    with pytest.raises(RuntimeError, match="no entities stored"):
+        strict.run(SyntheticProfile(rows=100, seed=5), stages=False)
+
+def test_failed_pipeline_run_is_invalid(tmp_path, monkeypatch):
+    """process_transactions logs failures; the benchmark flags the run."""
+    import process_transactions
+
+    def fail(config, mediator, path, summary):
+        raise ValueError("unreadable input")
+    monkeypatch.setattr(process_transactions, 'process_input', fail)
+    benchmark = IngestionBenchmark(work_dir=tmp_path / "work", output_dir=tmp_path / "results")
+
+    report = benchmark.run(SyntheticProfile(rows=20, seed=6), stages=False)
+
+    assert report['pipeline']['valid'] is False
+    assert report['pipeline']['problems'] == ["process_transactions failed, see the log"]
+
+def test_pipeline_output_checks(tmp_path):
+    """Unresolved references and aggregates without a target invalidate a run."""
+    benchmark = IngestionBenchmark(work_dir=tmp_path / "work", output_dir=tmp_path / "results")
+    config = benchmark.load_config('check')
+    summary = {
+        'aggregates': {'transaction_to_contract': {'updated': 0, 'unresolved': 100}},
+        'unresolved_references': {'total': 5, 'counts': {'contract.recipient_ref': 5}}
+    }
+
+    assert benchmark.check_pipeline_output(config, 100, {'stored': 400}, summary) == [
+        "100 of 100 transaction_to_contract aggregates have no stored target",
+        "5 unresolved references: {'contract.recipient_ref': 5}"
+    ]
+    summary['aggregates']['transaction_to_contract'] = {'updated': 100, 'unresolved': 0}
+    benchmark.max_unresolved_ratio = 0.05
+    assert benchmark.check_pipeline_output(config, 100, {'stored': 400}, summary) == []
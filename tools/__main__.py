@@ -14,6 +14,7 @@ from . import (
     FunctionalCoverageAnalyzer,
     DashboardGenerator
 )
+from .benchmark import IngestionBenchmark
 
 def main():
     """Run the requested tool."""
@@ -25,7 +26,8 @@ def main():
         'run_tests',
         'gap_analysis',
         'functional_analysis',
-        'generate_dashboard'
+        'generate_dashboard',
+        'benchmark'
     ], help='The tool to run')
     parser.add_argument('--output', help='Optional output file override')
     args = parser.parse_args()
@@ -48,6 +50,10 @@ def main():
         elif args.tool == 'generate_dashboard':
             dashboard = DashboardGenerator()
             dashboard.generate_dashboard()
+        elif args.tool == 'benchmark':
+            benchmark = IngestionBenchmark(output_dir=Path(args.output) if args.output else None)
+            if not benchmark.run()['pipeline']['valid']:
+                return 1
         return 0
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
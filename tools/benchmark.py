@@ -0,0 +1,560 @@
+"""End-to-end ingestion benchmarks on synthetic FPDS contract data.
+
+``generate_synthetic_csv`` writes contract transaction files with the real
+USASpending header and realistic cardinalities: a few dozen agencies, a
+recipient per ten rows, a few hundred places of performance and several
+modifications per contract, with a configurable share of dirty values.
+``IngestionBenchmark`` runs the full pipeline and each stage in isolation
+over such a file and records rows per second, peak RSS and per-stage
+latency in the performance report, with a run history for regression
+tracking.
+
+The pipeline benchmark runs the ``process_transactions()`` entry point on a
+copy of the configuration whose outputs are redirected to the work
+directory, so configuration loading and component setup are measured with
+the processing. A run is marked invalid, and its throughput not recorded,
+when it fails, stores no entities, reports entity errors, stores entities without key
+values, leaves aggregates without a stored target or leaves more than
+``max_unresolved_ratio`` unresolved references per stored entity.
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import string
+import argparse
+import datetime
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Callable, cast
+
+import yaml
+
+from .common import DirectoryHelper, FileHelper
+from .reports import PerformanceReportGenerator
+
+SRC_DIR = DirectoryHelper.get_project_root() / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+TEMPLATE_CSV = DirectoryHelper.get_project_root() / 'input' / 'dummy_CSV_data.csv'
+DEFAULT_CONFIG = DirectoryHelper.get_project_root() / 'conversion_config.yaml'
+HISTORY_FILE = 'benchmark_history.json'
+MAX_HISTORY = 30
+
+STAGES = ('read', 'extract', 'resolve', 'store')
+DEFAULT_MAX_UNRESOLVED_RATIO = 0.01
+
+STATES = [
+    ('VA', 'VIRGINIA', '51', ['MCLEAN', 'ARLINGTON', 'RESTON', 'NORFOLK'], ['FAIRFAX', 'ARLINGTON', 'NORFOLK CITY']),
+    ('MD', 'MARYLAND', '24', ['BETHESDA', 'ROCKVILLE', 'BALTIMORE'], ['MONTGOMERY', 'BALTIMORE CITY']),
+    ('DC', 'DISTRICT OF COLUMBIA', '11', ['WASHINGTON'], ['DISTRICT OF COLUMBIA']),
+    ('CA', 'CALIFORNIA', '06', ['SAN DIEGO', 'LOS ANGELES', 'SUNNYVALE'], ['SAN DIEGO', 'LOS ANGELES', 'SANTA CLARA']),
+    ('TX', 'TEXAS', '48', ['SAN ANTONIO', 'HOUSTON', 'FORT WORTH'], ['BEXAR', 'HARRIS', 'TARRANT']),
+    ('FL', 'FLORIDA', '12', ['ORLANDO', 'TAMPA', 'JACKSONVILLE'], ['ORANGE', 'HILLSBOROUGH', 'DUVAL']),
+    ('CO', 'COLORADO', '08', ['COLORADO SPRINGS', 'DENVER'], ['EL PASO', 'DENVER']),
+    ('AL', 'ALABAMA', '01', ['HUNTSVILLE', 'MOBILE'], ['MADISON', 'MOBILE']),
+    ('WA', 'WASHINGTON', '53', ['SEATTLE', 'TACOMA'], ['KING', 'PIERCE']),
+    ('OH', 'OHIO', '39', ['DAYTON', 'COLUMBUS'], ['MONTGOMERY', 'FRANKLIN']),
+]
+
+NAICS = [
+    ('541519', 'OTHER COMPUTER RELATED SERVICES'),
+    ('541512', 'COMPUTER SYSTEMS DESIGN SERVICES'),
+    ('541330', 'ENGINEERING SERVICES'),
+    ('541611', 'ADMINISTRATIVE MANAGEMENT AND GENERAL MANAGEMENT CONSULTING SERVICES'),
+    ('236220', 'COMMERCIAL AND INSTITUTIONAL BUILDING CONSTRUCTION'),
+    ('336411', 'AIRCRAFT MANUFACTURING'),
+    ('561210', 'FACILITIES SUPPORT SERVICES'),
+    ('325412', 'PHARMACEUTICAL PREPARATION MANUFACTURING'),
+    ('488190', 'OTHER SUPPORT ACTIVITIES FOR AIR TRANSPORTATION'),
+    ('611430', 'PROFESSIONAL AND MANAGEMENT DEVELOPMENT TRAINING'),
+]
+
+NAME_WORDS = ['ADVANCED', 'FEDERAL', 'SYSTEMS', 'SOLUTIONS', 'TECHNOLOGIES', 'GROUP', 'ANALYTICS',
+              'DEFENSE', 'HEALTH', 'GLOBAL', 'ENGINEERING', 'SERVICES', 'LOGISTICS', 'PARTNERS']
+NAME_SUFFIXES = ['INC.', 'LLC', 'CORPORATION', 'CO.', 'LLP']
+
+@dataclass
+class SyntheticProfile:
+    """Size and shape of a synthetic contract transaction file."""
+    rows: int = 10000
+    transactions_per_contract: float = 4.0
+    agencies: int = 25
+    sub_agencies_per_agency: int = 3
+    offices_per_sub_agency: int = 4
+    recipients: Optional[int] = None  # defaults to one per ten rows
+    locations: int = 500
+    dirty_rate: float = 0.02  # share of rows with one dirty value
+    fiscal_year: int = 2024
+    seed: int = 0
+
+def read_template(template_path: Path = TEMPLATE_CSV) -> Tuple[List[str], Dict[str, str]]:
+    """Read the header and first row of a USASpending contracts file."""
+    with open(template_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        row = next(reader)
+        return list(reader.fieldnames or []), dict(row)
+
+def _code(rng: random.Random, length: int, alphabet: str = string.ascii_uppercase + string.digits) -> str:
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+class _SyntheticData:
+    """Reference data pools and contracts rows are drawn from."""
+
+    def __init__(self, profile: SyntheticProfile):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.locations = [self._location() for _ in range(max(1, profile.locations))]
+        self.offices = self._offices()
+        recipient_count = profile.recipients or max(1, profile.rows // 10)
+        self.recipients = [self._recipient() for _ in range(recipient_count)]
+        # A tenth of recipients are subsidiaries of a parent recipient
+        for recipient in self.recipients:
+            parent = self.rng.choice(self.recipients) if self.rng.random() < 0.1 else recipient
+            recipient['parent_uei'] = parent['uei']
+            recipient['parent_name'] = parent['name']
+        contract_count = max(1, round(profile.rows / profile.transactions_per_contract))
+        self.contracts = [self._contract() for _ in range(contract_count)]
+        start = datetime.date(profile.fiscal_year - 1, 10, 1)
+        self.dates = [start + datetime.timedelta(days=day) for day in range(365)]
+
+    def _location(self) -> Dict[str, str]:
+        rng = self.rng
+        state_code, state_name, fips, cities, counties = rng.choice(STATES)
+        zip_code = f"{rng.randint(10000, 99999)}"
+        return {
+            'state_code': state_code, 'state_name': state_name, 'state_fips': fips,
+            'city_name': rng.choice(cities), 'county_name': rng.choice(counties),
+            'zip_code': zip_code, 'zip_4': f"{zip_code}{rng.randint(0, 9999):04d}",
+            'address_line_1': f"{rng.randint(1, 9999)} {rng.choice(NAME_WORDS)} {rng.choice(['BLVD', 'ST', 'AVE', 'DR'])}",
+            'district': f"{state_code}-{rng.randint(1, 12):02d}",
+        }
+
+    def _offices(self) -> List[Dict[str, str]]:
+        rng = self.rng
+        offices = []
+        for agency_index in range(self.profile.agencies):
+            agency_code = f"{agency_index * 3 + 12:03d}"
+            agency_name = f"Department of {rng.choice(NAME_WORDS).title()} {agency_index}"
+            for sub_index in range(self.profile.sub_agencies_per_agency):
+                sub_code = f"{agency_code[-2:]}{sub_index:02d}"
+                sub_name = f"{rng.choice(NAME_WORDS).title()} Administration {sub_code}"
+                for _ in range(self.profile.offices_per_sub_agency):
+                    office_code = f"{agency_code[-2:]}{_code(rng, 4, string.ascii_uppercase)}"
+                    offices.append({
+                        'agency_code': agency_code, 'agency_name': agency_name,
+                        'sub_agency_code': sub_code, 'sub_agency_name': sub_name,
+                        'office_code': office_code, 'office_name': f"{sub_name.upper()} OFFICE {office_code}",
+                    })
+        return offices
+
+    def _recipient(self) -> Dict[str, Any]:
+        rng = self.rng
+        words = rng.sample(NAME_WORDS, 2)
+        return {
+            'uei': _code(rng, 12),
+            'name': f"{words[0]} {words[1]} {rng.choice(NAME_SUFFIXES)}",
+            'location': rng.choice(self.locations),
+            'phone': f"{rng.randint(2000000000, 9999999999)}",
+        }
+
+    def _contract(self) -> Dict[str, Any]:
+        rng = self.rng
+        awarding = rng.choice(self.offices)
+        # Most contracts are funded by the awarding office
+        funding = awarding if rng.random() < 0.8 else rng.choice(self.offices)
+        piid = f"{awarding['office_code']}{self.profile.fiscal_year % 100}{_code(rng, 1, 'CDFP')}{rng.randint(0, 99999999):08d}"
+        naics = rng.choice(NAICS)
+        return {
+            'piid': piid,
+            'key': f"CONT_AWD_{piid}_{awarding['sub_agency_code']}_-NONE-_-NONE-",
+            'awarding': awarding, 'funding': funding,
+            'recipient': rng.choice(self.recipients),
+            'place': rng.choice(self.locations),
+            'naics_code': naics[0], 'naics_description': naics[1],
+            'modifications': 0,
+        }
+
+    def row(self, template: Dict[str, str]) -> Dict[str, str]:
+        """Build the next transaction row over a template row."""
+        rng = self.rng
+        contract = rng.choice(self.contracts)
+        modification = contract['modifications']
+        contract['modifications'] += 1
+        modification_number = '0' if modification == 0 else f"P{modification:05d}"
+        obligation = round(rng.lognormvariate(9, 2), 2)
+        if modification and rng.random() < 0.1:
+            obligation = -obligation  # deobligation
+        awarding, funding = contract['awarding'], contract['funding']
+        recipient, place = contract['recipient'], contract['place']
+        home = recipient['location']
+
+        row = dict(template)
+        row.update({
+            'contract_transaction_unique_key':
+                f"{awarding['sub_agency_code']}_-NONE-_{contract['piid']}_{modification_number}_-NONE-_0",
+            'contract_award_unique_key': contract['key'],
+            'award_id_piid': contract['piid'],
+            'modification_number': modification_number,
+            'federal_action_obligation': f"{obligation:.2f}",
+            'action_date': rng.choice(self.dates).isoformat(),
+            'naics_code': contract['naics_code'],
+            'naics_description': contract['naics_description'],
+            'recipient_uei': recipient['uei'],
+            'recipient_name': recipient['name'],
+            'recipient_name_raw': recipient['name'],
+            'recipient_parent_uei': recipient['parent_uei'],
+            'recipient_parent_name': recipient['parent_name'],
+            'recipient_parent_name_raw': recipient['parent_name'],
+            'recipient_phone_number': recipient['phone'],
+            'recipient_address_line_1': home['address_line_1'],
+            'recipient_address_line_2': '',
+            'recipient_city_name': home['city_name'],
+            'recipient_county_name': home['county_name'],
+            'recipient_state_code': home['state_code'],
+            'recipient_state_name': home['state_name'],
+            'recipient_zip_4_code': home['zip_4'],
+            'prime_award_transaction_recipient_state_fips_code': home['state_fips'],
+            'prime_award_transaction_recipient_cd_current': home['district'],
+            'primary_place_of_performance_city_name': place['city_name'],
+            'primary_place_of_performance_county_name': place['county_name'],
+            'primary_place_of_performance_state_code': place['state_code'],
+            'primary_place_of_performance_state_name': place['state_name'],
+            'primary_place_of_performance_zip_4': place['zip_4'],
+            'prime_award_transaction_place_of_performance_state_fips_code': place['state_fips'],
+            'prime_award_transaction_place_of_performance_cd_current': place['district'],
+        })
+        for prefix, office in (('awarding', awarding), ('funding', funding)):
+            for field_name in ('agency_code', 'agency_name', 'sub_agency_code', 'sub_agency_name',
+                               'office_code', 'office_name'):
+                row[f"{prefix}_{field_name}"] = office[field_name]
+        if rng.random() < self.profile.dirty_rate:
+            rng.choice(DIRTY_VALUES)(row, rng)
+        return row
+
+def _padded_name(row: Dict[str, str], rng: random.Random) -> None:
+    row['recipient_name'] = f"  {row['recipient_name']} "
+
+def _lowercase_name(row: Dict[str, str], rng: random.Random) -> None:
+    row['recipient_name'] = row['recipient_name'].lower()
+
+def _formatted_money(row: Dict[str, str], rng: random.Random) -> None:
+    row['federal_action_obligation'] = f"${float(row['federal_action_obligation']):,.2f}"
+
+def _missing_uei(row: Dict[str, str], rng: random.Random) -> None:
+    row['recipient_uei'] = ''
+
+def _invalid_date(row: Dict[str, str], rng: random.Random) -> None:
+    row['action_date'] = rng.choice(['2024-02-30', '09/31/2024', 'N/A'])
+
+def _invalid_zip(row: Dict[str, str], rng: random.Random) -> None:
+    row['recipient_zip_4_code'] = _code(rng, 5, string.ascii_uppercase)
+
+# Data quality problems seen in FPDS extracts; a dirty row gets one of them
+DIRTY_VALUES: List[Callable[[Dict[str, str], random.Random], None]] = [
+    _padded_name, _lowercase_name, _formatted_money, _missing_uei, _invalid_date, _invalid_zip
+]
+
+def generate_synthetic_csv(output_path: Path, profile: Optional[SyntheticProfile] = None,
+                           template_path: Path = TEMPLATE_CSV) -> int:
+    """Write a synthetic contract transactions CSV.
+
+    Every column of the template file is written; columns the generator
+    does not vary keep the template's value.
+
+    Returns:
+        Number of rows written
+    """
+    profile = profile or SyntheticProfile()
+    header, template = read_template(template_path)
+    data = _SyntheticData(profile)
+    DirectoryHelper.ensure_dir(Path(output_path).parent)
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=header, restval='', extrasaction='ignore')
+        writer.writeheader()
+        for _ in range(profile.rows):
+            writer.writerow(data.row(template))
+    return profile.rows
+
+def get_peak_rss_mb() -> float:
+    """Get the process peak resident set size in megabytes."""
+    try:
+        import resource
+    except ImportError:
+        # No resource module on Windows; current RSS is the closest measure
+        import psutil
+        rss: int = psutil.Process().memory_info().rss
+        return rss / 1024 / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+class IngestionBenchmark:
+    """Run the ingestion pipeline and its stages while collecting metrics."""
+
+    def __init__(self, config_path: Path = DEFAULT_CONFIG, work_dir: Optional[Path] = None,
+                 output_dir: Optional[Path] = None, strict: bool = False,
+                 max_unresolved_ratio: float = DEFAULT_MAX_UNRESOLVED_RATIO):
+        self.config_path = Path(config_path)
+        self.strict = strict
+        self.max_unresolved_ratio = max_unresolved_ratio
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix='benchmark-'))
+        self.output_dir = Path(output_dir) if output_dir else DirectoryHelper.get_results_dir()
+        self.metrics: Dict[str, List] = {}
+        self.pipeline_problems: List[str] = []
+        self.start_time = time.time()
+
+    def record_metric(self, category: str, name: str, value: float) -> None:
+        """Record a performance metric."""
+        key = f"{category}.{name}"
+        if key not in self.metrics:
+            self.metrics[key] = []
+        self.metrics[key].append((time.time() - self.start_time, value))
+
+    def load_config(self, name: str) -> Dict[str, Any]:
+        """Load the pipeline configuration with its outputs redirected to the work directory."""
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            config: Dict[str, Any] = yaml.safe_load(f)
+        output_dir = DirectoryHelper.ensure_dir(self.work_dir / name)
+        store_settings = config.setdefault('entity_store', {}).setdefault('config', {})
+        store_settings['path'] = str(output_dir / 'entities')
+        store_settings.setdefault('relationship_graph', {})['path'] = str(output_dir / 'relationships.edges')
+        config.setdefault('system', {}).setdefault('profiling', {})['enabled'] = False
+        return config
+
+    def run_pipeline(self, input_path: Path) -> Dict[str, Any]:
+        """Run the sequential pipeline over an input file.
+
+        The pipeline runs through ``process_transactions()`` with the
+        configuration written to the work directory.
+
+        Throughput and latency are only recorded for a valid run, see
+        ``check_pipeline_output``; ``pipeline.valid`` records the outcome.
+
+        Raises:
+            RuntimeError: If the run is invalid and the benchmark is strict
+        """
+        from process_transactions import process_transactions
+
+        config = self.load_config('pipeline')
+        config_path = self.work_dir / 'pipeline' / 'config.yaml'
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config, f, sort_keys=False)
+
+        summary: Dict[str, Any] = {}
+        start = time.perf_counter()
+        process_transactions(str(config_path), str(input_path), summary=summary)
+        elapsed = time.perf_counter() - start
+        # process_transactions logs failures instead of raising them
+        rows = summary.get('records', 0)
+        stats = summary.get('stats') or {}
+
+        unresolved = (summary.get('unresolved_references') or {}).get('total', 0)
+        self.record_metric('pipeline', 'unresolved_references', unresolved)
+        if 'records' in summary:
+            problems = self.check_pipeline_output(config, rows, stats, summary)
+        else:
+            problems = ["process_transactions failed, see the log"]
+        self.pipeline_problems = problems
+
+        self.record_metric('pipeline', 'valid', 0.0 if problems else 1.0)
+        self.record_metric('pipeline', 'peak_rss_mb', get_peak_rss_mb())
+        for counter in ('created', 'stored', 'errors'):
+            self.record_metric('pipeline', counter, stats.get(counter, 0))
+        if problems:
+            message = f"Pipeline benchmark is invalid: {'; '.join(problems)}"
+            if self.strict:
+                raise RuntimeError(message)
+            print(f"WARNING: {message}. Throughput and latency are not recorded.", file=sys.stderr)
+        else:
+            self.record_metric('pipeline', 'seconds', elapsed)
+            self.record_metric('pipeline', 'rows_per_second', rows / elapsed if elapsed else 0.0)
+            for stage, summary in stats.get('latency', {}).items():
+                if summary.get('count'):
+                    self.record_metric('latency', f"{stage}_mean_ms", summary['mean'] * 1000)
+                    self.record_metric('latency', f"{stage}_p99_ms", summary['p99'] * 1000)
+        return {'rows': rows, 'seconds': elapsed, 'stats': stats, 'valid': not problems}
+
+    def check_pipeline_output(self, config: Dict[str, Any], rows: int, stats: Dict[str, Any],
+                              summary: Dict[str, Any]) -> List[str]:
+        """Get the problems that make a pipeline run invalid.
+
+        Besides the mediator counters, the first stored entity of each type
+        must have key values, every aggregate must have reached its stored
+        target and unresolved references may not exceed
+        ``max_unresolved_ratio`` per stored entity.
+        """
+        from process_transactions import get_store_settings
+        from usaspending.core.config import ComponentConfig
+        from usaspending.entity_store import EntityStore
+
+        problems = []
+        stored = stats.get('stored', 0)
+        if not stored:
+            return [f"no entities stored from {rows} rows"]
+        if stats.get('errors', 0):
+            problems.append(f"{stats['errors']} entity errors")
+
+        settings = get_store_settings(config)
+        store = EntityStore()
+        store.configure(ComponentConfig(settings=settings))
+        try:
+            for entity_type, entity_config in settings['entities'].items():
+                key_fields = entity_config.get('key_fields') or []
+                sample = next(iter(store.list_entities(entity_type)), None)
+                if key_fields and sample and not any(sample['data'].get(name) for name in key_fields):
+                    problems.append(f"stored {entity_type} entities have no key values")
+        finally:
+            store.cleanup()
+
+        for relationship_id, result in (summary.get('aggregates') or {}).items():
+            if result['unresolved'] or not result['updated']:
+                problems.append(f"{result['unresolved']} of {result['unresolved'] + result['updated']} "
+                                f"{relationship_id} aggregates have no stored target")
+
+        report = summary.get('unresolved_references') or {}
+        if report.get('total', 0) > self.max_unresolved_ratio * stored:
+            problems.append(f"{report['total']} unresolved references: {report['counts']}")
+        return problems
+
+    def run_stages(self, input_path: Path) -> Dict[str, float]:
+        """Time reading, extraction, reference resolution and storage in isolation.
+
+        Each stage consumes the previous stage's output held in memory, so
+        its time excludes the stages before it.
+        """
+        from process_transactions import read_records, create_extractor, get_store_settings
+        from usaspending.core.config import ComponentConfig
+        from usaspending.core.reference_index import ReferenceIndex
+        from usaspending.core.entity_ids import EntityIdGenerator
+        from usaspending.core.types import EntityType
+        from usaspending.entity_store import EntityStore
+
+        config = self.load_config('stages')
+        entities_config = config.get('entities', {})
+        timings: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        rows = list(read_records(config, str(input_path)))
+        timings['read'] = time.perf_counter() - start
+
+        extractor = create_extractor(config, str(input_path))
+        start = time.perf_counter()
+        extracted = [extractor.extract_entities(row) for row in rows]
+        timings['extract'] = time.perf_counter() - start
+
+        id_generator = EntityIdGenerator.from_config(entities_config)
+        references = ReferenceIndex.from_config(entities_config)
+        start = time.perf_counter()
+        try:
+            for entities in extracted:
+                for entity_type, entity in entities:
+                    references.resolve_entity(entity_type, entity)
+                    references.add(entity_type, entity, id_generator.generate(entity_type, entity))
+            references.resolve_deferred()
+        finally:
+            references.close()
+        timings['resolve'] = time.perf_counter() - start
+
+        store = EntityStore()
+        store.configure(ComponentConfig(settings=get_store_settings(config)))
+        start = time.perf_counter()
+        try:
+            for entity_type in extractor.entity_types:
+                store.save_entities(cast(EntityType, entity_type),
+                                    [entity for entities in extracted for name, entity in entities if name == entity_type])
+        finally:
+            store.cleanup()
+        timings['store'] = time.perf_counter() - start
+
+        for stage in STAGES:
+            self.record_metric('stages', f"{stage}_seconds", timings[stage])
+            self.record_metric('stages', f"{stage}_rows_per_second",
+                               len(rows) / timings[stage] if timings[stage] else 0.0)
+        self.record_metric('stages', 'peak_rss_mb', get_peak_rss_mb())
+        return timings
+
+    def update_history(self, report: Dict[str, Any], rows: int) -> None:
+        """Append a run's summary to the benchmark history."""
+        history_file = self.output_dir / HISTORY_FILE
+        history = FileHelper.load_json_file(history_file, {'runs': []})
+        history['runs'].append({
+            'timestamp': report['timestamp'],
+            'rows': rows,
+            'valid': report['pipeline']['valid'],
+            'summary': report['summary']
+        })
+        history['runs'] = history['runs'][-MAX_HISTORY:]
+        FileHelper.save_json_report(history, history_file)
+
+    def run(self, profile: Optional[SyntheticProfile] = None, stages: bool = True,
+            keep_files: bool = False) -> Dict[str, Any]:
+        """Generate synthetic input, run the benchmarks and write the performance report."""
+        profile = profile or SyntheticProfile()
+        input_path = self.work_dir / f"synthetic_{profile.rows}.csv"
+        try:
+            start = time.perf_counter()
+            generate_synthetic_csv(input_path, profile)
+            self.record_metric('input', 'rows', profile.rows)
+            self.record_metric('input', 'generate_seconds', time.perf_counter() - start)
+            self.record_metric('input', 'size_mb', os.path.getsize(input_path) / 1024 / 1024)
+
+            self.run_pipeline(input_path)
+            if stages:
+                self.run_stages(input_path)
+        finally:
+            if not keep_files:
+                shutil.rmtree(self.work_dir, ignore_errors=True)
+
+        details = {'pipeline': {
+            'entry_point': 'process_transactions.process_transactions',
+            'valid': not self.pipeline_problems,
+            'problems': self.pipeline_problems
+        }}
+        report = PerformanceReportGenerator(str(self.output_dir)).generate_report(self.metrics, details)
+        self.update_history(report, profile.rows)
+        return report
+
+def main() -> int:
+    """Run the ingestion benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark ingestion on synthetic contract data")
+    parser.add_argument('--rows', type=int, default=10000, help='Synthetic rows to generate')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+    parser.add_argument('--dirty-rate', type=float, default=0.02, help='Share of rows with a dirty value')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='Pipeline configuration file')
+    parser.add_argument('--output', help='Directory for the performance report')
+    parser.add_argument('--work-dir', help='Directory for synthetic input and pipeline output')
+    parser.add_argument('--keep-files', action='store_true', help='Keep synthetic input and pipeline output')
+    parser.add_argument('--no-stages', action='store_true', help='Only run the full pipeline')
+    parser.add_argument('--strict', action='store_true', help='Fail if the pipeline run is invalid')
+    parser.add_argument('--max-unresolved-ratio', type=float, default=DEFAULT_MAX_UNRESOLVED_RATIO,
+                        help='Unresolved references per stored entity tolerated in a valid run')
+    args = parser.parse_args()
+
+    benchmark = IngestionBenchmark(
+        Path(args.config),
+        Path(args.work_dir) if args.work_dir else None,
+        Path(args.output) if args.output else None,
+        strict=args.strict,
+        max_unresolved_ratio=args.max_unresolved_ratio
+    )
+    profile = SyntheticProfile(rows=args.rows, seed=args.seed, dirty_rate=args.dirty_rate)
+    report = benchmark.run(profile, stages=not args.no_stages, keep_files=args.keep_files)
+
+    print(f"\nBenchmark report generated at: {benchmark.output_dir / 'performance_report.json'}")
+    for category, metrics in report['summary'].items():
+        print(f"\n{category.title()} Metrics:")
+        for metric_name, stats in metrics.items():
+            print(f"  {metric_name}: {stats['avg']:.2f}")
+    if not report['pipeline']['valid']:
+        print(f"\nPipeline run is invalid: {'; '.join(report['pipeline']['problems'])}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
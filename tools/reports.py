@@ -120,7 +120,9 @@ class DashboardGenerator(BaseReport):
             'gaps': (results_dir / 'test_gap_report.json').exists(),
             'functional': (results_dir / 'functional_coverage_report.json').exists(),
             'validation': (results_dir / 'validation_report.json').exists(),
-            'history': (results_dir / 'coverage_history.json').exists()
+            'history': (results_dir / 'coverage_history.json').exists(),
+            'performance': (results_dir / 'performance_report.json').exists(),
+            'benchmarks': (results_dir / 'benchmark_history.json').exists()
         }
     
     def _copy_static_files(self, static_dir: Path, output_dir: Path) -> None:
@@ -189,6 +191,10 @@ class DashboardGenerator(BaseReport):
             data_paths['functional'] = 'results/functional_coverage_report.json'
         if self.available_reports['history']:
             data_paths['history'] = 'results/coverage_history.json'
+        if self.available_reports['performance']:
+            data_paths['performance'] = 'results/performance_report.json'
+        if self.available_reports['benchmarks']:
+            data_paths['benchmarks'] = 'results/benchmark_history.json'
 
         config = {
             'dataPaths': data_paths,
@@ -287,11 +293,13 @@ class PerformanceReportGenerator(BaseReport):
             output_dir = str(DirectoryHelper.get_results_dir())
         super().__init__(output_dir)
     
-    def generate_report(self, metrics: Dict[str, List]) -> Dict[str, Any]:
+    def generate_report(self, metrics: Dict[str, List],
+                        details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate a performance report from collected metrics.
         
         Args:
             metrics: Dictionary of metric names to list of (timestamp, value) tuples
+            details: Additional top-level report sections, e.g. run validity
             
         Returns:
             Dict containing the performance report data
@@ -318,6 +326,7 @@ class PerformanceReportGenerator(BaseReport):
             'metrics': metrics,
             'timestamp': datetime.datetime.now().isoformat()
         }
+        report.update(details or {})
         
         JSONFileOperations.add_common_report_data(report)
         self.save_report(report, 'performance_report.json')
@@ -9,7 +9,6 @@ import shutil
 from pathlib import Path
 import pytest
 import time
-import psutil
 from typing import Dict, List, Optional
 
 # Import directly from the tools package
@@ -96,6 +95,8 @@ class PerformanceTestRunner:
         
     def get_process_metrics(self) -> Dict[str, float]:
         """Get current process resource metrics."""
+        # Imported here so the tools package imports without psutil
+        import psutil
         process = psutil.Process()
         return {
             'cpu_percent': process.cpu_percent(),